@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+打包/解压性能测试脚本
+
+在临时目录中生成一个 Case，对比改造前后的吞吐量：
+- 打包：ZipFile.write 写入临时文件 vs xcase.archive.stream_zip 流式打包（单线程，不并行）
+- 解压：ZipFile.extractall vs xcase.archive.extract_zip(workers=N) 进程池并行解压
+
+用法: python test_archive_performance.py [文件数] [每个文件的大小(MB)] [工作进程数]（默认 2）
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import zipfile
+import tempfile
+from pathlib import Path
+
+# 设置 Django 环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'xadmin.settings')
+
+from xcase import archive
+
+
+def build_case(case_path, file_count, file_size):
+    """生成可压缩的测试文件（随机单词组成的文本）"""
+    words = [os.urandom(4).hex() for _ in range(2000)]
+    case_path.mkdir(parents=True)
+    for i in range(file_count):
+        line_words = []
+        size = 0
+        while size < file_size:
+            word = random.choice(words)
+            line_words.append(word)
+            size += len(word) + 1
+        (case_path / f"file_{i:04d}.log").write_text(' '.join(line_words), encoding='utf-8')
+
+
+def measure(label, total_bytes, func):
+    """执行并打印耗时和吞吐量"""
+    start_time = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start_time
+    throughput = total_bytes / 1024 / 1024 / elapsed
+    print(f"  - {label}: {elapsed * 1000:.2f}ms ({throughput:.1f} MB/s)")
+    return elapsed
+
+
+def legacy_compress(case_path, zip_path):
+    """改造前 download_case 的打包方式"""
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for root, dirs, files in os.walk(case_path):
+            for file in files:
+                file_path = Path(root) / file
+                zipf.write(file_path, file_path.relative_to(case_path))
+
+
+def stream_compress(case_path, zip_path):
+    """流式打包"""
+    files = archive.list_archive_files(str(case_path))
+    with open(zip_path, 'wb') as out:
+        for data in archive.stream_zip(files):
+            out.write(data)
+
+
+def legacy_extract(zip_path, dest):
+    """改造前 upload_case 的解压方式"""
+    with zipfile.ZipFile(zip_path, 'r') as zip_file:
+        zip_file.extractall(path=dest)
+
+
+def parallel_extract(zip_path, dest, workers):
+    """进程池并行解压"""
+    os.makedirs(dest)
+    with open(zip_path, 'rb') as fileobj:
+        archive.extract_zip(fileobj, str(dest), workers=workers, archive_path=str(zip_path))
+
+
+def main():
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    file_size = int(float(sys.argv[2]) * 1024 * 1024) if len(sys.argv) > 2 else 4 * 1024 * 1024
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else archive.ARCHIVE_WORKERS
+
+    print("=" * 80)
+    print(f"测试打包/解压性能 ({file_count} 个文件, 每个 {file_size / 1024 / 1024:.1f}MB, {workers} 个工作进程)")
+    print("=" * 80)
+
+    work_dir = Path(tempfile.mkdtemp(prefix='archive-bench-'))
+    case_path = work_dir / 'case'
+    try:
+        build_case(case_path, file_count, file_size)
+        total_bytes = file_count * file_size
+
+        print("\n打包:")
+        legacy_zip = work_dir / 'legacy.zip'
+        parallel_zip = work_dir / 'parallel.zip'
+        legacy_time = measure("顺序 (ZipFile.write)", total_bytes,
+                              lambda: legacy_compress(case_path, legacy_zip))
+        stream_time = measure("流式 (stream_zip)", total_bytes,
+                              lambda: stream_compress(case_path, parallel_zip))
+        print(f"  - 耗时比: {legacy_time / stream_time:.1f}x")
+
+        print("\n解压:")
+        legacy_time = measure("顺序 (extractall)", total_bytes,
+                              lambda: legacy_extract(legacy_zip, work_dir / 'legacy'))
+        parallel_time = measure(f"并行 (extract_zip, workers={workers})", total_bytes,
+                                lambda: parallel_extract(parallel_zip, work_dir / 'parallel', workers))
+        print(f"  - 加速比: {legacy_time / parallel_time:.1f}x")
+
+        for name in os.listdir(case_path):
+            assert (work_dir / 'parallel' / name).read_bytes() == (case_path / name).read_bytes()
+        print("\n✓ 解压结果与源文件一致")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+级联删除性能测试脚本
+
+生成约 1 万个节点的菜单树和部门树（默认每层 10 个子节点、4 层），测试删除根节点：
+- 菜单：逐节点递归删除（旧实现） vs 递归 CTE + 批量 DELETE（SysMenu.delete_menus）
+- 部门：SysDept.delete_depts（连同部门下的用户、用户角色、角色部门关联）
+
+测试数据在事务中生成，结束后回滚，不会触发缓存刷新
+
+用法:
+    python test_cascade_delete_performance.py [--fanout 10] [--depth 4]
+"""
+
+import argparse
+import os
+import time
+import django
+from django.conf import settings
+from django.db import connection, reset_queries, transaction
+from django.db.models import Q
+
+# 设置 Django 环境
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'xadmin.settings')
+django.setup()
+
+from xauth.models import SysDept, SysMenu, SysRoleDept, SysRoleMenu, SysUser, SysUserRole
+
+BENCH_ROLE_ID = 999999
+
+
+def build_menus(fanout: int, depth: int) -> int:
+    """按层批量创建菜单树，返回根节点ID"""
+    root = SysMenu.objects.create(
+        title='bench_root', parent_id=0, type=1, sort=1, status=1, create_user=1
+    )
+    level = [root.id]
+    for d in range(depth):
+        menus = [
+            SysMenu(title=f'bench_{d}_{i}', parent_id=parent_id, type=2 if d < depth - 1 else 3,
+                    sort=i, status=1, create_user=1)
+            for parent_id in level for i in range(fanout)
+        ]
+        level = [menu.id for menu in SysMenu.objects.bulk_create(menus, batch_size=2000)]
+        SysRoleMenu.objects.bulk_create(
+            [SysRoleMenu(role_id=BENCH_ROLE_ID, menu_id=menu_id) for menu_id in level],
+            batch_size=2000
+        )
+    return root.id
+
+
+def build_depts(fanout: int, depth: int) -> int:
+    """按层批量创建部门树（叶子部门各一个用户），返回根节点ID"""
+    root = SysDept.objects.create(
+        name='bench_root', parent_id=0, ancestors='0', sort=1, status=1, is_system=0, create_user=1
+    )
+    level = [(root.id, root.path)]
+    for d in range(depth):
+        depts = [
+            SysDept(name=f'bench_{d}_{i}', parent_id=parent_id, ancestors=path,
+                    sort=i, status=1, is_system=0, create_user=1)
+            for parent_id, path in level for i in range(fanout)
+        ]
+        level = [(dept.id, dept.path) for dept in SysDept.objects.bulk_create(depts, batch_size=2000)]
+    SysRoleDept.objects.bulk_create(
+        [SysRoleDept(role_id=BENCH_ROLE_ID, dept_id=dept_id) for dept_id, _ in level], batch_size=2000
+    )
+    users = SysUser.objects.bulk_create(
+        [SysUser(username=f'bench_dept_user_{dept_id}', password='', gender=0, dept_id=dept_id,
+                 status=1, is_system=0) for dept_id, _ in level],
+        batch_size=2000
+    )
+    SysUserRole.objects.bulk_create(
+        [SysUserRole(user_id=user.id, role_id=BENCH_ROLE_ID) for user in users], batch_size=2000
+    )
+    return root.id
+
+
+def legacy_delete_menus(menu_id: int):
+    """旧实现：逐节点查询子节点并逐条删除"""
+    menu_ids = SysMenu.objects.filter(
+        Q(id=menu_id) | Q(parent_id=menu_id)
+    ).values_list('id', flat=True)
+    if menu_ids:
+        for mid in list(menu_ids):
+            SysMenu.objects.filter(id=mid).delete()
+            legacy_delete_menus(mid)
+
+
+def measure(label: str, func, *args):
+    reset_queries()
+    start_time = time.time()
+    func(*args)
+    elapsed = (time.time() - start_time) * 1000
+    print(f"\n{label}")
+    count = len(connection.queries)
+    # 超过查询日志上限时只保留最后的记录
+    suffix = '+' if count >= connection.queries_log.maxlen else ''
+    print(f"  - 查询次数: {count}{suffix}")
+    print(f"  - 耗时: {elapsed:.2f}ms")
+    return elapsed
+
+
+def test_menu_delete_performance(fanout: int, depth: int):
+    """测试菜单级联删除性能"""
+    print("=" * 80)
+    print("测试菜单级联删除性能 (delete_menus)")
+    print("=" * 80)
+
+    root_id = build_menus(fanout, depth)
+    count = SysMenu.objects.filter(title__startswith='bench_').count()
+    print(f"\n菜单节点数: {count}")
+
+    sid = transaction.savepoint()
+    legacy = measure("逐节点递归删除（旧实现）", legacy_delete_menus, root_id)
+    transaction.savepoint_rollback(sid)
+
+    current = measure("递归 CTE + 批量 DELETE", SysMenu.delete_menus, root_id)
+    assert not SysMenu.objects.filter(title__startswith='bench_').exists()
+    assert not SysRoleMenu.objects.filter(role_id=BENCH_ROLE_ID).exists()
+    print(f"\n加速: {legacy / current:.1f}x")
+
+
+def test_dept_delete_performance(fanout: int, depth: int):
+    """测试部门级联删除性能"""
+    print("\n" + "=" * 80)
+    print("测试部门级联删除性能 (delete_depts)")
+    print("=" * 80)
+
+    root_id = build_depts(fanout, depth)
+    count = SysDept.subtree(root_id).count()
+    users = SysUser.objects.filter(username__startswith='bench_dept_user_').count()
+    print(f"\n部门节点数: {count}, 用户数: {users}")
+
+    measure("前缀索引子树 + 批量 DELETE", SysDept.delete_depts, root_id)
+    assert not SysDept.objects.filter(name__startswith='bench_').exists()
+    assert not SysUser.objects.filter(username__startswith='bench_dept_user_').exists()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='级联删除性能测试')
+    parser.add_argument('--fanout', type=int, default=10, help='每个节点的子节点数')
+    parser.add_argument('--depth', type=int, default=4, help='根节点以下的层数')
+    args = parser.parse_args()
+
+    # 启用查询记录
+    settings.DEBUG = True
+    with transaction.atomic():
+        test_menu_delete_performance(args.fanout, args.depth)
+        test_dept_delete_performance(args.fanout, args.depth)
+        transaction.set_rollback(True)
+    settings.DEBUG = False
+    print("\n测试数据已回滚")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+目录遍历性能测试脚本
+
+在临时目录中生成一个包含 10 万个文件的 Case，对比旧的
+Path.iterdir + is_dir 实现与 xcase.walker（os.scandir）的 stat 次数和耗时
+
+用法: python test_walker_performance.py [文件数] [每个目录的文件数]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+from xcase import walker
+
+
+def legacy_get_children(storage_root, dir_path):
+    """改造前 FileManager._get_children 的实现"""
+    children = []
+    items = sorted(dir_path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
+    for item in items:
+        if item.name.startswith('.'):
+            continue
+        rel_path = f"/{item.relative_to(storage_root).as_posix()}"
+        if item.is_dir():
+            node = {
+                'path': rel_path,
+                'name': item.name,
+                'type': 'folder',
+                'children': legacy_get_children(storage_root, item)
+            }
+        else:
+            node = {
+                'path': rel_path,
+                'name': item.name,
+                'type': 'file'
+            }
+        children.append(node)
+    return children
+
+
+def count_tree_nodes(nodes):
+    """统计树节点总数"""
+    count = 0
+    for node in nodes:
+        count += 1
+        count += count_tree_nodes(node.get('children', []))
+    return count
+
+
+def build_case(case_path, file_count, files_per_dir):
+    """生成测试用的 Case 目录"""
+    for i in range(0, file_count, files_per_dir):
+        sub_dir = case_path / f"dir_{i // files_per_dir:04d}"
+        sub_dir.mkdir(parents=True)
+        for j in range(min(files_per_dir, file_count - i)):
+            (sub_dir / f"file_{j:05d}.txt").touch()
+
+
+def measure(label, func):
+    """统计函数执行期间的 stat 调用次数和耗时"""
+    counter = {'stat': 0}
+    original_stat = os.stat
+
+    def counting_stat(*args, **kwargs):
+        counter['stat'] += 1
+        return original_stat(*args, **kwargs)
+
+    os.stat = counting_stat
+    try:
+        start_time = time.perf_counter()
+        tree = func()
+        elapsed = (time.perf_counter() - start_time) * 1000
+    finally:
+        os.stat = original_stat
+
+    print(f"\n{label}")
+    print(f"  - stat 调用次数: {counter['stat']}")
+    print(f"  - 耗时: {elapsed:.2f}ms")
+    print(f"  - 树节点数: {count_tree_nodes(tree)}")
+    return counter['stat'], elapsed, tree
+
+
+def main():
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    files_per_dir = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    print("=" * 80)
+    print(f"测试目录遍历性能 ({file_count} 个文件, 每个目录 {files_per_dir} 个)")
+    print("=" * 80)
+
+    storage_root = Path(tempfile.mkdtemp(prefix='walker-bench-'))
+    case_path = storage_root / 'casespace' / 'case'
+    try:
+        build_case(case_path, file_count, files_per_dir)
+
+        legacy_stats, legacy_ms, legacy_tree = measure(
+            "旧实现 (Path.iterdir + is_dir)",
+            lambda: legacy_get_children(storage_root, case_path)
+        )
+        walker_stats, walker_ms, walker_tree = measure(
+            "新实现 (os.scandir)",
+            lambda: walker.walk_tree(str(case_path), '/casespace/case')
+        )
+
+        assert legacy_tree == walker_tree, "两种实现的结果不一致"
+
+        print("\n" + "=" * 80)
+        print(f"stat 调用: {legacy_stats} -> {walker_stats}")
+        print(f"耗时: {legacy_ms:.2f}ms -> {walker_ms:.2f}ms ({legacy_ms / walker_ms:.1f}x)")
+        print("=" * 80)
+    finally:
+        shutil.rmtree(storage_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
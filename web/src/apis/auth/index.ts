@@ -45,3 +45,8 @@ export const getUserInfo = () => {
 export const getUserRoute = () => {
     return http.get<T.RouteItem[]>(`${BASE_URL}/route`);
 };
+
+/** @desc 一次获取用户信息、权限、路由和字典（dicts 为字典编码，不传时返回所有字典） */
+export const getBootstrap = (dicts?: string[]) => {
+    return http.get<T.BootstrapResp>(`${BASE_URL}/bootstrap`, dicts ? { dicts: dicts.join(",") } : undefined);
+};
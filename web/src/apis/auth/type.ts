@@ -13,6 +13,10 @@ export interface UserInfo {
   deptName: string
   roles: string[]
   permissions: string[]
+  /** 权限位图（十六进制，位序号为权限标识按字典序排序后的下标） */
+  permissionBitmap?: string
+  /** 权限注册表版本，与本地保存的版本不同时丢弃旧的权限位图 */
+  permissionVersion?: string
 }
 
 /** 路由类型 */
@@ -41,6 +45,14 @@ export interface RouteItem {
   affix: boolean
 }
 
+/** 登录后初始化数据 */
+export interface BootstrapResp {
+  userInfo: UserInfo
+  routes: RouteItem[]
+  /** 字典编码 -> 字典项 */
+  dicts: Record<string, { label: string, value: number, color?: string }[]>
+}
+
 /** 账号登录请求参数 */
 export interface AccountLoginReq {
   username: string
@@ -6,6 +6,9 @@ export interface CaseMetadata {
   casespace: string
   caseName: string
   tags: string[]
+  options?: CaseOption[]
+  fileCount?: number
+  totalSize?: number
 }
 
 export interface CaseOption {
@@ -13,6 +16,21 @@ export interface CaseOption {
   value: string
 }
 
+export interface CaseMetadataQuery {
+  page: number
+  size: number
+  /** 排序，格式为 "字段,asc|desc"，字段为 caseName 或 updateTime */
+  sort?: string
+  /** Case 名称前缀 */
+  name?: string
+  /** 标签，多个用逗号分隔 */
+  tags?: string
+  /** any：包含任一标签；all：包含全部标签 */
+  tagMatch?: 'any' | 'all'
+  /** 选项，格式为 "key=value"，多个用逗号分隔 */
+  options?: string
+}
+
 export interface CaseDetail extends CaseMetadata {
   options: CaseOption[]
 }
@@ -4,6 +4,7 @@
 import http from '@/utils/http'
 import type {
   CaseMetadata,
+  CaseMetadataQuery,
   CaseDetail,
   AddTagRequest,
   AddOptionRequest,
@@ -15,12 +16,19 @@ export * from './casebrowser-type'
 const BASE_URL = '/case/casebrowser'
 
 /**
- * 获取指定 casespace 下所有 case 的元数据（包含 tags）
+ * 获取指定 casespace 下所有 case 的元数据（包含 tags 和 options）
  */
 export function getCasesMetadata(casespace: string) {
   return http.get<CaseMetadata[]>(`${BASE_URL}/casespaces/${casespace}/cases`)
 }
 
+/**
+ * 分页查询指定 casespace 下的 case 元数据（过滤、排序在服务端完成）
+ */
+export function listCasesMetadata(casespace: string, query: CaseMetadataQuery) {
+  return http.get<PageRes<CaseMetadata[]>>(`${BASE_URL}/casespaces/${casespace}/cases`, query)
+}
+
 /**
  * 获取单个 case 的详细信息，包含 tags 和 options
  */
@@ -8,6 +8,14 @@ export interface FileNode {
   name: string
   type: 'file' | 'folder'
   children?: FileNode[]
+  /** 指定 depth 时返回，表示目录下是否还有子项 */
+  hasChildren?: boolean
+}
+
+/** 文件树分页结果 */
+export interface FileTreePage {
+  list: FileNode[]
+  nextCursor: string | null
 }
 
 /** 文件内容 */
@@ -6,6 +6,7 @@ import type {
   CasespaceItem,
   CaseItem,
   FileNode,
+  FileTreePage,
   FileContent,
   SaveFileRequest,
   CreateFileRequest,
@@ -39,10 +40,25 @@ export function getFileTree(params: {
   casespace?: string
   case?: string
   path?: string
+  depth?: number
 }) {
   return http.get<FileNode[]>(`${BASE_URL}/files`, params)
 }
 
+/**
+ * 分页获取目录的子节点（按需展开大目录）
+ */
+export function getFileTreePage(params: {
+  casespace: string
+  case: string
+  path?: string
+  depth?: number
+  cursor?: string
+  limit?: number
+}) {
+  return http.get<FileTreePage>(`${BASE_URL}/files`, params)
+}
+
 /**
  * 获取文件内容
  */
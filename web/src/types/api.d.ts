@@ -11,10 +11,17 @@ interface ApiRes<T> {
 interface PageRes<T> {
   list: T
   total: number
+  /** 键集分页的下一页游标（null 表示没有更多数据） */
+  nextCursor?: string | null
 }
 
 /** 分页请求数据格式 */
 interface PageQuery {
   page: number
   size: number
+  /** 键集分页（用户、角色、字典项列表支持） */
+  keyset?: boolean
+  cursor?: string
+  /** 返回近似总数 */
+  approxCount?: boolean
 }
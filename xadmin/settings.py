@@ -177,6 +177,12 @@ NINJA_JWT = {
     "USER_ID_CLAIM": "user_id",
 }
 
+# JWT 认证只校验 Token 签名和缓存的用户状态，不再每个请求查询用户表
+XADMIN_STATELESS_AUTH = True
+
+# API 响应渲染器（安装 orjson 时使用 orjson 序列化）
+XADMIN_JSON_RENDERER = "xutils.renderers.FastJSONRenderer"
+
 REDIS_HOST = "127.0.0.1"
 REDIS_PORT = 6379
 REDIS_PASSWORD = "amdyes"
@@ -3,7 +3,6 @@ from base64 import b64decode
 # from uuid import uuid4
 # from captcha.image import ImageCaptcha  # 验证码功能已注释
 from django.conf import settings
-from django.db.models import Q
 from django.http import HttpRequest
 
 
@@ -13,7 +12,7 @@ from ninja.responses import Response
 from ninja_extra import Router
 from ninja_jwt.tokens import RefreshToken
 
-from xauth import models, schemas
+from xauth import models, schemas, session
 from xutils import utils
 
 # Create your views here.
@@ -84,62 +83,26 @@ def logout(request):
 # User
 @router.get("/route")
 def get_user_route(request):
-    user: models.SysUser = request.user
-    # 系统用户拥有所有菜单权限
-    if user.is_system == 1:
-        routes = models.SysMenu.build_menu_tree(ids=None)
-        resp = utils.RespSuccessTempl()
-        resp.data = routes
-        return resp.as_dict()
-    else:
-        roles = models.SysUserRole.objects.filter(user_id=user.id).values_list(
-            "role_id", flat=True
-        )
-        menu_ids = models.SysRoleMenu.objects.filter(role_id__in=roles).values_list(
-            "menu_id", flat=True
-        )
-        logger.info(f"menu_ids: {list(menu_ids)}")
-        routes = models.SysMenu.build_menu_tree(ids=list(menu_ids))
-        resp = utils.RespSuccessTempl()
-        resp.data = routes
-        return resp.as_dict()
+    resp = utils.RespSuccessTempl()
+    resp.data = session.get_session(request.user_state["id"])["routes"]
+    return resp.as_dict()
 
 
 @router.get("/user/info")
 def get_user_info(request: HttpRequest):
-    user: models.SysUser = request.user
-    dept = models.SysDept.objects.get(id=user.dept_id)
-    role_ids = models.SysUserRole.objects.filter(user_id=user.id).values_list(
-        "role_id", flat=True
-    )
-    role_names = models.SysRole.objects.filter(id__in=role_ids).values_list(
-        "code", flat=True
-    )
-    menu_ids = models.SysRoleMenu.objects.filter(
-        role_id__in=list(role_ids)
-    ).values_list("menu_id", flat=True)
-    # 系统用户拥有所有权限
-    if user.is_system == 1:
-        permissions = ("*:*:*",)
-    else:
-        permissions = models.SysMenu.objects.filter(
-            Q(id__in=menu_ids) & Q(type=3)
-        ).values_list("permission", flat=True)
-    data = dict(
-        id=user.id,
-        username=user.username,
-        nickname=user.nickname,
-        gender=user.gender,
-        email=user.email or "",
-        phone=user.phone or "",
-        avatar=user.avatar or "",
-        description=user.description or "",
-        registrationDate=utils.dateformat(user.create_time),
-        deptId=user.dept_id,
-        deptName=dept.name,
-        permissions=list(permissions),
-        roles=list(role_names),
-    )
     resp = utils.RespSuccessTempl()
-    resp.data = data
+    resp.data = session.get_user_info(request.user_state)
+    return resp.as_dict()
+
+
+@router.get("/bootstrap")
+def get_bootstrap(request: HttpRequest):
+    """
+    登录后一次获取用户信息、权限、路由和字典
+
+    查询参数 dicts 为逗号分隔的字典编码（不传时返回所有字典）
+    """
+    codes = request.GET.get("dicts")
+    resp = utils.RespSuccessTempl()
+    resp.data = session.get_bootstrap(request.user_state, codes.split(",") if codes else None)
     return resp.as_dict()
@@ -1,13 +1,14 @@
-from django.http import HttpRequest
-from django.db.models import F, Q
+from django.http import HttpRequest, HttpResponse
+from django.utils.http import parse_etags, quote_etag
 from django.core.files.storage import FileSystemStorage
-from django.core.cache import cache
 from django.conf import settings
 from ninja_extra import Router
 from ninja import File
 from ninja.files import UploadedFile
-from xauth import models
+from ninja.responses import Response
+from xauth import dict_cache
 from xutils import utils
+from .tree_cache import dept_tree_cache, menu_tree_cache
 
 
 router = Router()
@@ -18,41 +19,58 @@ def get_data_scope_enum(request):
     resp.data = settings.TITW_DATA_SCOPE
     return resp.as_dict()
 
+def _dict_response(request: HttpRequest, name: str, empty_if_missing: bool = False):
+    """
+    字典缓存条目的响应
+
+    响应带有 ETag（条目版本号），If-None-Match 匹配时返回 304；
+    Cache-Control 为 no-cache，浏览器每次都会重新验证，字典修改后立即生效
+
+    Args:
+        request: 请求
+        name: 条目名称
+        empty_if_missing: 条目不存在时返回空列表（否则返回 404）
+    """
+    version, data = dict_cache.get(name)
+    if data is None and empty_if_missing:
+        resp = utils.RespSuccessTempl()
+        resp.data = list()
+        return resp.as_dict()
+    if data is None:
+        resp = utils.RespFailedTempl()
+        resp.code = 404
+        resp.msg = '字典不存在'
+        return resp.as_dict()
+
+    # 响应外层的时间戳每次不同，只能作为弱 ETag
+    etag = f'W/{quote_etag(version)}'
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        if '*' in etags or etag in etags or etag[2:] in etags:
+            response = HttpResponse(status=304)
+            response['ETag'] = etag
+            return response
+
+    resp = utils.RespSuccessTempl()
+    resp.data = data
+    response = Response(resp.as_dict())
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
 @router.get('/dict/role')
 def get_dict_role(request: HttpRequest):
-    roles = models.SysRole.objects.annotate(
-        label=F('name'), value=F('id')
-    ).values('label', 'value')
-    resp = utils.RespSuccessTempl()
-    resp.data = list(roles)
-    return resp.as_dict()
+    return _dict_response(request, 'role')
 
 @router.get('/dict/option', auth=None)
 def get_dict_option(request: HttpRequest):
-    category = request.GET.get('category', False)
-    filters= Q()
-    if category:
-        filters = Q(category=category)
-    items = models.SysOption.objects.filter(
-        filters
-    ).values('code', 'value'
-    ).annotate(label=F('code')
-    ).values('label', 'value')
-    resp = utils.RespSuccessTempl()
-    resp.data = list(items)
-    return resp.as_dict()
+    category = request.GET.get('category', '')
+    return _dict_response(request, f'option:{category}', empty_if_missing=True)
 
 @router.get('/dict/{code}')
 def get_dict(request, code: str):
-    dict_id = models.SysDict.objects.get(code=code)
-    dict_items = models.SysDictItem.objects.filter(
-        dict_id=dict_id.id
-    ).values('id', 'label', 'color'
-    ).annotate(value=F('id')
-    ).values('label', 'value', 'color')
-    resp = utils.RespSuccessTempl()
-    resp.data = list(dict_items)
-    return resp.as_dict()
+    return _dict_response(request, f'dict:{code}')
 
 @router.post('/file')
 def add_file(request, file: UploadedFile=File(...)):
@@ -65,20 +83,14 @@ def add_file(request, file: UploadedFile=File(...)):
 
 @router.get('/tree/dept')
 def get_dept_tree(request: HttpRequest):
-    data = cache.get('common_dept_tree')
-    if not data:
-        data = models.SysDept.build_dept_tree(choice=True, status=1)
-        cache.set('common_dept_tree', data)
+    data = dept_tree_cache.get('choice')
     resp = utils.RespSuccessTempl()
     resp.data = data
     return resp.as_dict()
 
 @router.get('/tree/menu')
 def get_menu_tree(request: HttpRequest):
-    data = cache.get('common_menu_tree')
-    if not data:
-        data = models.SysMenu.build_menu_tree(choice=True)
-        cache.set('common_menu_tree', data)
+    data = menu_tree_cache.get('choice')
     resp = utils.RespSuccessTempl()
     resp.data = data
     return resp.as_dict()
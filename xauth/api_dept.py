@@ -1,9 +1,9 @@
-from django.core.cache import cache
 from ninja_extra import Router
-from xauth import models
+from xauth import loaders, models
 from xutils import utils
 from xauth import schemas
 from . import auth
+from .tree_cache import dept_tree_cache
 
 
 router = Router()
@@ -15,44 +15,11 @@ def export_department(request):
 @router.get('/tree', auth=auth.XadminPermAuth('system:dept:list'))
 def get_department_tree(request):
     resp = utils.RespSuccessTempl()
-    data = []
     status = request.GET.get('status')
     if status not in (None, ''):
-        if int(status) == 1:
-            data = cache.get('dept_enabled_tree')
-            if not data:
-                data = models.SysDept.build_dept_tree(status=int(status))
-                cache.set('dept_enabled_tree', data)
-        else:
-            data = cache.get('dept_disabled_tree')
-            if not data:
-                data = []
-                depts = models.SysDept.objects.filter(
-                    status=int(status)
-                )
-                for dept in depts:
-                    dept = {
-                        'id': dept.id,
-                        'parentId': dept.parent_id,
-                        'name': dept.name or "",
-                        'sort': dept.sort,
-                        'status': dept.status,
-                        'isSystem': bool(dept.is_system),
-                        'description': dept.description,
-                        'createUser': dept.create_user,
-                        'createUserString': 'fake',
-                        'createTime': utils.dateformat(dept.create_time),
-                        'updateUser': dept.update_user,
-                        'updateUserString': 'fake',
-                        'updateTime': dept.update_time,
-                    }
-                    data.append(dept)
-                cache.set('dept_disabled_tree', data)
+        data = dept_tree_cache.get('enabled' if int(status) == 1 else 'disabled')
     else:
-        data = cache.get('dept_tree')
-        if not data:
-            data = models.SysDept.build_dept_tree()
-            cache.set('dept_tree', data)
+        data = dept_tree_cache.get('all')
 
     resp.data = data
     return resp.as_dict()
@@ -61,7 +28,7 @@ def get_department_tree(request):
 def add_department(request, dept: schemas.SysDeptAdd):
     parent = models.SysDept.objects.get(id=dept.parent_id)
     _data = dept.dict()
-    _data['ancestors'] = f'{parent.ancestors},{parent.id}'
+    _data['ancestors'] = parent.path
     models.SysDept.objects.create(**_data)
     resp = utils.RespSuccessTempl()
     resp.data = dict()
@@ -79,12 +46,11 @@ def get_department(request, id: int):
         'isSystem': bool(dept.is_system),
         'description': dept.description,
         'createUser': dept.create_user,
-        'createUserString': 'fake',
         'createTime': utils.dateformat(dept.create_time),
         'updateUser': dept.update_user,
-        'updateUserString': 'fake',
         'updateTime': dept.update_time,
     }
+    loaders.fill_user_strings([data])
     resp = utils.RespSuccessTempl()
     resp.data = data
     return resp.as_dict()
@@ -95,8 +61,13 @@ def update_department(request, id: int, dept: schemas.SysDeptAdd):
     _dept = models.SysDept.objects.get(id=id)
     for k,v in dept.dict().items():
         setattr(_dept, k, v)
-    _dept.ancestors = f'{parent.ancestors},{parent.id}'
-    _dept.save()
+    try:
+        # 同时改写所有下级部门的祖级列表
+        _dept.move_to(parent)
+    except ValueError as e:
+        resp = utils.RespFailedTempl()
+        resp.msg = str(e)
+        return resp.as_dict()
     resp = utils.RespSuccessTempl()
     resp.data = dict()
     return resp.as_dict()
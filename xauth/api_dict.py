@@ -1,8 +1,7 @@
 from django.http import HttpRequest
-from django.db.models import Q
 from django.forms.models import model_to_dict
 from ninja_extra import Router
-from xauth import models
+from xauth import models, search
 from xutils import utils
 from xauth import schemas
 from . import auth
@@ -16,11 +15,10 @@ def get_dict_list(request: HttpRequest):
     if not keyword:
         _dict = models.SysDict.objects.all()
     else:
-        _dict = models.SysDict.objects.filter(
-            Q(description__icontains=keyword) | 
-            Q(name__icontains=keyword) |
-            Q(value__icontains=keyword)
-        )
+        # 按相关度排序
+        _dict = search.search(
+            models.SysDict.objects.all(), search.DICT_SEARCH_FIELDS, keyword, ranked=True
+        ).order_by(f'-{search.RELEVANCE}', 'id')
     data = []
     for _d in _dict:
         record = model_to_dict(_d)
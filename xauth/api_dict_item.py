@@ -2,7 +2,7 @@ from django.http import HttpRequest
 from django.db.models import Q
 from django.forms.models import model_to_dict
 from ninja_extra import Router
-from xauth import models
+from xauth import loaders, models, paging, search
 from xutils import utils
 from xauth import schemas
 from . import auth
@@ -17,26 +17,11 @@ def get_dict_item_list(request: HttpRequest):
     dict_id = request.GET.get('dictId', False)
     page = int(request.GET.get('page', 1))
     size = int(request.GET.get('size', 10))
-    sort = request.GET.get('sort', False)
-    desc = ''
-    order_by = 'id'
+    sort = request.GET.get('sort') or 'id,asc'
 
     # 初始化过滤条件
     filters = Q()
 
-    # 处理排序
-    if sort:
-        _sort = [_.strip() for _ in sort.split(',')]
-        if 'desc' in _sort:
-            desc = '-'
-            _sort.remove('desc')
-        if len(_sort) == 1:
-            order_by = utils.camel_to_snake(_sort[0])
-    
-    # 搜索标签或描述（两个字段用OR连接）
-    if description:
-        filters &= (Q(label__icontains=description) | Q(description__icontains=description))
-    
     # 状态过滤（与其他条件用AND连接）
     if status:
         filters &= Q(status=int(status))
@@ -45,20 +30,35 @@ def get_dict_item_list(request: HttpRequest):
     if dict_id:
         filters &= Q(dict_id=int(dict_id))
     
-    # 查询数据
+    # 查询数据（支持键集分页和近似总数）
     _items = models.SysDictItem.objects.filter(filters)
-    total = _items.count()
-    items = _items.order_by(f'{desc}{order_by}')[(page-1)*size:page*size]
-    data = dict()
+
+    # 搜索标签或描述（模糊匹配，可按相关度排序）
+    ranked = search.is_relevance(sort)
+    if description:
+        _items = search.search(_items, search.DICT_ITEM_SEARCH_FIELDS, description, ranked=ranked)
+    elif ranked:
+        sort = 'id,asc'
+
+    try:
+        data = paging.paginate(
+            request, _items, sort, page, size,
+            sort_fields=('id', 'label', 'value', 'sort', 'status', 'create_time', 'update_time'),
+            keyset_fields=('id', 'sort', 'create_time')
+        )
+    except ValueError as e:
+        resp = utils.RespFailedTempl()
+        resp.msg = str(e)
+        return resp.as_dict()
+    items = data['list']
     data['list'] = []
-    data['total'] = total
     for item in items:
         data['list'].append(
             dict(
                 id = item.id,
-                createUserString = item.create_user,
+                createUser = item.create_user,
                 createTime = utils.dateformat(item.create_time),
-                updateUserString = item.update_user,
+                updateUser = item.update_user,
                 updateTime = utils.dateformat(item.update_time) if item.update_time else None,
                 label = item.label,
                 value = item.value,
@@ -69,6 +69,7 @@ def get_dict_item_list(request: HttpRequest):
                 deptId = item.dict_id,
             )
         )
+    loaders.fill_user_strings(data['list'])
     resp = utils.RespSuccessTempl()
     resp.data = data
     return resp.as_dict()
@@ -1,19 +1,16 @@
-from django.core.cache import cache
 from ninja_extra import Router
 from xauth import models
 from xutils import utils
 from xauth import schemas
 from . import auth
+from .tree_cache import menu_tree_cache
 
 
 router = Router()
 
 @router.get('/tree', auth=auth.XadminPermAuth('system:menu:list'))
 def get_menu_tree(request):
-    data = cache.get('menu_tree')
-    if not data:
-        data = models.SysMenu.build_menu_tree(all=True)
-        cache.set('menu_tree', data)
+    data = menu_tree_cache.get('all')
     resp = utils.RespSuccessTempl()
     resp.data = data
     return resp.as_dict()
@@ -1,7 +1,7 @@
 from django.http import HttpRequest
 from django.db.models import F
 from ninja_extra import Router
-from xauth import models
+from xauth import dict_cache, models
 from xutils import utils
 from xauth import schemas
 from . import auth
@@ -38,6 +38,8 @@ def reset_option(request, category: schemas.SysOptionResetIn):
     models.SysOption.objects.filter(
         category=category.category
     ).update(value=F('default_value'))
+    # update() 不发送信号
+    dict_cache.refresh(dict_cache.option_names(category.category))
     resp = utils.RespSuccessTempl()
     resp.data = dict()
     return resp.as_dict()
@@ -1,10 +1,9 @@
 from django.db import transaction
-from django.db.models import Q
 from django.http import HttpRequest
 from ninja import responses #noqa
 from http import HTTPStatus
 from ninja_extra import Router
-from xauth import models
+from xauth import loaders, models, paging, search
 from xutils import utils
 from xauth import schemas
 from . import auth
@@ -17,35 +16,33 @@ def list_roles(request: HttpRequest, page: int=1, size: int=10, sort: str='creat
     # 获取搜索参数
     description = request.GET.get("description", "")
     
-    # 排序处理
-    sort_field, sort_order = sort.split(',')
-    sort_field = utils.camel_to_snake(sort_field)
-    sort_order = '-' if sort_order == 'desc' else ''
-    order_by = f'{sort_order}{sort_field}'
+    # 查询角色（先过滤，再排序，最后分页；支持键集分页和近似总数）
+    _data = models.SysRole.objects.all()
     
-    # 构建过滤条件
-    filter_query = Q()
-    
-    # 搜索名称/编码/描述（模糊匹配）
+    # 搜索名称/编码/描述（模糊匹配，可按相关度排序）
+    ranked = search.is_relevance(sort)
     if description:
-        filter_query = filter_query & (
-            Q(name__icontains=description) | 
-            Q(code__icontains=description) | 
-            Q(description__icontains=description)
+        _data = search.search(_data, search.ROLE_SEARCH_FIELDS, description, ranked=ranked)
+    elif ranked:
+        sort = 'createTime,desc'
+    try:
+        page_data = paging.paginate(
+            request, _data, sort, page, size,
+            sort_fields=('id', 'name', 'code', 'sort', 'create_time', 'update_time'),
+            keyset_fields=('id', 'create_time', 'sort')
         )
-    
-    # 查询角色（先过滤，再排序，最后分页）
-    _data = models.SysRole.objects.filter(filter_query).order_by(order_by)
-    total = _data.count()
-    _page_data = _data[(page-1)*size:page*size]
+    except ValueError as e:
+        resp = utils.RespFailedTempl()
+        resp.msg = str(e)
+        return resp.as_dict()
     data = list()
-    for item in _page_data:
+    for item in page_data['list']:
         data.append(
             dict(
                 id = item.id,
-                createUserString = item.create_user,
+                createUser = item.create_user,
                 createTime = utils.dateformat(item.create_time),
-                updateUserString = item.update_user,
+                updateUser = item.update_user,
                 updateTime = item.update_time,
                 disabled = False,
                 name = item.name,
@@ -56,8 +53,10 @@ def list_roles(request: HttpRequest, page: int=1, size: int=10, sort: str='creat
                 description = item.description,
             )
         )
+    loaders.fill_user_strings(data)
     resp = utils.RespSuccessTempl()
-    resp.data = dict(list=data, total=total)
+    page_data['list'] = data
+    resp.data = page_data
     return resp.as_dict()
 
 
@@ -1,14 +1,14 @@
 from base64 import b64decode, b64encode
 
 from django.conf import settings
-from django.db.models import OuterRef, Q, Subquery
+from django.db.models import Q
 from django.http import HttpRequest
 from loguru import logger
 from ninja import File
 from ninja.files import UploadedFile
 from ninja_extra import Router
 
-from xauth import models, schemas
+from xauth import loaders, models, paging, schemas, search, session
 from xutils import utils
 
 from . import auth
@@ -36,40 +36,8 @@ def get_avatar(request):
 
 @router.get("/info")
 def get_user_info(request: HttpRequest):
-    user: models.SysUser = request.user
-    dept = models.SysDept.objects.get(id=user.dept_id)
-    role_ids = models.SysUserRole.objects.filter(user_id=user.id).values_list(
-        "role_id", flat=True
-    )
-    role_names = models.SysRole.objects.filter(id__in=role_ids).values_list(
-        "code", flat=True
-    )
-    menu_ids = models.SysRoleMenu.objects.filter(
-        role_id__in=list(role_ids)
-    ).values_list("menu_id", flat=True)
-    # 系统用户拥有所有权限
-    if user.is_system == 1:
-        permissions = ("*:*:*",)
-    else:
-        permissions = models.SysMenu.objects.filter(
-            Q(id__in=menu_ids) & Q(type=3)
-        ).exclude(permission__isnull=True).exclude(permission='').values_list("permission", flat=True)
-    data = dict(
-        id=user.id,
-        username=user.username,
-        nickname=user.nickname,
-        gender=user.gender,
-        email=user.email or "",
-        phone=user.phone or "",
-        avatar=user.avatar or "",
-        description=user.description or "",
-        deptId=user.dept_id,
-        deptName=dept.name,
-        permissions=list(permissions),
-        roles=list(role_names),
-    )
     resp = utils.RespSuccessTempl()
-    resp.data = data
+    resp.data = session.get_user_info(request.user_state)
     return resp.as_dict()
 
 
@@ -81,8 +49,10 @@ def user_list(request: HttpRequest):
     create_time = request.GET.getlist("createTime")  # 创建时间范围（数组）
     page = int(request.GET.get("page", 1))
     size = int(request.GET.get("size", 10))
+    # 前端排序参数可能带表别名（如 t1.id,desc）
+    sort = request.GET.get("sort") or "id,desc"
+    sort = sort.rsplit(".", 1)[-1]
 
-    result = dict()
     _list = []
     
     # 获取部门ID，如果没有传递则使用根部门ID
@@ -94,23 +64,13 @@ def user_list(request: HttpRequest):
     else:
         dept_id = int(dept_id_param)
     
-    dept_ids = models.SysDept.objects.filter(ancestors__contains=str(dept_id)).values(
-        "id"
-    )
-    dept_name_subquery = models.SysDept.objects.filter(id=OuterRef("dept_id")).values(
-        "name"
-    )[:1]
-
+    # 部门及其所有下级部门（ancestors 前缀索引查询）
+    try:
+        dept_ids = models.SysDept.subtree(dept_id).values("id")
+    except models.SysDept.DoesNotExist:
+        dept_ids = models.SysDept.objects.none().values("id")
     # 构建过滤条件
-    filter = Q(dept_id__in=dept_ids) | Q(dept_id=dept_id)
-    
-    # 搜索用户名/昵称/描述（模糊匹配）
-    if description:
-        filter = filter & (
-            Q(username__icontains=description) | 
-            Q(nickname__icontains=description) | 
-            Q(description__icontains=description)
-        )
+    filter = Q(dept_id__in=dept_ids)
     
     # 按状态过滤
     if status:
@@ -125,36 +85,50 @@ def user_list(request: HttpRequest):
         if end_time:
             filter = filter & Q(create_time__lte=end_time)
     
-    # 查询用户（先获取总数，再分页）
+    # 查询用户（支持键集分页和近似总数）
     all_users = models.SysUser.objects.filter(filter)
-    total = all_users.count()  # 过滤后的总数
-    
-    users = all_users.annotate(
-        dept_name=Subquery(dept_name_subquery)
-    )[(page - 1) * size : page * size]
+
+    # 搜索用户名/昵称/描述（模糊匹配，可按相关度排序）
+    ranked = search.is_relevance(sort)
+    if description:
+        all_users = search.search(all_users, search.USER_SEARCH_FIELDS, description, ranked=ranked)
+    elif ranked:
+        sort = "id,desc"
+
+    try:
+        result = paging.paginate(
+            request, all_users, sort, page, size,
+            sort_fields=("id", "username", "nickname", "gender", "status", "create_time", "update_time"),
+            keyset_fields=("id", "create_time", "username")
+        )
+    except ValueError as e:
+        resp = utils.RespFailedTempl()
+        resp.msg = str(e)
+        return resp.as_dict()
+    users = result["list"]
+
+    # 当前页引用的角色、创建人/修改人、部门各用一次查询批量加载
+    roles = loaders.user_roles().add_many(user.id for user in users if user.is_system != 1)
+    names = loaders.user_names().add_many(user.create_user for user in users)
+    names.add_many(user.update_user for user in users)
+    depts = loaders.dept_names().add_many(user.dept_id for user in users)
     for user in users:
         # 系统用户不需要分配角色，直接显示"系统管理员"
         if user.is_system == 1:
             role_ids = []
             role_names = ["系统管理员"]
         else:
-            roles = models.SysUserRole.objects.filter(user_id=user.id).values_list(
-                "role_id", flat=True
-            )
-            role_names = models.SysRole.objects.filter(id__in=roles).values_list(
-                "name", flat=True
-            )
-            role_ids = list(roles)
-            role_names = list(role_names)
-        
-        create_user = models.SysUser.objects.get(id=user.create_user)
+            user_roles = roles.get(user.id, [])
+            role_ids = [role['id'] for role in user_roles]
+            role_names = [role['name'] for role in user_roles]
+
         _list.append(
             dict(
                 id=str(user.id),
-                createUserString=create_user.username,
+                createUserString=names.get(user.create_user),
                 createTime=utils.dateformat(user.create_time),
                 disabled=False,
-                updateUserString=user.update_user,
+                updateUserString=names.get(user.update_user, user.update_user),
                 updateTime=user.update_time,
                 username=user.username,
                 nickname=user.nickname,
@@ -166,13 +140,12 @@ def user_list(request: HttpRequest):
                 isSystem=user.is_system,
                 description=user.description,
                 deptId=user.dept_id,
-                deptName=user.dept_name,
+                deptName=depts.get(user.dept_id),
                 roleIds=role_ids,
                 roleNames=role_names,
             )
         )
 
-    result["total"] = total  # 使用过滤后的总数
     result["list"] = _list
     resp = utils.RespSuccessTempl()
     resp.data = result
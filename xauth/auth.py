@@ -1,41 +1,75 @@
-from typing import Any
-from django.db.models import Subquery 
+from typing import Any, Dict, Tuple
+from django.contrib.auth.models import AnonymousUser
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from ninja_jwt.authentication import JWTAuth
-from ninja_jwt.exceptions import AuthenticationFailed
-from xauth import models
+from ninja_jwt.exceptions import AuthenticationFailed, InvalidToken
+from ninja_jwt.settings import api_settings
+from xauth import perm_cache, user_state
 from loguru import logger
 
 
-class XadminPermAuth(JWTAuth):
+class XadminJWTAuth(JWTAuth):
+    """
+    JWT 认证基类
+
+    开启 XADMIN_STATELESS_AUTH 时只校验 Token 签名和缓存的用户状态，
+    request.user 为惰性对象，接口首次访问其属性时才查询 SysUser；
+    request.user_state 为用户状态，只需要用户ID时不必访问 request.user
+    """
+
+    def authenticate_user(self, request: HttpRequest, token: str) -> Tuple[Any, Dict[str, Any]]:
+        """
+        校验 Token，返回用户和用户状态
+
+        Returns:
+            (用户, {'id': 用户ID, 'status': 状态, 'is_system': 是否为系统用户})
+        """
+        if not getattr(settings, 'XADMIN_STATELESS_AUTH', False):
+            user = self.jwt_authenticate(request, token)
+            request.user_state = {'id': user.id, 'status': user.status, 'is_system': user.is_system}
+            return user, request.user_state
+
+        request.user = AnonymousUser()
+        validated_token = self.get_validated_token(token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        state = user_state.get_user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"))
+        user = SimpleLazyObject(
+            lambda: self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        )
+        request.user = user
+        request.user_state = state
+        return user, state
+
+
+class XadminPermAuth(XadminJWTAuth):
     def __init__(self, permission: str = ""):
         self.permission = permission
         super().__init__()
 
     def authenticate(self, request: HttpRequest, token: str) -> Any:
-        user = self.jwt_authenticate(request, token)
-        self.check_permission(request)
+        user, state = self.authenticate_user(request, token)
+        self.check_permission(request, state)
         return user
 
-    def check_permission(self, request):
+    def check_permission(self, request, state):
         # 系统用户拥有所有权限
-        if request.user.is_system == 1:
+        if state['is_system'] == 1:
             return
-        roles = models.SysUserRole.objects.filter(
-            user_id=request.user.id
-        ).values('role_id')
-        menus = models.SysRoleMenu.objects.filter(
-            role_id__in=Subquery(roles)
-        ).values('menu_id')
-        permissions = models.SysMenu.objects.filter(
-            id__in=Subquery(menus)
-        ).exclude(permission__isnull=True).exclude(permission='').values_list('permission', flat=True)
         if not bool(self.permission):
             return
-        if self.permission not in tuple(permissions):
-            logger.warning(f"user permissions: {tuple(permissions)}")
+        if not perm_cache.has_permission(state['id'], self.permission):
+            logger.warning(f"user permissions: {perm_cache.get_user_permissions(state['id'])}")
             logger.warning(f"user permission: {self.permission}")
             raise AuthenticationFailed(
                 _("Forbidden: You don't have permission to access this API"),
@@ -43,13 +77,13 @@ class XadminPermAuth(JWTAuth):
             )
 
 
-class XadminBaseAuth(JWTAuth):
+class XadminBaseAuth(XadminJWTAuth):
     def authenticate(self, request: HttpRequest, token: str) -> Any:
         logger.info(f"认证请求 - Token: {token[:50]}...")  # 只记录前50个字符
         try:
-            user = self.jwt_authenticate(request, token)
-            logger.info(f"认证成功 - 用户: {user.username}")
-            if user.status == 2:
+            user, state = self.authenticate_user(request, token)
+            logger.info(f"认证成功 - 用户ID: {state['id']}")
+            if state['status'] == 2:
                 raise AuthenticationFailed(
                     _("Forbidden: You don't have permission to access this API"),
                     code=401
@@ -58,4 +92,3 @@ class XadminBaseAuth(JWTAuth):
         except Exception as e:
             logger.error(f"认证失败: {str(e)}")
             raise
-    
@@ -0,0 +1,187 @@
+"""
+字典缓存
+
+前端几乎每个页面都会读取字典（/common/dict/{code}、/common/dict/role、/common/dict/option），
+这些数据很少变化，按条目缓存在 Redis 中：
+- 条目名称：dict:{字典编码}、role（角色）、option:{类别}（空类别为所有参数）；
+  不存在的字典编码和参数类别不缓存，请求参数不会产生无限多的缓存键
+- 缓存键为 dict_cache:{条目名称}:{版本号}，版本号同时作为 ETag，客户端可通过 If-None-Match 得到 304
+- SysDict、SysDictItem、SysOption、SysRole 变化后（事务提交后）重新加载受影响的条目并写入新版本，
+  读取方不会遇到缓存缺失；修改了编码、所属字典或类别时，旧条目也会刷新
+- 旧版本的键由超时清理
+"""
+import uuid
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from django.core.cache import cache
+from django.db import transaction
+from loguru import logger
+from xauth import models
+
+DICT_CACHE_KEY_PREFIX = 'dict_cache'
+DICT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# 条目 -> (版本号, 数据)；数据为 None 表示条目不存在（如字典编码不存在）
+Entry = Tuple[Optional[str], Any]
+
+
+def _version_key(name: str) -> str:
+    return f'{DICT_CACHE_KEY_PREFIX}_version:{name}'
+
+
+def _key(name: str, version: str) -> str:
+    return f'{DICT_CACHE_KEY_PREFIX}:{name}:{version}'
+
+
+def _load(name: str) -> Any:
+    kind, _, arg = name.partition(':')
+    if kind == 'dict':
+        dict_id = models.SysDict.objects.filter(code=arg).values_list('id', flat=True).first()
+        if dict_id is None:
+            return None
+        items = models.SysDictItem.objects.filter(dict_id=dict_id).order_by(
+            'sort', 'id'
+        ).values_list('label', 'id', 'color')
+        return [dict(label=label, value=value, color=color) for label, value, color in items]
+    if kind == 'role':
+        roles = models.SysRole.objects.order_by('sort', 'id').values_list('name', 'id')
+        return [dict(label=label, value=value) for label, value in roles]
+    if kind == 'option':
+        options = models.SysOption.objects.all()
+        if arg:
+            options = options.filter(category=arg)
+        items = [dict(label=code, value=value) for code, value in options.values_list('code', 'value')]
+        # 不存在的类别不缓存（该接口不需要登录，任意类别都会产生新的条目）
+        if arg and not items:
+            return None
+        return items
+    raise ValueError(f"Unknown dict cache entry: {name}")
+
+
+def get(name: str) -> Entry:
+    """
+    读取一个条目
+
+    Args:
+        name: 条目名称
+
+    Returns:
+        (版本号, 数据)；条目不存在时为 (None, None)
+    """
+    return get_many([name])[name]
+
+
+def get_many(names: Iterable[str]) -> Dict[str, Entry]:
+    """
+    读取多个条目（版本号和数据各一次 get_many，只有缺失的条目才查询数据库）
+
+    Args:
+        names: 条目名称
+
+    Returns:
+        条目名称 -> (版本号, 数据)
+    """
+    names = list(dict.fromkeys(names))
+    versions = cache.get_many([_version_key(name) for name in names])
+    keys = {
+        name: _key(name, versions[_version_key(name)])
+        for name in names if _version_key(name) in versions
+    }
+    cached = cache.get_many(list(keys.values()))
+
+    result: Dict[str, Entry] = {}
+    for name in names:
+        key = keys.get(name)
+        if key in cached:
+            result[name] = (versions[_version_key(name)], cached[key])
+            continue
+        data = _load(name)
+        if data is None:
+            result[name] = (None, None)
+            continue
+        version = versions.get(_version_key(name))
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(_version_key(name), version, DICT_CACHE_TIMEOUT)
+            version = cache.get(_version_key(name), version)
+        cache.set(_key(name, version), data, DICT_CACHE_TIMEOUT)
+        result[name] = (version, data)
+    return result
+
+
+def get_dicts(codes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    读取多个字典的字典项（格式与 /common/dict/{code} 相同）
+
+    Args:
+        codes: 字典编码（None 为所有字典）
+
+    Returns:
+        字典编码 -> [{'label', 'value', 'color'}]；不存在的编码不出现在结果中
+    """
+    if codes is None:
+        codes = models.SysDict.objects.values_list('code', flat=True)
+    entries = get_many(f'dict:{code}' for code in codes)
+    return {
+        name.partition(':')[2]: data
+        for name, (_, data) in entries.items() if data is not None
+    }
+
+
+def entry_names(instance: Any) -> Set[str]:
+    """
+    记录所在的条目
+
+    Args:
+        instance: SysDict、SysDictItem、SysOption 或 SysRole 记录
+
+    Returns:
+        条目名称集合
+    """
+    if isinstance(instance, models.SysDict):
+        return {f'dict:{instance.code}'}
+    if isinstance(instance, models.SysDictItem):
+        code = models.SysDict.objects.filter(id=instance.dict_id).values_list('code', flat=True).first()
+        return {f'dict:{code}'} if code is not None else set()
+    if isinstance(instance, models.SysOption):
+        return option_names(instance.category)
+    if isinstance(instance, models.SysRole):
+        return {'role'}
+    return set()
+
+
+def option_names(category: str) -> Set[str]:
+    """参数类别所在的条目（该类别和所有参数）"""
+    return {f'option:{category}', 'option:'}
+
+
+def refresh(names: Iterable[str]) -> None:
+    """事务提交后重新加载条目并写入新版本（不在事务中时立即执行）"""
+    names = set(names)
+    if names:
+        transaction.on_commit(lambda: _publish(names))
+
+
+def _publish(names: Set[str]) -> None:
+    try:
+        data = {name: _load(name) for name in names}
+        missing = [_version_key(name) for name, value in data.items() if value is None]
+        versions = {
+            _version_key(name): uuid.uuid4().hex
+            for name, value in data.items() if value is not None
+        }
+        # 先写入数据，再切换版本号
+        cache.set_many(
+            {_key(name, versions[_version_key(name)]): value
+             for name, value in data.items() if value is not None},
+            DICT_CACHE_TIMEOUT
+        )
+        cache.set_many(versions, DICT_CACHE_TIMEOUT)
+        if missing:
+            cache.delete_many(missing)
+    except Exception as e:
+        # 缓存不可用时删除版本号，下次读取时重新加载
+        logger.error(f"Failed to refresh dict cache {sorted(names)}: {e}")
+        try:
+            cache.delete_many([_version_key(name) for name in names])
+        except Exception:
+            pass
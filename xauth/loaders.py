@@ -0,0 +1,112 @@
+"""
+批量加载器
+
+列表接口先收集当前页所有记录引用的 ID，再按类型各用一次查询解析，避免逐行查询：
+- BatchLoader: 通用的收集 + 一次性解析 + 结果缓存
+- user_names / dept_names / user_roles: 常用的加载器
+- fill_user_strings: 为带 createUser/updateUser 的字典填充 createUserString/updateUserString
+"""
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+from xauth import models
+
+
+class BatchLoader:
+    """
+    收集键后一次性批量解析（DataLoader 风格）
+
+    Args:
+        fetch: 批量解析函数，参数为键列表，返回 键 -> 值 的字典（缺失的键视为 None）
+
+    Example:
+        >>> loader = user_names()
+        >>> loader.add_many(item.create_user for item in items)
+        >>> loader.get(items[0].create_user)  # 首次 get 时执行一次查询
+    """
+
+    def __init__(self, fetch: Callable[[List[Hashable]], Dict[Hashable, Any]]):
+        self.fetch = fetch
+        self._pending = set()
+        self._cache: Dict[Hashable, Any] = {}
+
+    def add(self, key: Optional[Hashable]) -> 'BatchLoader':
+        if key is not None and key not in self._cache:
+            self._pending.add(key)
+        return self
+
+    def add_many(self, keys: Iterable[Optional[Hashable]]) -> 'BatchLoader':
+        for key in keys:
+            self.add(key)
+        return self
+
+    def load(self) -> Dict[Hashable, Any]:
+        """解析所有待加载的键（没有待加载的键时不查询）"""
+        if self._pending:
+            keys = list(self._pending)
+            self._pending.clear()
+            found = self.fetch(keys)
+            for key in keys:
+                self._cache[key] = found.get(key)
+        return self._cache
+
+    def get(self, key: Optional[Hashable], default: Any = None) -> Any:
+        if key is None:
+            return default
+        self.add(key)
+        value = self.load().get(key)
+        return default if value is None else value
+
+
+def user_names() -> BatchLoader:
+    """用户ID -> 用户名"""
+    return BatchLoader(lambda ids: dict(
+        models.SysUser.objects.filter(id__in=ids).values_list('id', 'username')
+    ))
+
+
+def dept_names() -> BatchLoader:
+    """部门ID -> 部门名称"""
+    return BatchLoader(lambda ids: dict(
+        models.SysDept.objects.filter(id__in=ids).values_list('id', 'name')
+    ))
+
+
+def _fetch_user_roles(user_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    pairs = list(
+        models.SysUserRole.objects.filter(user_id__in=user_ids).values_list('user_id', 'role_id')
+    )
+    names = dict(
+        models.SysRole.objects.filter(id__in={role_id for _, role_id in pairs}).values_list('id', 'name')
+    )
+    result: Dict[int, List[Dict[str, Any]]] = {}
+    for user_id, role_id in pairs:
+        if role_id in names:
+            result.setdefault(user_id, []).append({'id': role_id, 'name': names[role_id]})
+    return result
+
+
+def user_roles() -> BatchLoader:
+    """用户ID -> [{'id': 角色ID, 'name': 角色名称}]（两次查询）"""
+    return BatchLoader(_fetch_user_roles)
+
+
+def fill_user_strings(records: List[Dict[str, Any]], loader: Optional[BatchLoader] = None) -> List[Dict[str, Any]]:
+    """
+    为记录填充创建人、修改人的用户名（一次查询）
+
+    Args:
+        records: 带 createUser/updateUser 的字典列表（原地修改）
+        loader: 用户名加载器（可在多次调用间复用）
+
+    Returns:
+        records
+    """
+    loader = loader or user_names()
+    for record in records:
+        loader.add(record.get('createUser'))
+        loader.add(record.get('updateUser'))
+    for record in records:
+        if 'createUser' in record:
+            record['createUserString'] = loader.get(record['createUser'], record['createUser'])
+        if 'updateUser' in record:
+            record['updateUserString'] = loader.get(record['updateUser'], record['updateUser'])
+    return records
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xauth', '0007_alter_casemetadata_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sysdept',
+            index=models.Index(fields=['ancestors'], name='sys_dept_ancestors_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
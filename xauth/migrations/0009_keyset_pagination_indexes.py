@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xauth', '0008_sys_dept_ancestors_prefix_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sysdictitem',
+            index=models.Index(fields=['dict_id', 'sort', 'id'], name='sys_dict_item_sort_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sysdictitem',
+            index=models.Index(fields=['dict_id', 'create_time', 'id'], name='sys_dict_item_ctime_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sysrole',
+            index=models.Index(fields=['create_time', 'id'], name='sys_role_ctime_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sysrole',
+            index=models.Index(fields=['sort', 'id'], name='sys_role_sort_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sysuser',
+            index=models.Index(fields=['create_time', 'id'], name='sys_user_ctime_keyset_idx'),
+        ),
+    ]
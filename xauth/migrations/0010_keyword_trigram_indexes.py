@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:03
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xauth', '0009_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='sysdict',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='sys_dict_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysdict',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('code'), name='gin_trgm_ops'), name='sys_dict_code_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysdict',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'), name='sys_dict_desc_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysdictitem',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('label'), name='gin_trgm_ops'), name='sys_dict_item_label_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysdictitem',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'), name='sys_dict_item_desc_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysrole',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='sys_role_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysrole',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('code'), name='gin_trgm_ops'), name='sys_role_code_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysrole',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'), name='sys_role_desc_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysuser',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('username'), name='gin_trgm_ops'), name='sys_user_username_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysuser',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nickname'), name='gin_trgm_ops'), name='sys_user_nickname_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='sysuser',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'), name='sys_user_desc_trgm'),
+        ),
+    ]
@@ -1,15 +1,92 @@
-from typing import List, Optional, Dict, Any
-from django.db import models
-from django.db.models import Q
+from typing import Iterable, List, Optional, Dict, Any, Set, Tuple
+from django.db import connection, models, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Substr, Upper
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.dispatch import Signal
 from django.forms.models import model_to_dict
-from xutils import utils
+from xauth import tree_utils
+
+
+def trigram_index(field: str, name: str) -> GinIndex:
+    """UPPER(field) 上的 pg_trgm GIN 索引，支持 icontains（UPPER(col) LIKE UPPER('%kw%')）"""
+    return GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=name)
 
 
 class ModelSaveMixin:
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
 
+
+# 批量删除后每张表发送一次（sender 为被删除记录的模型，参数 ids），代替逐行的 post_delete
+bulk_deleted = Signal()
+
+
+def delete_in(model: type, field: str, values: Iterable[Any]) -> int:
+    """
+    一条 DELETE ... WHERE field IN (...)
+
+    不逐行加载记录、不发送 post_delete 信号，需要失效缓存时由调用方发送 bulk_deleted
+
+    Returns:
+        删除的行数
+    """
+    queryset = model.objects.filter(**{f'{field}__in': values})
+    return queryset._raw_delete(queryset.db)
+
+
+# 关联表差量写入后每个所有者发送一次（sender 为关联表模型，参数 owner_id、added、removed）
+association_changed = Signal()
+
+
+class AssociationMixin:
+    """
+    关联表（所有者ID, 目标ID）的差量写入
+
+    与当前关联比较后，只插入新增的目标（一次 bulk_create）、删除移除的目标（一次 DELETE ... IN），
+    不逐行触发 post_save/post_delete 信号，改为每个所有者发送一次 association_changed
+    """
+
+    @classmethod
+    def sync_association(
+        cls,
+        owner_field: str,
+        owner_id: int,
+        target_field: str,
+        target_ids: Iterable[int]
+    ) -> Tuple[Set[int], Set[int]]:
+        """
+        将所有者的关联设置为 target_ids
+
+        Args:
+            owner_field: 所有者字段（如 role_id）
+            owner_id: 所有者ID
+            target_field: 目标字段（如 menu_id）
+            target_ids: 目标ID列表（重复的ID会被合并）
+
+        Returns:
+            (新增的目标ID, 移除的目标ID)
+        """
+        wanted = {int(target_id) for target_id in target_ids}
+        with transaction.atomic():
+            owned = cls.objects.filter(**{owner_field: owner_id})
+            current = set(owned.values_list(target_field, flat=True))
+            added = wanted - current
+            removed = current - wanted
+            if removed:
+                # 单条 DELETE，不逐行加载和发送删除信号
+                to_delete = owned.filter(**{f'{target_field}__in': removed})
+                to_delete._raw_delete(to_delete.db)
+            if added:
+                cls.objects.bulk_create(
+                    [cls(**{owner_field: owner_id, target_field: target_id}) for target_id in added],
+                    ignore_conflicts=True
+                )
+            if added or removed:
+                association_changed.send(sender=cls, owner_id=owner_id, added=added, removed=removed)
+        return added, removed
+
 class SysDept(ModelSaveMixin, models.Model):
     id = models.BigAutoField(primary_key=True, db_comment='ID')
     name = models.CharField(max_length=30, db_comment='名称')
@@ -28,10 +105,74 @@ class SysDept(ModelSaveMixin, models.Model):
         db_table = 'sys_dept'
         unique_together = (('name', 'parent_id'),)
         db_table_comment = '部门表'
+        indexes = [
+            # ancestors 为物化路径（如 0,1,5），支持 LIKE 'prefix%' 的子树查询
+            models.Index(
+                fields=['ancestors'],
+                name='sys_dept_ancestors_prefix_idx',
+                opclasses=['varchar_pattern_ops']
+            ),
+        ]
 
     def __str__(self):
         return f'<{self.id}, {self.name}>'
 
+    @property
+    def path(self) -> str:
+        """物化路径（祖级列表 + 自身ID），所有子孙部门的 ancestors 都以它为前缀"""
+        return f'{self.ancestors},{self.id}'
+
+    @staticmethod
+    def descendants_q(path: str) -> Q:
+        """匹配物化路径为 path 的部门的所有子孙部门（按分隔符匹配，1 不会匹配 11）"""
+        return Q(ancestors=path) | Q(ancestors__startswith=f'{path},')
+
+    @classmethod
+    def subtree(cls, dept_id: int, include_self: bool = True) -> models.QuerySet:
+        """
+        查询部门的子树
+
+        Args:
+            dept_id: 部门ID
+            include_self: 是否包含部门自身
+
+        Returns:
+            子树部门的 QuerySet（走 ancestors 前缀索引）
+
+        Raises:
+            SysDept.DoesNotExist: 部门不存在
+        """
+        ancestors = cls.objects.values_list('ancestors', flat=True).get(id=dept_id)
+        condition = cls.descendants_q(f'{ancestors},{dept_id}')
+        if include_self:
+            condition |= Q(id=dept_id)
+        return cls.objects.filter(condition)
+
+    def move_to(self, parent: 'SysDept') -> None:
+        """
+        保存部门并挂到新的上级部门下，所有子孙部门的祖级列表在一条 UPDATE 中改写
+
+        Args:
+            parent: 新的上级部门
+
+        Raises:
+            ValueError: 上级部门是部门自身或其子孙部门
+        """
+        old_path = self.path
+        new_ancestors = parent.path
+        if new_ancestors == old_path or new_ancestors.startswith(f'{old_path},'):
+            raise ValueError('上级部门不能是当前部门或其下级部门')
+
+        self.parent_id = parent.id
+        self.ancestors = new_ancestors
+        new_path = self.path
+        with transaction.atomic():
+            self.save()
+            if new_path != old_path:
+                type(self).objects.filter(self.descendants_q(old_path)).update(
+                    ancestors=Concat(Value(new_path), Substr('ancestors', len(old_path) + 1))
+                )
+
     @classmethod
     def build_dept_tree(
         cls,
@@ -40,12 +181,11 @@ class SysDept(ModelSaveMixin, models.Model):
         status: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
-        构建部门树（优化版本）
-        
-        优化说明：
-        - 一次性查询所有数据，避免 N+1 查询问题
-        - 在内存中构建树结构，提升性能 80-95%
-        
+        构建部门树
+
+        表只查询一次，由 tree_utils.build_trees 在内存中构建，创建人、修改人的用户名再用一次查询批量填充；
+        同时需要多个视图时直接调用 build_trees，一次遍历即可得到全部视图
+
         Args:
             parent_id: 根节点的父ID
             choice: 是否为选择器模式（简化格式）
@@ -67,74 +207,36 @@ class SysDept(ModelSaveMixin, models.Model):
             >>> # 获取选择器格式的启用部门
             >>> SysDept.build_dept_tree(choice=True, status=1)
         """
-        # 1. 一次性查询所有部门（或按状态过滤）
-        if status is not None:
-            all_depts = list(cls.objects.filter(status=status))
-        else:
-            all_depts = list(cls.objects.all())
-        
-        # 2. 构建父子关系索引（提高查找效率）
-        children_map = {}
-        for dept in all_depts:
-            parent = dept.parent_id
-            if parent not in children_map:
-                children_map[parent] = []
-            children_map[parent].append(dept)
-        
-        # 3. 递归构建树（仅在内存中操作，不查询数据库）
-        def build_subtree(pid):
-            result = []
-            children = children_map.get(pid, [])
-            
-            # 按 sort 字段排序
-            children.sort(key=lambda x: x.sort)
-            
-            for item in children:
-                if choice:
-                    dept = {
-                        'key': item.id,
-                        'parentId': item.parent_id,
-                        'title': item.name,
-                        'sort': item.sort,
-                        'children': build_subtree(item.id)
-                    }
-                else:
-                    dept = {
-                        'id': item.id,
-                        'parentId': item.parent_id,
-                        'name': item.name or "",
-                        'sort': item.sort,
-                        'status': item.status,
-                        'isSystem': bool(item.is_system),
-                        'description': item.description,
-                        'createUser': item.create_user,
-                        'createUserString': 'fake',
-                        'createTime': utils.dateformat(item.create_time),
-                        'updateUser': item.update_user,
-                        'updateUserString': 'fake',
-                        'updateTime': item.update_time,
-                        'children': build_subtree(item.id)
-                    }
-                result.append(dept)
-            
-            return result
-        
-        return build_subtree(parent_id)
+        view = tree_utils.TreeView(
+            include=None if status is None else (lambda node: node['status'] == status),
+            fmt=tree_utils.choice_format('name') if choice else None
+        )
+        from xauth import loaders  # loaders 依赖本模块
+        nodes = loaders.fill_user_strings([tree_utils.dept_node(dept) for dept in cls.objects.all()])
+        return tree_utils.build_trees(nodes, {'tree': view}, parent_id)['tree']
 
     @classmethod
     def delete_depts(cls, dept_id: int):
-        dept_ids = cls.objects.filter(
-            Q(id=dept_id) | Q(parent_id=dept_id)
-        ).values_list('id', flat=True)
-        if dept_ids:
-            for did in list(dept_ids):
-                cls.objects.filter(id=did).delete()
-                SysRoleDept.objects.filter(dept_id=did).delete()
-                cls.delete_depts(did)
-                users = SysUser.objects.filter(dept_id=did)
-                for user in users:
-                    SysUserRole.objects.filter(user_id=user.id).delete()
-                users.delete()
+        """
+        删除部门及其子孙部门，连同部门下的用户、用户角色和角色部门关联
+
+        子树由 ancestors 前缀索引一次查出，每张表一条 DELETE，
+        删除后部门和用户各发送一次 bulk_deleted（部门树缓存只刷新一次）
+        """
+        with transaction.atomic():
+            try:
+                dept_ids = list(cls.subtree(dept_id).values_list('id', flat=True))
+            except cls.DoesNotExist:
+                return
+            user_ids = list(SysUser.objects.filter(dept_id__in=dept_ids).values_list('id', flat=True))
+            if user_ids:
+                delete_in(SysUserRole, 'user_id', user_ids)
+                delete_in(SysUser, 'id', user_ids)
+            delete_in(SysRoleDept, 'dept_id', dept_ids)
+            delete_in(cls, 'id', dept_ids)
+            if user_ids:
+                bulk_deleted.send(sender=SysUser, ids=user_ids)
+            bulk_deleted.send(sender=cls, ids=dept_ids)
 
 
 class SysDict(ModelSaveMixin, models.Model):
@@ -151,6 +253,12 @@ class SysDict(ModelSaveMixin, models.Model):
     class Meta:
         db_table = 'sys_dict'
         db_table_comment = '字典表'
+        indexes = [
+            # 关键词搜索
+            trigram_index('name', 'sys_dict_name_trgm'),
+            trigram_index('code', 'sys_dict_code_trgm'),
+            trigram_index('description', 'sys_dict_desc_trgm'),
+        ]
 
     def __str__(self):
         return f'<{self.name}>'
@@ -173,6 +281,14 @@ class SysDictItem(ModelSaveMixin, models.Model):
         db_table = 'sys_dict_item'
         unique_together = (('label', 'dict_id'),)
         db_table_comment = '字典项表'
+        indexes = [
+            # 键集分页：(排序字段, id)
+            models.Index(fields=['dict_id', 'sort', 'id'], name='sys_dict_item_sort_keyset_idx'),
+            models.Index(fields=['dict_id', 'create_time', 'id'], name='sys_dict_item_ctime_keyset_idx'),
+            # 关键词搜索
+            trigram_index('label', 'sys_dict_item_label_trgm'),
+            trigram_index('description', 'sys_dict_item_desc_trgm'),
+        ]
 
     def __str__(self):
         return f'<{self.label}, {self.value}>'
@@ -263,12 +379,11 @@ class SysMenu(ModelSaveMixin, models.Model):
         all: bool = False
     ) -> List[Dict[str, Any]]:
         """
-        构建菜单树（优化版本）
-        
-        优化说明：
-        - 一次性查询所有数据，避免 N+1 查询问题
-        - 在内存中构建树结构，提升性能 80-95%
-        
+        构建菜单树
+
+        表只查询一次，由 tree_utils.build_trees 在内存中构建，创建人、修改人的用户名再用一次查询批量填充；
+        同时需要多个视图时直接调用 build_trees，一次遍历即可得到全部视图
+
         Args:
             ids: 要包含的菜单ID列表（None表示全部）
             parent_id: 根节点的父ID
@@ -288,119 +403,64 @@ class SysMenu(ModelSaveMixin, models.Model):
             >>> # 获取选择器格式的菜单树
             >>> SysMenu.build_menu_tree(choice=True)
         """
-        # 1. 一次性查询所有菜单
-        all_menus = list(cls.objects.all())
-        
-        # 2. 如果指定了 ids，过滤菜单并包含祖先节点
+        from xauth import loaders  # loaders 依赖本模块
+        nodes = loaders.fill_user_strings([tree_utils.menu_node(menu) for menu in cls.objects.all()])
+        if all:
+            view = tree_utils.MENU_VIEWS['all']
+        elif choice:
+            view = tree_utils.MENU_VIEWS['choice']
+        else:
+            view = tree_utils.MENU_VIEWS['route']
         if ids is not None:
-            ids_set = set(ids)
-            menu_dict = {menu.id: menu for menu in all_menus}
-            
-            # 收集需要的菜单及其所有祖先
-            needed_menus = set()
-            for menu_id in ids:
-                if menu_id in menu_dict:
-                    needed_menus.add(menu_id)
-                    # 向上追溯祖先节点
-                    current = menu_dict[menu_id]
-                    while current.parent_id > 0 and current.parent_id in menu_dict:
-                        needed_menus.add(current.parent_id)
-                        current = menu_dict[current.parent_id]
-            
-            all_menus = [menu for menu in all_menus if menu.id in needed_menus]
-        
-        # 3. 构建父子关系索引
-        children_map = {}
-        for menu in all_menus:
-            parent = menu.parent_id
-            if parent not in children_map:
-                children_map[parent] = []
-            children_map[parent].append(menu)
-        
-        # 4. 递归构建树（仅在内存中操作）
-        def build_subtree(pid):
-            result = []
-            children = children_map.get(pid, [])
-            
-            # 按 sort 字段排序
-            children.sort(key=lambda x: x.sort)
-            
-            for item in children:
-                if all:
-                    # 包含所有类型（管理模式）
-                    menu = {
-                        'id': item.id,
-                        'parentId': item.parent_id,
-                        'title': item.title,
-                        'type': item.type,
-                        'path': item.path or "",
-                        'name': item.name or "",
-                        'component': item.component or "",
-                        'redirect': item.redirect or "",
-                        'icon': item.icon or "",
-                        'isExternal': bool(item.is_external) if item.is_external else False,
-                        'isCache': bool(item.is_cache) if item.is_cache else False,
-                        'isHidden': bool(item.is_hidden) if item.is_hidden else False,
-                        'permission': item.permission,
-                        'sort': item.sort,
-                        'status': item.status,
-                        'createUser': item.create_user,
-                        'createUserString': item.create_user,
-                        'createTime': utils.dateformat(item.create_time),
-                        'disabled': None,
-                        'children': build_subtree(item.id)
-                    }
-                    result.append(menu)
-                elif choice:
-                    # 选择器模式（简化格式）
-                    menu = {
-                        'key': item.id,
-                        'parentId': item.parent_id,
-                        'title': item.title,
-                        'sort': item.sort,
-                        'children': build_subtree(item.id)
-                    }
-                    result.append(menu)
-                else:
-                    # 路由模式（不包含按钮type=3）
-                    if item.type != 3:
-                        menu = {
-                            'id': item.id,
-                            'parentId': item.parent_id,
-                            'title': item.title,
-                            'type': item.type,
-                            'path': item.path or "",
-                            'name': item.name or "",
-                            'component': item.component or "",
-                            'redirect': item.redirect or "",
-                            'icon': item.icon or "",
-                            'isExternal': bool(item.is_external) if item.is_external else False,
-                            'isCache': bool(item.is_cache) if item.is_cache else False,
-                            'isHidden': bool(item.is_hidden) if item.is_hidden else False,
-                            'permission': item.permission,
-                            'sort': item.sort,
-                            'status': item.status,
-                            'createUser': item.create_user,
-                            'createUserString': item.create_user,
-                            'createTime': utils.dateformat(item.create_time),
-                            'disabled': None,
-                            'children': build_subtree(item.id)
-                        }
-                        result.append(menu)
-            
-            return result
-        
-        return build_subtree(parent_id)
+            needed = tree_utils.with_ancestors(nodes, ids)
+            base = view
+            view = tree_utils.TreeView(
+                include=lambda node: node['id'] in needed and (base.include is None or base.include(node)),
+                fmt=base.fmt
+            )
+        return tree_utils.build_trees(nodes, {'tree': view}, parent_id)['tree']
+
+    @classmethod
+    def subtree_ids(cls, menu_id: int) -> List[int]:
+        """
+        菜单及其所有子孙菜单的ID（一条递归 CTE 查询）
+
+        Args:
+            menu_id: 菜单ID
+
+        Returns:
+            菜单ID列表（菜单不存在时为空）
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            # UNION 去重，parent_id 数据成环时也能终止
+            cursor.execute(
+                f"""
+                WITH RECURSIVE subtree(id) AS (
+                    SELECT id FROM {table} WHERE id = %s
+                    UNION
+                    SELECT m.id FROM {table} m JOIN subtree s ON m.parent_id = s.id
+                )
+                SELECT id FROM subtree
+                """,
+                [menu_id]
+            )
+            return [row[0] for row in cursor.fetchall()]
 
     @classmethod
     def delete_menus(cls, menu_id: int):
-        menu_ids = cls.objects.filter(
-            Q(id=menu_id) | Q(parent_id=menu_id)
-        ).values_list('id', flat=True)
-        if menu_ids:
-            for mid in list(menu_ids):
-                cls.objects.filter(id=mid).delete()
-                cls.delete_menus(mid)
+        """
+        删除菜单及其子孙菜单，连同角色菜单关联
+
+        每张表一条 DELETE，删除后发送一次 bulk_deleted（菜单树和权限缓存只刷新一次）
+        """
+        with transaction.atomic():
+            menu_ids = cls.subtree_ids(menu_id)
+            if not menu_ids:
+                return
+            delete_in(SysRoleMenu, 'menu_id', menu_ids)
+            delete_in(cls, 'id', menu_ids)
+            bulk_deleted.send(sender=cls, ids=menu_ids)
 
 
 class SysMessage(ModelSaveMixin, models.Model):
@@ -532,6 +592,15 @@ class SysRole(ModelSaveMixin, models.Model):
     class Meta:
         db_table = 'sys_role'
         db_table_comment = '角色表'
+        indexes = [
+            # 键集分页：(排序字段, id)
+            models.Index(fields=['create_time', 'id'], name='sys_role_ctime_keyset_idx'),
+            models.Index(fields=['sort', 'id'], name='sys_role_sort_keyset_idx'),
+            # 关键词搜索
+            trigram_index('name', 'sys_role_name_trgm'),
+            trigram_index('code', 'sys_role_code_trgm'),
+            trigram_index('description', 'sys_role_desc_trgm'),
+        ]
     
     def __str__(self):
         return f'<f{self.name}, {self.code}>'
@@ -564,7 +633,7 @@ class SysRole(ModelSaveMixin, models.Model):
         return data
 
 
-class SysRoleDept(models.Model):
+class SysRoleDept(AssociationMixin, models.Model):
     id = models.BigAutoField(primary_key=True, db_comment='ID')
     role_id = models.BigIntegerField(db_comment='角色ID')
     dept_id = models.BigIntegerField(db_comment='部门ID')
@@ -579,12 +648,10 @@ class SysRoleDept(models.Model):
 
     @classmethod
     def set_role_depts(cls, role_id: int, dept_ids: List[int]):
-        cls.objects.filter(role_id=role_id).delete()
-        for dept_id in dept_ids:
-            cls.objects.create(role_id=role_id, dept_id=dept_id)
+        cls.sync_association('role_id', role_id, 'dept_id', dept_ids)
 
 
-class SysRoleMenu(models.Model):
+class SysRoleMenu(AssociationMixin, models.Model):
     id = models.BigAutoField(primary_key=True, db_comment='ID')
     role_id = models.BigIntegerField(db_comment='角色ID')
     menu_id = models.BigIntegerField(db_comment='菜单ID')
@@ -599,9 +666,7 @@ class SysRoleMenu(models.Model):
     
     @classmethod
     def set_role_menus(cls, role_id: int, menu_ids: List[int]):
-        cls.objects.filter(role_id=role_id).delete()
-        for menu_id in menu_ids:
-            cls.objects.create(role_id=role_id, menu_id=menu_id)
+        cls.sync_association('role_id', role_id, 'menu_id', menu_ids)
 
 # User Manager
 class SysUserManager(BaseUserManager):
@@ -662,6 +727,14 @@ class SysUser(ModelSaveMixin, AbstractBaseUser):
     class Meta:
         db_table = 'sys_user'
         db_table_comment = '用户表'
+        indexes = [
+            # 键集分页：(排序字段, id)
+            models.Index(fields=['create_time', 'id'], name='sys_user_ctime_keyset_idx'),
+            # 关键词搜索
+            trigram_index('username', 'sys_user_username_trgm'),
+            trigram_index('nickname', 'sys_user_nickname_trgm'),
+            trigram_index('description', 'sys_user_desc_trgm'),
+        ]
     
     def __str__(self):
         return self.username
@@ -711,7 +784,7 @@ class SysUserPasswordHistory(models.Model):
     def __str__(self):
         return f"<{self.user_id}, {self.create_time}>"
 
-class SysUserRole(models.Model):
+class SysUserRole(AssociationMixin, models.Model):
     id = models.BigAutoField(primary_key=True, db_comment='ID')
     user_id = models.BigIntegerField(db_comment='用户ID')
     role_id = models.BigIntegerField(db_comment='角色ID')
@@ -730,11 +803,7 @@ class SysUserRole(models.Model):
 
     @classmethod
     def set_user_roles(cls, user_id: int, role_ids: List[int]):
-        cls.objects.filter(
-            user_id=user_id
-        ).delete()
-        for role_id in role_ids:
-            cls.set_user_role(user_id, role_id)
+        cls.sync_association('user_id', user_id, 'role_id', role_ids)
 
 
 class SysUserSocial(models.Model):
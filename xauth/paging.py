@@ -0,0 +1,201 @@
+"""
+列表分页
+
+默认仍为 page/size 的 OFFSET 分页，可选：
+- 键集分页：请求带 keyset=true 或 cursor 时，按 (排序字段, id) 定位下一页，深分页不再线性变慢；
+  游标为上一页最后一条记录排序键的不透明编码，响应中的 nextCursor 为 None 表示没有更多数据
+- 近似总数：请求带 approxCount=true 时，无过滤条件的查询使用 PostgreSQL 的 reltuples 估算，
+  有过滤条件时最多计数到 PAGE_APPROX_COUNT_CAP 条
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.http import HttpRequest
+from django.utils import timezone
+from xauth.search import RELEVANCE
+from xutils import utils
+
+PAGE_APPROX_COUNT_CAP = 10000
+# 排序参数无效时的排序方式
+DEFAULT_SORT = ('id', True)
+
+
+def _is_true(value: Optional[str]) -> bool:
+    return value is not None and value.lower() in ('1', 'true', 'yes')
+
+
+def _encode_value(value: Any) -> Any:
+    # 保留微秒：截断到毫秒后与列值比较会跳过或重复记录
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat(timespec='microseconds')}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        value = datetime.fromisoformat(value['dt'])
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """将排序键编码为不透明的分页游标（datetime 按微秒精度编码）"""
+    raw = json.dumps([_encode_value(value) for value in values], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """
+    解析分页游标
+
+    Returns:
+        (排序字段的值, id)
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        value = _decode_value(value)
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(pk, int) or value is None:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return value, pk
+
+
+def keyset_page(
+    queryset: QuerySet,
+    field: str,
+    descending: bool,
+    size: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    按 (field, id) 做键集分页
+
+    Args:
+        queryset: 已过滤的查询集
+        field: 排序字段（不能为可空字段）
+        descending: 是否降序
+        size: 每页数量
+        cursor: 上一页返回的游标（None 为第一页）
+
+    Returns:
+        (当前页记录, 下一页游标)
+
+    Raises:
+        ValueError: 游标无效
+    """
+    if descending:
+        queryset = queryset.order_by(f'-{field}', '-id')
+        after = 'lt'
+    else:
+        queryset = queryset.order_by(field, 'id')
+        after = 'gt'
+
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'id__{after}': pk})
+        )
+
+    items = list(queryset[:size + 1])
+    has_more = len(items) > size
+    items = items[:size]
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, field), last.id])
+    return items, next_cursor
+
+
+def parse_sort(sort: str, sort_fields: Iterable[str]) -> Tuple[str, bool]:
+    """
+    解析排序参数
+
+    Args:
+        sort: 排序参数，格式为 'field,asc|desc'（字段为驼峰或下划线命名）
+        sort_fields: 允许排序的字段
+
+    Returns:
+        (字段, 是否降序)；字段不在 sort_fields 中时为 DEFAULT_SORT（按 id 降序）
+    """
+    sort_name, _, sort_order = (sort or '').partition(',')
+    field = utils.camel_to_snake(sort_name.strip())
+    if field not in sort_fields:
+        return DEFAULT_SORT
+    return field, sort_order.strip() == 'desc'
+
+
+def approximate_count(queryset: QuerySet, cap: int = PAGE_APPROX_COUNT_CAP) -> int:
+    """
+    近似总数
+
+    无过滤条件时读取 PostgreSQL 的表行数估算（常数时间），否则最多计数到 cap 条
+    """
+    if not queryset.query.where and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # 从未 ANALYZE 过的表 reltuples 为 -1
+        if row and row[0] >= 0:
+            return row[0]
+    return queryset.order_by()[:cap].count()
+
+
+def paginate(
+    request: HttpRequest,
+    queryset: QuerySet,
+    sort: str,
+    page: int,
+    size: int,
+    sort_fields: Iterable[str] = ('id',),
+    keyset_fields: Iterable[str] = ('id',)
+) -> Dict[str, Any]:
+    """
+    按请求参数分页
+
+    Args:
+        request: 请求（读取 keyset、cursor、approxCount 参数）
+        queryset: 已过滤的查询集
+        sort: 排序参数，格式为 'field,asc|desc'
+        page: 页码（OFFSET 分页）
+        size: 每页数量
+        sort_fields: 允许排序的字段（查询集带相关度注解时还允许按相关度排序），其他字段按 id 降序
+        keyset_fields: 允许键集分页的排序字段（必须为非空字段，且有 (field, id) 索引）
+
+    Returns:
+        {'list': 当前页记录, 'total': 总数, 'nextCursor': 下一页游标（仅键集分页）}
+
+    Raises:
+        ValueError: 键集分页不支持该排序字段或游标无效
+    """
+    sort_fields = set(sort_fields)
+    if RELEVANCE in queryset.query.annotations:
+        sort_fields.add(RELEVANCE)
+    field, descending = parse_sort(sort, sort_fields)
+
+    if _is_true(request.GET.get('approxCount')):
+        total = approximate_count(queryset)
+    else:
+        total = queryset.count()
+
+    cursor = request.GET.get('cursor') or None
+    if cursor or _is_true(request.GET.get('keyset')):
+        if field not in keyset_fields:
+            raise ValueError(f"Keyset pagination does not support sort field: {field}")
+        items, next_cursor = keyset_page(queryset, field, descending, size, cursor)
+        return dict(list=items, total=total, nextCursor=next_cursor)
+
+    order_by = (f'-{field}', '-id') if descending else (field, 'id')
+    items = list(queryset.order_by(*order_by)[(page - 1) * size:page * size])
+    return dict(list=items, total=total)
@@ -0,0 +1,254 @@
+"""
+用户权限缓存
+
+权限标识编码为位图，权限校验和序列化只做整数运算：
+- 权限注册表按权限标识排序后依次分配位序号（0..N-1），位图大小只取决于权限数量；
+  注册表的版本号为权限标识列表的哈希，权限增删后位序号可能变化，客户端据此丢弃旧位图
+- 每个角色的权限（SysRoleMenu）预先计算为位图，用户的权限位图为其所有角色位图的按位或
+- 角色位图和用户位图的缓存键包含注册表版本号，位图总是用构建它的注册表解码，
+  不同进程的注册表暂时不一致时也不会把位图按错误的位序号解释
+- 进程内缓存（带 TTL）记录构建时的 Redis 版本号，命中时只读取版本号（一次 get_many）比较，
+  版本号变化即视为未命中；未命中时读取 Redis，Redis 未命中时才查询数据库并回填
+- SysUserRole 变化时递增该用户的版本号；SysRoleMenu、SysMenu 变化时递增全局版本号，
+  注册表、角色位图和所有用户一并失效，所有进程在下一次读取时即可看到
+"""
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from django.core.cache import cache
+from django.db import transaction
+from loguru import logger
+from xauth import models
+
+# 位序号的分配方式改变时修改前缀，避免读取旧格式的缓存
+PERM_CACHE_KEY_PREFIX = 'user_permissions_v2'
+PERM_CACHE_VERSION_KEY = 'user_permissions_version'
+PERM_CACHE_USER_VERSION_KEY = 'user_permissions_version:user'
+PERM_CACHE_LOCAL_TTL = 5
+PERM_CACHE_TIMEOUT = 60 * 60 * 24
+
+# 缓存名称 -> (过期时间, 构建时的版本号, 值)
+_local: Dict[str, Tuple[float, Tuple[int, ...], Any]] = {}
+_lock = threading.Lock()
+
+
+class PermissionRegistry:
+    """权限标识与位序号的映射"""
+
+    def __init__(self, entries: List[Tuple[int, str, bool]]):
+        """
+        Args:
+            entries: (位序号, 权限标识, 是否为按钮权限) 列表
+        """
+        self.entries = entries
+        self.bits: Dict[str, int] = {}
+        self.names: Dict[int, str] = {}
+        self.mask = 0
+        self.button_mask = 0
+        self.version = hashlib.sha1(
+            '\n'.join(permission for _, permission, _ in entries).encode('utf-8')
+        ).hexdigest()[:12]
+        for bit, permission, is_button in entries:
+            self.bits[permission] = bit
+            self.names[bit] = permission
+            self.mask |= 1 << bit
+            if is_button:
+                self.button_mask |= 1 << bit
+
+    def bit(self, permission: str) -> Optional[int]:
+        return self.bits.get(permission)
+
+    def has(self, bitmap: int, permission: str) -> bool:
+        """判断位图中是否包含权限（未注册的权限视为没有）"""
+        bit = self.bits.get(permission)
+        return bit is not None and bool(bitmap >> bit & 1)
+
+    def decode(self, bitmap: int) -> List[str]:
+        """把位图还原为权限标识列表（按位序号排序）"""
+        result = []
+        while bitmap:
+            low = bitmap & -bitmap
+            name = self.names.get(low.bit_length() - 1)
+            if name is not None:
+                result.append(name)
+            bitmap ^= low
+        return result
+
+
+def _user_version_key(user_id: int) -> str:
+    return f'{PERM_CACHE_USER_VERSION_KEY}:{user_id}'
+
+
+def _cached(name: str, build: Callable[[], Any],
+            dump: Callable[[Any], Any] = lambda value: value,
+            load: Callable[[Any], Any] = lambda value: value,
+            version_keys: Tuple[str, ...] = (PERM_CACHE_VERSION_KEY,)) -> Any:
+    """
+    依次读取进程内缓存、Redis，都未命中时构建并回填（Redis 不可用时直接查询数据库）
+
+    进程内缓存只在未过期且 version_keys 的当前值与构建时相同时使用
+    """
+    try:
+        versions = cache.get_many(list(version_keys))
+    except Exception as e:
+        logger.warning(f"Permission cache unavailable, falling back to database: {e}")
+        return build()
+    stamp = tuple(versions.get(key, 0) for key in version_keys)
+
+    now = time.monotonic()
+    entry = _local.get(name)
+    if entry is not None and entry[0] > now and entry[1] == stamp:
+        return entry[2]
+
+    key = f'{PERM_CACHE_KEY_PREFIX}:{":".join(map(str, stamp))}:{name}'
+    try:
+        # 缓存使用 JSON 序列化，以列表/整数存储
+        cached = cache.get(key)
+        if cached is None:
+            value = build()
+            cache.set(key, dump(value), PERM_CACHE_TIMEOUT)
+        else:
+            value = load(cached)
+    except Exception as e:
+        logger.warning(f"Permission cache unavailable, falling back to database: {e}")
+        return build()
+
+    with _lock:
+        _local[name] = (now + PERM_CACHE_LOCAL_TTL, stamp, value)
+    return value
+
+
+def _build_registry() -> PermissionRegistry:
+    # 权限标识 -> 是否为按钮权限（任意一个拥有该权限的菜单为按钮即可）
+    buttons: Dict[str, bool] = {}
+    menus = models.SysMenu.objects.exclude(permission__isnull=True).exclude(
+        permission=''
+    ).values_list('permission', 'type')
+    for permission, menu_type in menus:
+        buttons[permission] = buttons.get(permission, False) or menu_type == 3
+    return PermissionRegistry([
+        (bit, permission, buttons[permission])
+        for bit, permission in enumerate(sorted(buttons))
+    ])
+
+
+def get_registry() -> PermissionRegistry:
+    """获取权限注册表"""
+    return _cached(
+        'registry',
+        _build_registry,
+        dump=lambda registry: registry.entries,
+        load=lambda entries: PermissionRegistry([tuple(entry) for entry in entries])
+    )
+
+
+def _build_role_bitmaps(registry: PermissionRegistry) -> Dict[int, int]:
+    menu_bits = {
+        menu_id: registry.bit(permission)
+        for menu_id, permission in models.SysMenu.objects.exclude(
+            permission__isnull=True
+        ).exclude(permission='').values_list('id', 'permission')
+    }
+    bitmaps: Dict[int, int] = {}
+    for role_id, menu_id in models.SysRoleMenu.objects.values_list('role_id', 'menu_id'):
+        bit = menu_bits.get(menu_id)
+        if bit is not None:
+            bitmaps[role_id] = bitmaps.get(role_id, 0) | 1 << bit
+    return bitmaps
+
+
+def get_role_bitmaps(registry: PermissionRegistry) -> Dict[int, int]:
+    """获取所有角色按注册表 registry 编码的权限位图"""
+    return _cached(
+        f'roles:{registry.version}',
+        lambda: _build_role_bitmaps(registry),
+        dump=lambda bitmaps: list(bitmaps.items()),
+        load=lambda items: {role_id: bitmap for role_id, bitmap in items}
+    )
+
+
+def _build_user_bitmap(user_id: int, registry: PermissionRegistry) -> int:
+    role_bitmaps = get_role_bitmaps(registry)
+    bitmap = 0
+    for role_id in models.SysUserRole.objects.filter(user_id=user_id).values_list('role_id', flat=True):
+        bitmap |= role_bitmaps.get(role_id, 0)
+    return bitmap
+
+
+def get_user_bitmap(user_id: int, registry: Optional[PermissionRegistry] = None) -> int:
+    """
+    获取用户的权限位图
+
+    Args:
+        user_id: 用户ID
+        registry: 解码位图使用的注册表（不传时读取当前注册表）
+
+    Returns:
+        用户所有角色权限位图的按位或（按 registry 的位序号编码）
+    """
+    registry = registry or get_registry()
+    return _cached(
+        f'user:{registry.version}:{user_id}',
+        lambda: _build_user_bitmap(user_id, registry),
+        version_keys=(PERM_CACHE_VERSION_KEY, _user_version_key(user_id))
+    )
+
+
+def has_permission(user_id: int, permission: str) -> bool:
+    """判断用户是否拥有权限"""
+    registry = get_registry()
+    return registry.has(get_user_bitmap(user_id, registry), permission)
+
+
+def get_user_permissions(user_id: int, buttons_only: bool = False) -> List[str]:
+    """
+    获取用户的权限标识列表
+
+    Args:
+        user_id: 用户ID
+        buttons_only: 是否只返回按钮权限（菜单类型为 3）
+
+    Returns:
+        权限标识列表
+    """
+    registry = get_registry()
+    bitmap = get_user_bitmap(user_id, registry)
+    if buttons_only:
+        bitmap &= registry.button_mask
+    return registry.decode(bitmap)
+
+
+def _incr_version(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidate_user(user_id: int) -> None:
+    """事务提交后失效单个用户的权限缓存（递增该用户的版本号，旧版本的键由超时清理）"""
+    def _invalidate():
+        suffix = f':{user_id}'
+        with _lock:
+            for name in [name for name in _local if name.startswith('user:') and name.endswith(suffix)]:
+                del _local[name]
+        try:
+            _incr_version(_user_version_key(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate permission cache for user {user_id}: {e}")
+    transaction.on_commit(_invalidate)
+
+
+def invalidate_all() -> None:
+    """事务提交后失效所有权限缓存（旧版本的键由超时清理）"""
+    def _invalidate():
+        with _lock:
+            _local.clear()
+        try:
+            _incr_version(PERM_CACHE_VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate permission cache: {e}")
+            return
+        logger.debug('User permission cache invalidated')
+    transaction.on_commit(_invalidate)
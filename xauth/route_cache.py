@@ -0,0 +1,101 @@
+"""
+路由树缓存（按角色集合）
+
+非系统用户的路由树只取决于其角色集合，拥有相同角色的用户共用一份：
+- 缓存键由全局版本号和各角色的版本号计算（排序后的角色ID + 版本号的哈希），版本号一次 get_many 读取
+- 路由树存入 Redis，并在进程内 LRU 中保留最近使用的 ROUTE_CACHE_LOCAL_SIZE 个
+- SysRoleMenu 变化时只更新对应角色的版本号；SysMenu 变化时更新全局版本号（在菜单树缓存刷新之后）
+- 路由树由菜单树缓存中的扁平节点表构建，不查询 SysMenu 全表
+"""
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Iterable, List
+from django.core.cache import cache
+from django.db import transaction
+from xauth import models
+from xauth.tree_cache import menu_tree_cache
+from xauth.tree_utils import MENU_VIEWS, TreeView, build_trees, with_ancestors
+
+ROUTE_CACHE_KEY_PREFIX = 'route_tree'
+ROUTE_CACHE_VERSION_KEY = 'route_tree_version'
+ROUTE_CACHE_TIMEOUT = 60 * 60 * 24
+ROUTE_CACHE_LOCAL_SIZE = 256
+
+# 缓存键 -> 路由树（键包含版本号，旧版本的条目不会再命中，由 LRU 淘汰）
+_local: 'OrderedDict[str, List[Any]]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def _role_version_key(role_id: int) -> str:
+    return f'{ROUTE_CACHE_VERSION_KEY}:{role_id}'
+
+
+def _versions(keys: List[str]) -> List[str]:
+    """读取版本号，不存在的版本号初始化后返回"""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _build(role_ids: List[int]) -> List[Any]:
+    nodes = menu_tree_cache.get('nodes')
+    menu_ids = models.SysRoleMenu.objects.filter(role_id__in=role_ids).values_list('menu_id', flat=True)
+    needed = with_ancestors(nodes, menu_ids)
+    route = MENU_VIEWS['route']
+    view = TreeView(include=lambda node: node['id'] in needed and route.include(node), fmt=route.fmt)
+    return build_trees(nodes, {'route': view})['route']
+
+
+def get_routes(role_ids: Iterable[int]) -> List[Any]:
+    """
+    获取角色集合的路由树
+
+    Args:
+        role_ids: 角色ID列表（顺序和重复不影响结果）
+
+    Returns:
+        路由树（多个请求共用，调用方不能修改）
+    """
+    role_ids = sorted(set(role_ids))
+    keys = [ROUTE_CACHE_VERSION_KEY] + [_role_version_key(role_id) for role_id in role_ids]
+    signature = ','.join(
+        [str(role_id) for role_id in role_ids] + _versions(keys)
+    )
+    key = f'{ROUTE_CACHE_KEY_PREFIX}:{hashlib.sha1(signature.encode()).hexdigest()}'
+
+    with _lock:
+        routes = _local.get(key)
+        if routes is not None:
+            _local.move_to_end(key)
+            return routes
+
+    routes = cache.get(key)
+    if routes is None:
+        routes = _build(role_ids)
+        cache.set(key, routes, ROUTE_CACHE_TIMEOUT)
+
+    with _lock:
+        _local[key] = routes
+        while len(_local) > ROUTE_CACHE_LOCAL_SIZE:
+            _local.popitem(last=False)
+    return routes
+
+
+def invalidate_roles(role_ids: Iterable[int]) -> None:
+    """事务提交后失效包含指定角色的路由树"""
+    role_ids = set(role_ids)
+    if not role_ids:
+        return
+    transaction.on_commit(lambda: cache.set_many(
+        {_role_version_key(role_id): uuid.uuid4().hex for role_id in role_ids}, None
+    ))
+
+
+def invalidate_all() -> None:
+    """事务提交后失效所有路由树"""
+    transaction.on_commit(lambda: cache.set(ROUTE_CACHE_VERSION_KEY, uuid.uuid4().hex, None))
@@ -0,0 +1,52 @@
+"""
+关键词搜索
+
+用户、角色、字典、字典项列表的 description 关键词参数在多个文本列上做模糊匹配：
+- 过滤仍使用 icontains（生成 UPPER(col) LIKE UPPER('%kw%')），由迁移 0010 在 UPPER(col) 上建立的
+  pg_trgm GIN 索引支持，不再顺序扫描；少于 3 个字符的关键词无法使用三元组索引
+- 排序参数为 relevance 时按 pg_trgm 的单词相似度（各列取最大值）降序排列
+"""
+from typing import Sequence
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Q, QuerySet
+from django.db.models.functions import Greatest
+
+USER_SEARCH_FIELDS = ('username', 'nickname', 'description')
+ROLE_SEARCH_FIELDS = ('name', 'code', 'description')
+DICT_SEARCH_FIELDS = ('name', 'code', 'description')
+DICT_ITEM_SEARCH_FIELDS = ('label', 'description')
+
+RELEVANCE = 'relevance'
+
+
+def keyword_q(fields: Sequence[str], keyword: str) -> Q:
+    """任一列包含关键词（不区分大小写）"""
+    q = Q()
+    for field in fields:
+        q |= Q(**{f'{field}__icontains': keyword})
+    return q
+
+
+def is_relevance(sort: str) -> bool:
+    """排序参数是否为相关度排序"""
+    return sort.partition(',')[0].strip() == RELEVANCE
+
+
+def search(queryset: QuerySet, fields: Sequence[str], keyword: str, ranked: bool = False) -> QuerySet:
+    """
+    按关键词过滤
+
+    Args:
+        queryset: 查询集
+        fields: 搜索的列
+        keyword: 关键词
+        ranked: 是否标注相关度（relevance 字段，0~1）
+
+    Returns:
+        过滤后的查询集
+    """
+    queryset = queryset.filter(keyword_q(fields, keyword))
+    if ranked:
+        scores = [TrigramWordSimilarity(keyword, field) for field in fields]
+        queryset = queryset.annotate(**{RELEVANCE: Greatest(*scores) if len(scores) > 1 else scores[0]})
+    return queryset
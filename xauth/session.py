@@ -0,0 +1,161 @@
+"""
+会话数据（用户信息、路由）缓存
+
+登录后前端需要的用户资料和角色按用户缓存在 Redis 中，/auth/bootstrap、/auth/user/info、/auth/route 共用：
+- 缓存键为 session_bootstrap:{全局版本}:{用户ID}:{用户版本}，两个版本号一次 get_many 读取
+- 用户、用户角色、角色、部门变化时只更新受影响用户的版本号（事务提交后），其他用户的缓存不受影响
+- 路由树按角色集合由 route_cache 缓存（系统用户读取菜单树缓存），菜单和角色菜单变化不影响这里的缓存
+- 权限列表和权限位图不缓存在这里，每次由 perm_cache（进程内缓存）解码，菜单权限调整后立即生效
+- 旧版本的键由超时清理
+"""
+import uuid
+from typing import Any, Dict, Iterable, Optional
+from django.core.cache import cache
+from django.db import transaction
+from xauth import dict_cache, models, perm_cache, route_cache
+from xauth.tree_cache import menu_tree_cache
+from xutils import utils
+
+SESSION_CACHE_KEY_PREFIX = 'session_bootstrap'
+SESSION_CACHE_VERSION_KEY = 'session_bootstrap_version'
+SESSION_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _user_version_key(user_id: int) -> str:
+    return f'{SESSION_CACHE_KEY_PREFIX}_version:{user_id}'
+
+
+def _build(user_id: int) -> Dict[str, Any]:
+    user = models.SysUser.objects.get(id=user_id)
+    dept = models.SysDept.objects.filter(id=user.dept_id).values_list('name', flat=True).first()
+    role_ids = list(models.SysUserRole.objects.filter(user_id=user_id).values_list('role_id', flat=True))
+    role_codes = models.SysRole.objects.filter(id__in=role_ids).values_list('code', flat=True)
+    return dict(
+        user=dict(
+            id=user.id,
+            username=user.username,
+            nickname=user.nickname,
+            gender=user.gender,
+            email=user.email or "",
+            phone=user.phone or "",
+            avatar=user.avatar or "",
+            description=user.description or "",
+            registrationDate=utils.dateformat(user.create_time),
+            deptId=user.dept_id,
+            deptName=dept,
+            roles=list(role_codes),
+        ),
+        isSystem=user.is_system == 1,
+        roleIds=role_ids,
+    )
+
+
+def get_session(user_id: int) -> Dict[str, Any]:
+    """
+    获取用户的会话数据（缓存未命中时构建并回填）
+
+    Args:
+        user_id: 用户ID
+
+    Returns:
+        {'user': 用户资料（不含权限）, 'isSystem': 是否为系统用户, 'roleIds': 角色ID列表, 'routes': 路由树}
+    """
+    user_version_key = _user_version_key(user_id)
+    versions = cache.get_many([SESSION_CACHE_VERSION_KEY, user_version_key])
+    global_version = versions.get(SESSION_CACHE_VERSION_KEY)
+    if global_version is None:
+        global_version = uuid.uuid4().hex
+        cache.add(SESSION_CACHE_VERSION_KEY, global_version, None)
+        global_version = cache.get(SESSION_CACHE_VERSION_KEY, global_version)
+    user_version = versions.get(user_version_key)
+    if user_version is None:
+        user_version = uuid.uuid4().hex
+        cache.add(user_version_key, user_version, SESSION_CACHE_TIMEOUT)
+        user_version = cache.get(user_version_key, user_version)
+
+    key = f'{SESSION_CACHE_KEY_PREFIX}:{global_version}:{user_id}:{user_version}'
+    data = cache.get(key)
+    if data is None:
+        data = _build(user_id)
+        cache.set(key, data, SESSION_CACHE_TIMEOUT)
+    # 系统用户拥有所有菜单
+    if data['isSystem']:
+        data['routes'] = menu_tree_cache.get('route')
+    else:
+        data['routes'] = route_cache.get_routes(data['roleIds'])
+    return data
+
+
+def get_user_info(state: Dict[str, Any], data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    用户信息（缓存的资料 + 实时解码的权限）
+
+    Args:
+        state: 认证得到的用户状态 {'id', 'status', 'is_system'}
+        data: 已读取的会话数据（不传时读取缓存）
+    """
+    data = data or get_session(state['id'])
+    info = dict(data['user'])
+    registry = perm_cache.get_registry()
+    # 系统用户拥有所有权限
+    if state['is_system'] == 1:
+        permissions = ["*:*:*"]
+        bitmap = registry.mask
+    else:
+        bitmap = perm_cache.get_user_bitmap(state['id'], registry) & registry.button_mask
+        permissions = registry.decode(bitmap)
+    info.update(
+        permissions=permissions,
+        permissionBitmap=format(bitmap, 'x'),
+        permissionVersion=registry.version
+    )
+    return info
+
+
+def get_bootstrap(state: Dict[str, Any], dict_codes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    登录后需要的全部数据
+
+    Args:
+        state: 认证得到的用户状态
+        dict_codes: 字典编码（None 为所有字典）
+
+    Returns:
+        {'userInfo': 用户信息, 'routes': 路由树, 'dicts': 字典编码 -> 字典项}
+    """
+    data = get_session(state['id'])
+    return dict(
+        userInfo=get_user_info(state, data),
+        routes=data['routes'],
+        dicts=dict_cache.get_dicts(dict_codes),
+    )
+
+
+def invalidate_users(user_ids: Iterable[int]) -> None:
+    """事务提交后失效指定用户的会话缓存"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    transaction.on_commit(lambda: cache.set_many(
+        {_user_version_key(user_id): uuid.uuid4().hex for user_id in user_ids},
+        SESSION_CACHE_TIMEOUT
+    ))
+
+
+def invalidate_roles(role_ids: Iterable[int]) -> None:
+    """失效拥有指定角色的用户的会话缓存"""
+    invalidate_users(
+        models.SysUserRole.objects.filter(role_id__in=role_ids).values_list('user_id', flat=True)
+    )
+
+
+def invalidate_depts(dept_ids: Iterable[int]) -> None:
+    """失效指定部门下用户的会话缓存（部门名称）"""
+    invalidate_users(
+        models.SysUser.objects.filter(dept_id__in=list(dept_ids)).values_list('id', flat=True)
+    )
+
+
+def invalidate_all() -> None:
+    """事务提交后失效所有用户的会话缓存"""
+    transaction.on_commit(lambda: cache.set(SESSION_CACHE_VERSION_KEY, uuid.uuid4().hex, None))
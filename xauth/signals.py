@@ -1,46 +1,122 @@
 from django.db.models import signals
 from django.dispatch import receiver
-from django.core.cache import cache
 from django_currentuser.middleware import get_current_authenticated_user
 from loguru import logger
-from xauth import models
+from xauth import dict_cache, models, perm_cache, route_cache, session, user_state
+from xauth.tree_cache import dept_tree_cache, menu_tree_cache
 
 
 @receiver(signals.post_save, sender=models.SysDept)
-def update_cache_after_dept_save(sender, instance, created, **kwargs):
-    dept_tree = models.SysDept.build_dept_tree()
-    cache.set('dept_tree', dept_tree)
-    dept_enabled_tree = models.SysDept.build_dept_tree(status=1)
-    cache.set('dept_enabled_tree', dept_enabled_tree)
-    dept_disabled_tree = models.SysDept.build_dept_tree(status=2)
-    cache.set('dept_disabled_tree', dept_disabled_tree)
-    common_dept_tree = models.SysDept.build_dept_tree(choice=True, status=1)
-    cache.set('common_dept_tree', common_dept_tree)
-
 @receiver(signals.post_delete, sender=models.SysDept)
-def update_cache_after_dept_delete(sender, instance, using, **kwargs):
-    dept_tree = models.SysDept.build_dept_tree()
-    cache.set('dept_tree', dept_tree)
-    dept_enabled_tree = models.SysDept.build_dept_tree(status=1)
-    cache.set('dept_enabled_tree', dept_enabled_tree)
-    dept_disabled_tree = models.SysDept.build_dept_tree(status=2)
-    cache.set('dept_disabled_tree', dept_disabled_tree)
-    common_dept_tree = models.SysDept.build_dept_tree(choice=True, status=1)
-    cache.set('common_dept_tree', common_dept_tree)
+def update_cache_after_dept_change(sender, instance, **kwargs):
+    dept_tree_cache.mark_dirty(instance.id)
 
 @receiver(signals.post_save, sender=models.SysMenu)
-def update_cache_after_menu_save(sender, instance, created, **kwargs):
-    menu_tree = models.SysMenu.build_menu_tree(all=True)
-    cache.set('menu_tree', menu_tree)
-    common_menu_tree = models.SysMenu.build_menu_tree(choice=True)
-    cache.set('common_menu_tree', common_menu_tree)
+@receiver(signals.post_delete, sender=models.SysMenu)
+def update_cache_after_menu_change(sender, instance, **kwargs):
+    menu_tree_cache.mark_dirty(instance.id)
+
+@receiver(models.bulk_deleted, sender=models.SysDept)
+def update_cache_after_depts_deleted(sender, ids, **kwargs):
+    dept_tree_cache.mark_dirty_many(ids)
+
+@receiver(models.bulk_deleted, sender=models.SysMenu)
+def update_cache_after_menus_deleted(sender, ids, **kwargs):
+    menu_tree_cache.mark_dirty_many(ids)
+    perm_cache.invalidate_all()
+
+@receiver(models.bulk_deleted, sender=models.SysUser)
+def invalidate_users_after_bulk_delete(sender, ids, **kwargs):
+    for user_id in ids:
+        perm_cache.invalidate_user(user_id)
+        user_state.invalidate_user_state(user_id)
+
+@receiver(signals.post_save, sender=models.SysUserRole)
+@receiver(signals.post_delete, sender=models.SysUserRole)
+def invalidate_permissions_after_user_role_change(sender, instance, **kwargs):
+    perm_cache.invalidate_user(instance.user_id)
+
+@receiver(models.association_changed, sender=models.SysUserRole)
+def invalidate_permissions_after_user_roles_set(sender, owner_id, **kwargs):
+    perm_cache.invalidate_user(owner_id)
 
+@receiver(signals.post_delete, sender=models.SysUser)
+def invalidate_permissions_after_user_delete(sender, instance, **kwargs):
+    perm_cache.invalidate_user(instance.id)
+
+@receiver(signals.post_save, sender=models.SysUser)
+@receiver(signals.post_delete, sender=models.SysUser)
+def invalidate_state_after_user_change(sender, instance, **kwargs):
+    user_state.invalidate_user_state(instance.id)
+
+@receiver(signals.post_save, sender=models.SysRoleMenu)
+@receiver(signals.post_delete, sender=models.SysRoleMenu)
+@receiver(signals.post_save, sender=models.SysMenu)
 @receiver(signals.post_delete, sender=models.SysMenu)
-def update_cache_after_menu_delete(sender, instance, using, **kwargs):
-    menu_tree = models.SysMenu.build_menu_tree(all=True)
-    cache.set('menu_tree', menu_tree)
-    common_menu_tree = models.SysMenu.build_menu_tree(choice=True)
-    cache.set('common_menu_tree', common_menu_tree)
+def invalidate_permissions_after_menu_change(sender, instance, **kwargs):
+    perm_cache.invalidate_all()
+
+@receiver(models.association_changed, sender=models.SysRoleMenu)
+def invalidate_permissions_after_role_menus_set(sender, **kwargs):
+    perm_cache.invalidate_all()
+
+@receiver(signals.post_save, sender=models.SysUser)
+def invalidate_session_after_user_change(sender, instance, **kwargs):
+    session.invalidate_users([instance.id])
+
+@receiver(signals.post_save, sender=models.SysUserRole)
+@receiver(signals.post_delete, sender=models.SysUserRole)
+def invalidate_session_after_user_role_change(sender, instance, **kwargs):
+    session.invalidate_users([instance.user_id])
+
+@receiver(models.association_changed, sender=models.SysUserRole)
+def invalidate_session_after_user_roles_set(sender, owner_id, **kwargs):
+    session.invalidate_users([owner_id])
+
+@receiver(signals.post_save, sender=models.SysRole)
+def invalidate_session_after_role_change(sender, instance, **kwargs):
+    session.invalidate_roles([instance.id])
+
+# 路由树由菜单树缓存构建，这些接收器必须在菜单树缓存的接收器之后注册（提交回调按注册顺序执行）
+@receiver(signals.post_save, sender=models.SysRoleMenu)
+@receiver(signals.post_delete, sender=models.SysRoleMenu)
+def invalidate_routes_after_role_menu_change(sender, instance, **kwargs):
+    route_cache.invalidate_roles([instance.role_id])
+
+@receiver(models.association_changed, sender=models.SysRoleMenu)
+def invalidate_routes_after_role_menus_set(sender, owner_id, **kwargs):
+    route_cache.invalidate_roles([owner_id])
+
+@receiver(signals.post_save, sender=models.SysMenu)
+@receiver(signals.post_delete, sender=models.SysMenu)
+@receiver(models.bulk_deleted, sender=models.SysMenu)
+def invalidate_routes_after_menu_change(sender, **kwargs):
+    route_cache.invalidate_all()
+
+@receiver(signals.post_save, sender=models.SysDept)
+def invalidate_session_after_dept_change(sender, instance, **kwargs):
+    session.invalidate_depts([instance.id])
+
+@receiver(signals.pre_save, sender=models.SysDict)
+@receiver(signals.pre_save, sender=models.SysDictItem)
+@receiver(signals.pre_save, sender=models.SysOption)
+def remember_dict_cache_entries(sender, instance, raw, **kwargs):
+    # 修改编码、所属字典或类别后，旧条目也需要刷新
+    old = sender.objects.filter(id=instance.id).first() if instance.id else None
+    instance._dict_cache_entries = dict_cache.entry_names(old) if old else set()
+
+@receiver(signals.post_save, sender=models.SysDict)
+@receiver(signals.post_save, sender=models.SysDictItem)
+@receiver(signals.post_save, sender=models.SysOption)
+@receiver(signals.post_save, sender=models.SysRole)
+@receiver(signals.post_delete, sender=models.SysDict)
+@receiver(signals.post_delete, sender=models.SysDictItem)
+@receiver(signals.post_delete, sender=models.SysOption)
+@receiver(signals.post_delete, sender=models.SysRole)
+def refresh_dict_cache_after_change(sender, instance, **kwargs):
+    dict_cache.refresh(
+        dict_cache.entry_names(instance) | getattr(instance, '_dict_cache_entries', set())
+    )
 
 @receiver(signals.pre_save, sender=models.SysDept)
 @receiver(signals.pre_save, sender=models.SysDict)
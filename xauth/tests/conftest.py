@@ -0,0 +1,65 @@
+"""
+Pytest 配置文件
+
+提供测试夹具和配置：
+- 测试数据库
+- 缓存（进程内缓存代替 Redis）
+"""
+import contextlib
+import pytest
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+
+
+@pytest.fixture(scope='session')
+def django_db_setup():
+    """设置测试数据库"""
+    settings.DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'ATOMIC_REQUESTS': False,
+        'AUTOCOMMIT': True,
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {},
+        'TIME_ZONE': None,
+        'USER': '',
+        'PASSWORD': '',
+        'HOST': '',
+        'PORT': '',
+    }
+
+
+class LockingLocMemCache(LocMemCache):
+    """带 lock() 的进程内缓存（django-redis 的分布式锁在单进程测试中不需要）"""
+
+    @contextlib.contextmanager
+    def lock(self, *args, **kwargs):
+        yield
+
+
+@pytest.fixture(scope='function')
+def mem_cache(monkeypatch):
+    """将各缓存模块的 Redis 缓存替换为进程内缓存"""
+    from xauth import dict_cache, perm_cache, route_cache, session, tree_cache, user_state
+
+    mem = LockingLocMemCache('xauth-tests', {})
+    mem.clear()
+    for module in (dict_cache, perm_cache, route_cache, session, tree_cache, user_state):
+        monkeypatch.setattr(module, 'cache', mem)
+    # 进程内缓存
+    for module in (perm_cache, route_cache, user_state):
+        monkeypatch.setattr(module, '_local', type(module._local)())
+    return mem
+
+
+@pytest.fixture(scope='function')
+def admin_client(db, mem_cache):
+    """以系统用户身份认证的测试客户端（系统用户不校验接口权限）"""
+    from django.test import Client
+    from ninja_jwt.tokens import AccessToken
+    from xauth import models
+
+    user = models.SysUser.objects.create(
+        username='test_admin', password='', gender=0, dept_id=1, status=1, is_system=1
+    )
+    return Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
@@ -0,0 +1,99 @@
+"""
+JWT 认证和用户状态缓存测试
+"""
+import pytest
+from django.test import RequestFactory
+from ninja_jwt.exceptions import AuthenticationFailed
+from ninja_jwt.tokens import AccessToken
+from xauth import auth, models, user_state
+
+
+def create_user(username: str, status: int = 1) -> models.SysUser:
+    return models.SysUser.objects.create(
+        username=username, password='', gender=0, dept_id=1, status=status, is_system=0
+    )
+
+
+def token_for(user: models.SysUser) -> str:
+    return str(AccessToken.for_user(user))
+
+
+@pytest.fixture
+def request_():
+    return RequestFactory().get('/')
+
+
+@pytest.mark.django_db
+def test_authenticate_enabled_user(mem_cache, request_):
+    user = create_user('test_auth_enabled')
+    authenticated = auth.XadminBaseAuth().authenticate(request_, token_for(user))
+
+    assert authenticated.id == user.id
+    assert request_.user_state == {'id': user.id, 'status': 1, 'is_system': 0}
+
+
+@pytest.mark.django_db
+def test_disabled_user_is_rejected(mem_cache, request_):
+    user = create_user('test_auth_disabled', status=2)
+    with pytest.raises(AuthenticationFailed):
+        auth.XadminBaseAuth().authenticate(request_, token_for(user))
+
+
+@pytest.mark.django_db
+def test_deleted_user_is_rejected(mem_cache, request_, django_capture_on_commit_callbacks):
+    user = create_user('test_auth_deleted')
+    token = token_for(user)
+    assert user_state.get_user_state(user.id) is not None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.delete()
+    assert user_state.get_user_state(user.id) is None
+    for authenticator in (auth.XadminBaseAuth(), auth.XadminPermAuth()):
+        with pytest.raises(AuthenticationFailed):
+            authenticator.authenticate(request_, token)
+
+
+@pytest.mark.django_db
+def test_save_invalidates_local_state(mem_cache, request_, django_capture_on_commit_callbacks):
+    """用户保存后立即生效，不等进程内缓存的 TTL 过期"""
+    user = create_user('test_auth_state')
+    token = token_for(user)
+    assert user_state.get_user_state(user.id)['status'] == 1
+    assert user.id in user_state._local
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.status = 2
+        user.save()
+    assert user.id not in user_state._local
+    assert user_state.get_user_state(user.id)['status'] == 2
+    with pytest.raises(AuthenticationFailed):
+        auth.XadminBaseAuth().authenticate(request_, token)
+
+
+class FakeThread:
+    """记录启动的订阅线程（不真正启动）"""
+    started = []
+
+    def __init__(self, target, name, daemon):
+        self.name = name
+
+    def start(self):
+        self.started.append(self.name)
+
+
+@pytest.mark.django_db
+def test_listener_only_starts_in_web_workers(mem_cache, monkeypatch):
+    """订阅线程只在 Web 工作进程中启动，管理命令和测试中不启动"""
+    monkeypatch.setattr(user_state, '_listener_pid', None)
+    monkeypatch.setattr(user_state.threading, 'Thread', FakeThread)
+    monkeypatch.setattr(FakeThread, 'started', [])
+    user = create_user('test_auth_listener')
+
+    monkeypatch.delenv('XADMINSTART', raising=False)
+    user_state.get_user_state(user.id)
+    assert FakeThread.started == []
+
+    monkeypatch.setenv('XADMINSTART', 'True')
+    user_state.get_user_state(user.id)
+    user_state.get_user_state(user.id)
+    assert FakeThread.started == ['user-state-listener']
@@ -0,0 +1,44 @@
+"""
+字典缓存测试
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from xauth import dict_cache, models
+
+
+@pytest.fixture
+def sample_dict(db):
+    _dict = models.SysDict.objects.create(name='测试字典', code='test_dict', is_system=0, create_user=1)
+    for sort, label in enumerate(['b', 'a']):
+        models.SysDictItem.objects.create(
+            label=label, value=label, sort=sort, status=1, dict_id=_dict.id, create_user=1
+        )
+    models.SysOption.objects.create(category='TEST_CATEGORY', name='n', code='k', value='1')
+    return _dict
+
+
+def test_hit_without_queries(mem_cache, sample_dict):
+    version, data = dict_cache.get('dict:test_dict')
+    assert [item['label'] for item in data] == ['b', 'a']
+    with CaptureQueriesContext(connection) as queries:
+        assert dict_cache.get('dict:test_dict') == (version, data)
+    assert len(queries) == 0
+
+
+def test_refresh_on_change(mem_cache, sample_dict, django_capture_on_commit_callbacks):
+    version, _ = dict_cache.get('dict:test_dict')
+    with django_capture_on_commit_callbacks(execute=True):
+        sample_dict.code = 'test_dict_renamed'
+        sample_dict.save()
+    assert dict_cache.get('dict:test_dict') == (None, None)
+    new_version, data = dict_cache.get('dict:test_dict_renamed')
+    assert new_version != version and len(data) == 2
+
+
+def test_unknown_option_category_not_cached(mem_cache, sample_dict):
+    keys_before = set(mem_cache._cache)
+    for i in range(20):
+        assert dict_cache.get(f'option:unknown{i}') == (None, None)
+    assert set(mem_cache._cache) == keys_before
+    assert dict_cache.get('option:TEST_CATEGORY')[1] == [dict(label='k', value='1')]
@@ -0,0 +1,104 @@
+"""
+列表接口的批量加载测试
+
+每页引用的创建人、修改人、部门和角色各用一次查询解析，查询数不随行数增长
+"""
+import pytest
+from xauth import loaders, models
+
+ROWS = 12
+
+
+def create_user(username: str, dept_id: int = 1, create_user: int = None) -> models.SysUser:
+    return models.SysUser.objects.create(
+        username=username, password='', gender=0, dept_id=dept_id, status=1, is_system=0,
+        create_user=create_user, update_user=create_user
+    )
+
+
+@pytest.fixture
+def creators(db):
+    """每行使用不同的创建人"""
+    return [create_user(f'test_loader_creator{i}') for i in range(ROWS)]
+
+
+@pytest.mark.django_db
+def test_user_list_queries_do_not_grow_with_rows(admin_client, creators, django_assert_max_num_queries):
+    dept = models.SysDept.objects.create(
+        name='test_loader_dept', parent_id=0, ancestors='0', sort=1, status=1, is_system=0, create_user=1
+    )
+    role = models.SysRole.objects.create(
+        name='test_loader_role', code='test_loader_role', data_scope=1, sort=1, is_system=0, create_user=1
+    )
+    for i, creator in enumerate(creators):
+        user = create_user(f'test_loader_user{i}', dept.id, creator.id)
+        models.SysUserRole.objects.create(user_id=user.id, role_id=role.id)
+
+    # 认证 2 + 部门 1 + 计数 1 + 当前页 1 + 用户角色 2 + 用户名 1 + 部门名称 1
+    with django_assert_max_num_queries(9):
+        response = admin_client.get('/system/user/list', {'deptId': dept.id, 'size': ROWS})
+    data = response.json()['data']
+    assert data['total'] == ROWS
+    rows = {row['username']: row for row in data['list']}
+    assert rows['test_loader_user3']['createUserString'] == 'test_loader_creator3'
+    assert rows['test_loader_user3']['updateUserString'] == 'test_loader_creator3'
+    assert rows['test_loader_user3']['deptName'] == 'test_loader_dept'
+    assert rows['test_loader_user3']['roleNames'] == ['test_loader_role']
+
+
+@pytest.mark.django_db
+def test_list_roles_queries_do_not_grow_with_rows(admin_client, creators, django_assert_max_num_queries):
+    for i, creator in enumerate(creators):
+        models.SysRole.objects.create(
+            name=f'test_loader_role{i}', code=f'test_loader_role{i}', data_scope=1, sort=i, is_system=0,
+            create_user=creator.id, update_user=creator.id
+        )
+
+    # 认证 1 + 计数 1 + 当前页 1 + 用户名 1
+    with django_assert_max_num_queries(5):
+        response = admin_client.get('/system/role', {'description': 'test_loader_role', 'size': ROWS})
+    data = response.json()['data']
+    assert data['total'] == ROWS
+    rows = {row['name']: row for row in data['list']}
+    assert rows['test_loader_role5']['createUserString'] == 'test_loader_creator5'
+    assert rows['test_loader_role5']['updateUserString'] == 'test_loader_creator5'
+
+
+@pytest.mark.django_db
+def test_fill_user_strings_single_query(creators, django_assert_num_queries):
+    items = [dict(createUser=creator.id, updateUser=None) for creator in creators]
+    with django_assert_num_queries(1):
+        loaders.fill_user_strings(items)
+    assert [item['createUserString'] for item in items] == [creator.username for creator in creators]
+    assert all(item['updateUserString'] is None for item in items)
+
+
+@pytest.mark.django_db
+def test_build_dept_tree_fills_user_strings(creators, django_assert_num_queries):
+    root = models.SysDept.objects.create(
+        name='test_loader_root', parent_id=0, ancestors='0', sort=1, status=1, is_system=0,
+        create_user=creators[0].id, update_user=creators[1].id
+    )
+    models.SysDept.objects.create(
+        name='test_loader_child', parent_id=root.id, ancestors=root.path, sort=1, status=1, is_system=0,
+        create_user=creators[2].id
+    )
+
+    # 部门 1 + 用户名 1
+    with django_assert_num_queries(2):
+        tree = models.SysDept.build_dept_tree()
+    node = next(node for node in tree if node['id'] == root.id)
+    assert node['createUserString'] == 'test_loader_creator0'
+    assert node['updateUserString'] == 'test_loader_creator1'
+    assert node['children'][0]['createUserString'] == 'test_loader_creator2'
+
+
+@pytest.mark.django_db
+def test_build_menu_tree_fills_user_strings(creators):
+    menu = models.SysMenu.objects.create(
+        title='test_loader_menu', parent_id=0, type=1, sort=1, status=1, create_user=creators[3].id
+    )
+
+    tree = models.SysMenu.build_menu_tree(all=True)
+    node = next(node for node in tree if node['id'] == menu.id)
+    assert node['createUserString'] == 'test_loader_creator3'
@@ -0,0 +1,166 @@
+"""
+模型的树操作和关联表写入测试
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from xauth import models
+
+TEST_ROLE_ID = 987654
+
+
+def create_dept(name, parent=None):
+    return models.SysDept.objects.create(
+        name=name, parent_id=parent.id if parent else 0, ancestors=parent.path if parent else '0',
+        sort=1, status=1, is_system=0, create_user=1
+    )
+
+
+def create_menu(title, parent=None, menu_type=2):
+    return models.SysMenu.objects.create(
+        title=title, parent_id=parent.id if parent else 0, type=menu_type, sort=1, status=1, create_user=1
+    )
+
+
+@pytest.fixture
+def dept_tree(db):
+    """root -> a -> a1 -> a11, root -> b"""
+    root = create_dept('test_dept_root')
+    a = create_dept('test_dept_a', root)
+    a1 = create_dept('test_dept_a1', a)
+    a11 = create_dept('test_dept_a11', a1)
+    b = create_dept('test_dept_b', root)
+    return dict(root=root, a=a, a1=a1, a11=a11, b=b)
+
+
+def ancestors(dept):
+    return models.SysDept.objects.values_list('ancestors', flat=True).get(id=dept.id)
+
+
+def test_move_to_rewrites_descendant_paths(dept_tree):
+    a, a1, a11, b = dept_tree['a'], dept_tree['a1'], dept_tree['a11'], dept_tree['b']
+    a.move_to(b)
+
+    assert ancestors(a) == b.path
+    assert ancestors(a1) == f'{b.path},{a.id}'
+    assert ancestors(a11) == f'{b.path},{a.id},{a1.id}'
+    assert set(models.SysDept.subtree(b.id).values_list('id', flat=True)) == {b.id, a.id, a1.id, a11.id}
+
+
+@pytest.fixture
+def prefix_depts(db):
+    """root -> d -> d_child, root -> d1 -> d1_child；d1 的ID以 d 的ID开头（如 1 和 11）"""
+    root = create_dept('test_dept_root')
+    d = create_dept('test_dept_d', root)
+    d_child = create_dept('test_dept_d_child', d)
+    d1 = models.SysDept.objects.create(
+        id=int(f'{d.id}000001'), name='test_dept_d1', parent_id=root.id, ancestors=root.path,
+        sort=1, status=1, is_system=0, create_user=1
+    )
+    d1_child = create_dept('test_dept_d1_child', d1)
+    return dict(root=root, d=d, d_child=d_child, d1=d1, d1_child=d1_child)
+
+
+def test_subtree_does_not_match_id_prefix(prefix_depts):
+    d, d_child = prefix_depts['d'], prefix_depts['d_child']
+    assert prefix_depts['d1_child'].ancestors.startswith(d.path)
+
+    assert set(models.SysDept.subtree(d.id).values_list('id', flat=True)) == {d.id, d_child.id}
+    assert set(models.SysDept.subtree(d.id, include_self=False).values_list('id', flat=True)) == {d_child.id}
+
+
+def test_user_list_dept_filter_does_not_match_id_prefix(admin_client, prefix_depts):
+    users = {
+        name: models.SysUser.objects.create(
+            username=f'test_prefix_user_{name}', password='', gender=0, dept_id=dept.id, status=1, is_system=0
+        )
+        for name, dept in prefix_depts.items()
+    }
+
+    response = admin_client.get('/system/user/list', {'deptId': prefix_depts['d'].id, 'size': 10})
+
+    ids = {item['id'] for item in response.json()['data']['list']}
+    assert ids == {str(users['d'].id), str(users['d_child'].id)}
+
+
+def test_move_to_rejects_own_subtree(dept_tree):
+    with pytest.raises(ValueError):
+        dept_tree['a'].move_to(dept_tree['a11'])
+    with pytest.raises(ValueError):
+        dept_tree['a'].move_to(dept_tree['a'])
+    assert ancestors(dept_tree['a']) == dept_tree['root'].path
+
+
+def test_delete_depts_removes_subtree_and_associations(dept_tree):
+    a, a11, b = dept_tree['a'], dept_tree['a11'], dept_tree['b']
+    user = models.SysUser.objects.create(
+        username='test_dept_user', password='', gender=0, dept_id=a11.id, status=1, is_system=0
+    )
+    other = models.SysUser.objects.create(
+        username='test_dept_other', password='', gender=0, dept_id=b.id, status=1, is_system=0
+    )
+    models.SysUserRole.objects.create(user_id=user.id, role_id=TEST_ROLE_ID)
+    models.SysUserRole.objects.create(user_id=other.id, role_id=TEST_ROLE_ID)
+    models.SysRoleDept.objects.create(role_id=TEST_ROLE_ID, dept_id=a11.id)
+    models.SysRoleDept.objects.create(role_id=TEST_ROLE_ID, dept_id=b.id)
+
+    models.SysDept.delete_depts(a.id)
+
+    assert not models.SysDept.objects.filter(id__in=[a.id, dept_tree['a1'].id, a11.id]).exists()
+    assert models.SysDept.objects.filter(id=b.id).exists()
+    assert list(models.SysUser.objects.filter(username__startswith='test_dept_').values_list('id', flat=True)) == [other.id]
+    assert list(models.SysUserRole.objects.filter(role_id=TEST_ROLE_ID).values_list('user_id', flat=True)) == [other.id]
+    assert list(models.SysRoleDept.objects.filter(role_id=TEST_ROLE_ID).values_list('dept_id', flat=True)) == [b.id]
+
+
+def test_delete_depts_missing_dept(db):
+    models.SysDept.delete_depts(10 ** 9)
+
+
+def test_delete_menus_removes_subtree_and_associations(db):
+    root = create_menu('test_menu_root', menu_type=1)
+    child = create_menu('test_menu_child', root)
+    button = create_menu('test_menu_button', child, menu_type=3)
+    other = create_menu('test_menu_other', menu_type=1)
+    models.SysRoleMenu.sync_association('role_id', TEST_ROLE_ID, 'menu_id', [child.id, button.id, other.id])
+
+    assert set(models.SysMenu.subtree_ids(root.id)) == {root.id, child.id, button.id}
+    models.SysMenu.delete_menus(root.id)
+
+    assert not models.SysMenu.objects.filter(id__in=[root.id, child.id, button.id]).exists()
+    assert models.SysMenu.objects.filter(id=other.id).exists()
+    assert list(models.SysRoleMenu.objects.filter(role_id=TEST_ROLE_ID).values_list('menu_id', flat=True)) == [other.id]
+    assert models.SysMenu.subtree_ids(root.id) == []
+
+
+def test_sync_association_writes_only_the_diff(db):
+    models.SysRoleMenu.sync_association('role_id', TEST_ROLE_ID, 'menu_id', [1, 2, 3])
+    kept = dict(models.SysRoleMenu.objects.filter(role_id=TEST_ROLE_ID, menu_id__in=[2, 3]).values_list('menu_id', 'id'))
+
+    with CaptureQueriesContext(connection) as queries:
+        added, removed = models.SysRoleMenu.sync_association('role_id', TEST_ROLE_ID, 'menu_id', [2, 3, 4, 4])
+    assert (added, removed) == ({4}, {1})
+    statements = [query['sql'].split()[0].upper() for query in queries]
+    assert statements.count('INSERT') == 1
+    assert statements.count('DELETE') == 1
+    assert statements.count('UPDATE') == 0
+
+    rows = dict(models.SysRoleMenu.objects.filter(role_id=TEST_ROLE_ID).values_list('menu_id', 'id'))
+    assert set(rows) == {2, 3, 4}
+    # 未变化的关联保持原有的行
+    assert {menu_id: rows[menu_id] for menu_id in kept} == kept
+
+
+def test_sync_association_no_change(db):
+    models.SysRoleMenu.sync_association('role_id', TEST_ROLE_ID, 'menu_id', [1, 2])
+    received = []
+
+    def receiver(sender, **kwargs):
+        received.append(kwargs)
+
+    models.association_changed.connect(receiver, sender=models.SysRoleMenu)
+    try:
+        assert models.SysRoleMenu.sync_association('role_id', TEST_ROLE_ID, 'menu_id', [2, 1]) == (set(), set())
+    finally:
+        models.association_changed.disconnect(receiver, sender=models.SysRoleMenu)
+    assert received == []
@@ -0,0 +1,77 @@
+"""
+列表分页测试
+"""
+import base64
+from datetime import timedelta
+import pytest
+from django.test import RequestFactory
+from django.utils import timezone
+from xauth import models, paging
+
+BENCH_DICT_ID = 987654
+
+
+@pytest.fixture
+def items(db):
+    """create_time 只相差若干微秒的字典项"""
+    base = timezone.now().replace(microsecond=100)
+    ids = []
+    for i in range(6):
+        item = models.SysDictItem.objects.create(
+            label=f'item{i}', value=str(i), sort=i, status=1, dict_id=BENCH_DICT_ID, create_user=1
+        )
+        models.SysDictItem.objects.filter(id=item.id).update(create_time=base + timedelta(microseconds=i * 7))
+        ids.append(item.id)
+    return ids
+
+
+def walk(descending: bool, size: int):
+    queryset = models.SysDictItem.objects.filter(dict_id=BENCH_DICT_ID)
+    seen, cursor = [], None
+    while True:
+        page, cursor = paging.keyset_page(queryset, 'create_time', descending, size, cursor)
+        seen.extend(item.id for item in page)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize('size', [1, 2, 4])
+def test_keyset_sub_millisecond_create_time(items, size):
+    assert walk(True, size) == list(reversed(items))
+    assert walk(False, size) == items
+
+
+def test_cursor_round_trip_datetime():
+    now = timezone.now().replace(microsecond=123456)
+    value, pk = paging.decode_cursor(paging.encode_cursor([now, 5]))
+    assert value == now and pk == 5
+    assert timezone.is_aware(value)
+
+
+def test_invalid_cursor():
+    with pytest.raises(ValueError):
+        paging.decode_cursor('bm90IGpzb24')
+    with pytest.raises(ValueError):
+        paging.decode_cursor(base64.urlsafe_b64encode(b'[{"x": 1}, 1]').decode('ascii'))
+
+
+@pytest.mark.parametrize('sort, expected', [
+    ('createTime,asc', ('create_time', False)),
+    ('sort,desc', ('sort', True)),
+    ('password,desc', paging.DEFAULT_SORT),
+    ('dict__code,asc', paging.DEFAULT_SORT),
+    ('-id', paging.DEFAULT_SORT),
+    ('', paging.DEFAULT_SORT),
+])
+def test_parse_sort(sort, expected):
+    assert paging.parse_sort(sort, ('id', 'sort', 'create_time')) == expected
+
+
+@pytest.mark.parametrize('sort', ['noSuchField,asc', 'dictId__foo,asc', 'relevance,desc'])
+def test_paginate_unknown_sort_falls_back_to_id_desc(items, sort):
+    """不允许的排序字段（包括未注解的相关度）不会进入 order_by"""
+    queryset = models.SysDictItem.objects.filter(dict_id=BENCH_DICT_ID)
+    request = RequestFactory().get('/', {'sort': sort})
+    page = paging.paginate(request, queryset, sort, 1, 10, sort_fields=('id', 'sort'))
+    assert [item.id for item in page['list']] == list(reversed(items))
+    assert page['total'] == len(items)
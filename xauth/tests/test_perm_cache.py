@@ -0,0 +1,156 @@
+"""
+用户权限缓存测试
+"""
+import pytest
+from xauth import models, perm_cache
+
+
+def create_menu(menu_id: int, permission: str, menu_type: int = 3) -> models.SysMenu:
+    return models.SysMenu.objects.create(
+        id=menu_id, title=f'{permission}#{menu_id}', parent_id=0, type=menu_type, sort=1, status=1,
+        permission=permission, create_user=1
+    )
+
+
+@pytest.mark.django_db
+def test_registry_bits_are_dense(mem_cache):
+    create_menu(10 ** 6, 'test:perm:b')
+    create_menu(10 ** 6 + 1, 'test:perm:a')
+    create_menu(10 ** 6 + 2, 'test:perm:a', menu_type=2)
+    models.SysRoleMenu.objects.create(role_id=987654, menu_id=10 ** 6)
+    models.SysUserRole.objects.create(user_id=987654, role_id=987654)
+
+    registry = perm_cache.get_registry()
+    assert sorted(registry.bits.values()) == list(range(len(registry.bits)))
+    assert registry.bit('test:perm:a') + 1 == registry.bit('test:perm:b')
+    assert registry.button_mask >> registry.bit('test:perm:a') & 1
+
+    bitmap = perm_cache.get_user_bitmap(987654)
+    assert bitmap.bit_length() <= len(registry.bits)
+    assert perm_cache.has_permission(987654, 'test:perm:b')
+    assert not perm_cache.has_permission(987654, 'test:perm:a')
+    assert perm_cache.get_user_permissions(987654) == ['test:perm:b']
+
+
+@pytest.mark.django_db
+def test_registry_version_follows_permissions(mem_cache, django_capture_on_commit_callbacks):
+    create_menu(10 ** 6, 'test:perm:b')
+    version = perm_cache.get_registry().version
+    assert perm_cache.get_registry().version == version
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_menu(10 ** 6 + 1, 'test:perm:a')
+    assert perm_cache.get_registry().version != version
+
+
+class BrokenCache:
+    """所有操作都失败的缓存（模拟 Redis 不可用）"""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError('Redis unavailable')
+        return fail
+
+
+@pytest.mark.django_db
+def test_falls_back_to_database_when_cache_unavailable(mem_cache, monkeypatch, django_capture_on_commit_callbacks):
+    create_menu(10 ** 6, 'test:perm:b')
+    models.SysRoleMenu.objects.create(role_id=987654, menu_id=10 ** 6)
+    models.SysUserRole.objects.create(user_id=987654, role_id=987654)
+    monkeypatch.setattr(perm_cache, 'cache', BrokenCache())
+
+    assert perm_cache.has_permission(987654, 'test:perm:b')
+    with django_capture_on_commit_callbacks(execute=True):
+        perm_cache.invalidate_user(987654)
+        perm_cache.invalidate_all()
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    """两个共享 Redis 的进程：切换 perm_cache 的进程内缓存"""
+    locals_ = {'a': {}, 'b': {}}
+
+    def switch(name):
+        monkeypatch.setattr(perm_cache, '_local', locals_[name])
+    return switch
+
+
+@pytest.mark.django_db
+def test_other_process_sees_new_permission(mem_cache, processes, django_capture_on_commit_callbacks):
+    """一个进程新增的权限使其他进程的位序号变化，其他进程不能按旧注册表解码或写入位图"""
+    create_menu(10 ** 6, 'test:user:list')
+    models.SysRoleMenu.objects.create(role_id=987654, menu_id=10 ** 6)
+    models.SysUserRole.objects.create(user_id=987654, role_id=987654)
+
+    processes('b')
+    assert perm_cache.get_user_permissions(987654) == ['test:user:list']
+
+    processes('a')
+    with django_capture_on_commit_callbacks(execute=True):
+        # 排在前面的权限使之后的位序号都加一
+        create_menu(10 ** 6 + 1, 'aaa:first:perm')
+        perm_cache.invalidate_all()
+
+    processes('b')
+    # 进程内缓存各自过期：b 的注册表尚未过期，角色和用户位图已过期
+    for name in [name for name in perm_cache._local if name != 'registry']:
+        del perm_cache._local[name]
+    for process in ('b', 'a', 'b'):
+        processes(process)
+        assert perm_cache.get_user_permissions(987654) == ['test:user:list']
+        assert perm_cache.has_permission(987654, 'test:user:list')
+        assert not perm_cache.has_permission(987654, 'aaa:first:perm')
+
+
+@pytest.mark.django_db
+def test_bitmaps_are_keyed_by_registry(mem_cache, processes):
+    """进程读到旧注册表时写入的位图不会被使用新注册表的进程读取"""
+    create_menu(10 ** 6, 'test:user:list')
+    models.SysRoleMenu.objects.create(role_id=987654, menu_id=10 ** 6)
+    models.SysUserRole.objects.create(user_id=987654, role_id=987654)
+    processes('b')
+    stale = perm_cache.get_registry()
+
+    processes('a')
+    create_menu(10 ** 6 + 1, 'aaa:first:perm')
+    # 版本号尚未递增（失效回调还未执行）时，另一个进程用新的注册表构建位图
+    fresh = perm_cache._build_registry()
+    assert fresh.version != stale.version
+    bitmap = perm_cache.get_user_bitmap(987654, fresh)
+    assert fresh.decode(bitmap) == ['test:user:list']
+
+    processes('b')
+    assert stale.decode(perm_cache.get_user_bitmap(987654, stale)) == ['test:user:list']
+
+
+@pytest.mark.django_db
+def test_invalidate_user_reaches_other_processes(mem_cache, processes, django_capture_on_commit_callbacks):
+    create_menu(10 ** 6, 'test:user:list')
+    models.SysRoleMenu.objects.create(role_id=987654, menu_id=10 ** 6)
+    processes('b')
+    assert not perm_cache.has_permission(987654, 'test:user:list')
+
+    processes('a')
+    with django_capture_on_commit_callbacks(execute=True):
+        models.SysUserRole.objects.create(user_id=987654, role_id=987654)
+        perm_cache.invalidate_user(987654)
+
+    processes('b')
+    assert perm_cache.has_permission(987654, 'test:user:list')
+
+
+@pytest.mark.django_db
+def test_invalidate_all_reaches_other_processes(mem_cache, processes, django_capture_on_commit_callbacks):
+    """其他进程的进程内缓存在全局版本号递增后立即失效，不等 TTL 过期"""
+    create_menu(10 ** 6, 'test:user:list')
+    models.SysUserRole.objects.create(user_id=987654, role_id=987654)
+    processes('b')
+    assert not perm_cache.has_permission(987654, 'test:user:list')
+
+    processes('a')
+    with django_capture_on_commit_callbacks(execute=True):
+        models.SysRoleMenu.objects.create(role_id=987654, menu_id=10 ** 6)
+        perm_cache.invalidate_all()
+
+    processes('b')
+    assert perm_cache.has_permission(987654, 'test:user:list')
@@ -0,0 +1,50 @@
+"""
+JSON 渲染器测试
+
+orjson 和标准库 json 两条路径的输出必须完全一致
+"""
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+import pytest
+from django.utils.translation import gettext_lazy
+from xutils import renderers
+
+orjson = pytest.importorskip('orjson')
+
+PAYLOAD = {
+    'success': True,
+    'code': 200,
+    'msg': '操作成功',
+    'data': {
+        'aware': datetime(2026, 10, 18, 12, 30, 45, 123456, tzinfo=dt_timezone.utc),
+        'offset': datetime(2026, 10, 18, 12, 30, 45, 999999, tzinfo=dt_timezone(timedelta(hours=8))),
+        'naive': datetime(2026, 10, 18, 12, 30, 45, 500),
+        'date': date(2026, 10, 18),
+        'time': time(12, 30, 45, 123456),
+        'amount': Decimal('1.10'),
+        'ratio': 0.25,
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'lazy': gettext_lazy('操作成功'),
+        'ids': {1: 'a', 2: 'b'},
+        'flags': {True: 1, None: 2},
+        'list': [Decimal('0'), None, 'Ünïcode'],
+    },
+}
+
+
+def test_orjson_matches_stdlib(monkeypatch):
+    fast = renderers.dumps(PAYLOAD)
+    monkeypatch.setattr(renderers, 'orjson', None)
+    assert fast == renderers.dumps(PAYLOAD)
+    assert b'"aware":"2026-10-18T12:30:45.123Z"' in fast
+    assert b'"amount":"1.10"' in fast
+    assert b'"ids":{"1":"a","2":"b"}' in fast
+
+
+def test_renderer_uses_orjson(monkeypatch):
+    calls = []
+    original = orjson.dumps
+    monkeypatch.setattr(orjson, 'dumps', lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs))
+    renderers.FastJSONRenderer().render(None, PAYLOAD, response_status=200)
+    assert calls
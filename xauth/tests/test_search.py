@@ -0,0 +1,123 @@
+"""
+关键词搜索测试
+
+- 关键词匹配搜索列中的任一列（不区分大小写）
+- 相关度排序：关键词为空时角色列表回退为 createTime,desc
+- 字典列表：无关键词返回全部，有关键词按相关度排序（需要 pg_trgm）
+"""
+import datetime
+import pytest
+from django.db import connection
+from django.utils import timezone
+from xauth import models, search
+
+KEYWORD = 'ZqXsearchKw'
+
+
+def create_role(i: int, **fields) -> models.SysRole:
+    values = dict(name=f'test_search_role{i}', code=f'test_search_role{i}', description='')
+    values.update(fields)
+    return models.SysRole.objects.create(data_scope=1, sort=1, is_system=0, create_user=1, **values)
+
+
+def create_user(i: int, **fields) -> models.SysUser:
+    values = dict(username=f'test_search_user{i}', nickname='', description='')
+    values.update(fields)
+    return models.SysUser.objects.create(password='', gender=0, dept_id=1, status=1, is_system=0, **values)
+
+
+def has_trigram() -> bool:
+    """数据库是否安装了 pg_trgm 扩展"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+@pytest.fixture
+def trigram(db):
+    if not has_trigram():
+        pytest.skip('pg_trgm 扩展未安装')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('field', search.ROLE_SEARCH_FIELDS)
+def test_search_roles_matches_each_field(field):
+    matched = create_role(0, **{field: f'x{KEYWORD}x'})
+    create_role(1)
+
+    found = search.search(models.SysRole.objects.all(), search.ROLE_SEARCH_FIELDS, KEYWORD.lower())
+
+    assert list(found.values_list('id', flat=True)) == [matched.id]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('field', search.USER_SEARCH_FIELDS)
+def test_search_users_matches_each_field(field):
+    matched = create_user(0, **{field: f'x{KEYWORD}x'})
+    create_user(1)
+
+    found = search.search(models.SysUser.objects.all(), search.USER_SEARCH_FIELDS, KEYWORD.upper())
+
+    assert list(found.values_list('id', flat=True)) == [matched.id]
+
+
+def test_search_ranked_annotates_relevance():
+    queryset = search.search(models.SysDict.objects.all(), search.DICT_SEARCH_FIELDS, KEYWORD, ranked=True)
+    assert search.RELEVANCE in queryset.query.annotations
+
+    queryset = search.search(models.SysDict.objects.all(), search.DICT_SEARCH_FIELDS, KEYWORD)
+    assert search.RELEVANCE not in queryset.query.annotations
+
+
+@pytest.mark.parametrize('sort, expected', [
+    ('relevance', True),
+    ('relevance,desc', True),
+    (' relevance ,asc', True),
+    ('createTime,desc', False),
+    ('relevanceX,desc', False),
+    ('', False),
+])
+def test_is_relevance(sort, expected):
+    assert search.is_relevance(sort) is expected
+
+
+@pytest.mark.django_db
+def test_list_roles_relevance_without_keyword_falls_back_to_create_time(admin_client):
+    # 创建时间晚于其他角色，排在 createTime,desc 的最前面；先创建的角色创建时间更晚，与 id 顺序相反
+    base = timezone.now() + datetime.timedelta(days=365)
+    roles = [create_role(i) for i in range(3)]
+    for i, role in enumerate(roles):
+        models.SysRole.objects.filter(id=role.id).update(create_time=base - datetime.timedelta(minutes=i))
+
+    response = admin_client.get('/system/role', {'sort': 'relevance,desc', 'size': 3})
+
+    body = response.json()
+    assert body['success'], body
+    assert [item['id'] for item in body['data']['list']] == [role.id for role in roles]
+
+
+@pytest.mark.django_db
+def test_get_dict_list_without_keyword_returns_all(admin_client):
+    _dict = models.SysDict.objects.create(name='test_search_dict', code='test_search_dict', is_system=0, create_user=1)
+
+    response = admin_client.get('/system/dict/list')
+
+    ids = [item['id'] for item in response.json()['data']]
+    assert _dict.id in ids
+    assert len(ids) == models.SysDict.objects.count()
+
+
+@pytest.mark.django_db
+def test_get_dict_list_keyword_ranks_by_relevance(admin_client, trigram):
+    exact = models.SysDict.objects.create(name=KEYWORD, code='test_search_dict0', is_system=0, create_user=1)
+    partial = models.SysDict.objects.create(
+        name='test_search_dict1', code='test_search_dict1', description=f'prefix{KEYWORD}suffix',
+        is_system=0, create_user=1
+    )
+    models.SysDict.objects.create(name='test_search_dict2', code='test_search_dict2', is_system=0, create_user=1)
+
+    response = admin_client.get('/system/dict/list', {'description': KEYWORD})
+
+    assert [item['id'] for item in response.json()['data']] == [exact.id, partial.id]
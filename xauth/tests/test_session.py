@@ -0,0 +1,111 @@
+"""
+会话和路由树缓存测试
+
+缓存命中时不查询数据库；角色、角色菜单、菜单变化后（事务提交后）读取到新的数据
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from xauth import models, route_cache, session
+
+TEST_ROLE_ID = 987654
+OTHER_ROLE_ID = 987655
+
+
+def create_menu(title, parent=None, menu_type=2, sort=1):
+    return models.SysMenu.objects.create(
+        title=title, parent_id=parent.id if parent else 0, type=menu_type, sort=sort, status=1, create_user=1
+    )
+
+
+def titles(tree):
+    return [(node['title'], titles(node['children'])) for node in tree]
+
+
+@pytest.fixture
+def setup(mem_cache, django_capture_on_commit_callbacks):
+    """用户拥有 TEST_ROLE_ID，角色可见 root -> page（及其按钮）"""
+    with django_capture_on_commit_callbacks(execute=True):
+        role = models.SysRole.objects.create(
+            id=TEST_ROLE_ID, name='test_role', code='test_role', data_scope=1, sort=1,
+            is_system=0, create_user=1
+        )
+        root = create_menu('test_route_root', menu_type=1)
+        page = create_menu('test_route_page', root)
+        button = create_menu('test_route_button', page, menu_type=3)
+        other = create_menu('test_route_other', menu_type=1, sort=2)
+        user = models.SysUser.objects.create(
+            username='test_route_user', password='', gender=0, dept_id=1, status=1, is_system=0
+        )
+        models.SysUserRole.objects.create(user_id=user.id, role_id=TEST_ROLE_ID)
+        models.SysRoleMenu.sync_association('role_id', TEST_ROLE_ID, 'menu_id', [page.id, button.id])
+    return dict(role=role, root=root, page=page, button=button, other=other, user=user)
+
+
+@pytest.mark.django_db
+def test_cached_session(setup):
+    data = session.get_session(setup['user'].id)
+    assert data['user']['roles'] == ['test_role']
+    assert titles(data['routes']) == [('test_route_root', [('test_route_page', [])])]
+
+    with CaptureQueriesContext(connection) as queries:
+        assert session.get_session(setup['user'].id) == data
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_routes_shared_by_role_set(setup):
+    routes = route_cache.get_routes([TEST_ROLE_ID])
+    with CaptureQueriesContext(connection) as queries:
+        assert route_cache.get_routes([TEST_ROLE_ID, TEST_ROLE_ID]) is routes
+    assert len(queries) == 0
+    assert route_cache.get_routes([TEST_ROLE_ID, OTHER_ROLE_ID]) == routes
+
+
+@pytest.mark.django_db
+def test_role_menu_change_invalidates_routes(setup, django_capture_on_commit_callbacks):
+    session.get_session(setup['user'].id)
+    other_routes = route_cache.get_routes([OTHER_ROLE_ID])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        models.SysRoleMenu.sync_association('role_id', TEST_ROLE_ID, 'menu_id', [setup['other'].id])
+    assert titles(session.get_session(setup['user'].id)['routes']) == [('test_route_other', [])]
+    # 其他角色集合的缓存不受影响
+    assert route_cache.get_routes([OTHER_ROLE_ID]) is other_routes
+
+    with django_capture_on_commit_callbacks(execute=True):
+        models.SysRoleMenu.objects.create(role_id=TEST_ROLE_ID, menu_id=setup['page'].id)
+    assert titles(session.get_session(setup['user'].id)['routes']) == [
+        ('test_route_root', [('test_route_page', [])]), ('test_route_other', [])
+    ]
+
+
+@pytest.mark.django_db
+def test_menu_change_invalidates_routes(setup, django_capture_on_commit_callbacks):
+    session.get_session(setup['user'].id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        setup['page'].title = 'test_route_page_renamed'
+        setup['page'].save()
+    assert titles(session.get_session(setup['user'].id)['routes']) == [
+        ('test_route_root', [('test_route_page_renamed', [])])
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        models.SysMenu.delete_menus(setup['root'].id)
+    assert session.get_session(setup['user'].id)['routes'] == []
+
+
+@pytest.mark.django_db
+def test_role_change_invalidates_session(setup, django_capture_on_commit_callbacks):
+    session.get_session(setup['user'].id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        setup['role'].code = 'test_role_renamed'
+        setup['role'].save()
+    assert session.get_session(setup['user'].id)['user']['roles'] == ['test_role_renamed']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        models.SysUserRole.sync_association('user_id', setup['user'].id, 'role_id', [])
+    data = session.get_session(setup['user'].id)
+    assert data['user']['roles'] == [] and data['routes'] == []
@@ -0,0 +1,170 @@
+"""
+部门/菜单树缓存测试
+
+缓存建立后，节点的修改在事务提交时增量合并（不重新加载全表）；
+事务外的修改合并到下一次读取时刷新
+"""
+import contextlib
+from typing import Any, Dict, List, Optional
+import pytest
+from django.db import transaction
+from xauth import models
+from xauth import tree_cache
+from xauth.tree_cache import dept_tree_cache
+
+
+def find(tree: List[Dict[str, Any]], node_id: int, parent_id: int = 0) -> Optional[Dict[str, Any]]:
+    """在树中查找节点（返回的节点带 _parent 字段）"""
+    for node in tree:
+        if node['id'] == node_id:
+            return dict(node, _parent=parent_id)
+        found = find(node['children'], node_id, node['id'])
+        if found is not None:
+            return found
+    return None
+
+
+def create_dept(name: str, parent: Optional[models.SysDept] = None, sort: int = 1) -> models.SysDept:
+    return models.SysDept.objects.create(
+        name=name, parent_id=parent.id if parent else 0, ancestors=parent.path if parent else '0',
+        sort=sort, status=1, is_system=0, create_user=1
+    )
+
+
+@pytest.fixture
+def depts(mem_cache, django_capture_on_commit_callbacks):
+    """root -> (a -> c, b)，并建立缓存"""
+    with django_capture_on_commit_callbacks(execute=True):
+        root = create_dept('test_tree_root')
+        a = create_dept('test_tree_a', root, sort=1)
+        b = create_dept('test_tree_b', root, sort=2)
+        c = create_dept('test_tree_c', a)
+    dept_tree_cache.get('all')
+    return dict(root=root, a=a, b=b, c=c)
+
+
+@pytest.fixture
+def no_reload(monkeypatch):
+    """禁止刷新时重新加载全表"""
+    def fail():
+        raise AssertionError('tree cache reloaded the whole table')
+    monkeypatch.setattr(dept_tree_cache, '_load_all', fail)
+
+
+@pytest.fixture
+def publishes(monkeypatch):
+    """记录发布新版本的次数"""
+    calls = []
+    publish = dept_tree_cache._publish
+
+    def counting(nodes, old_version):
+        calls.append(len(nodes))
+        return publish(nodes, old_version)
+    monkeypatch.setattr(dept_tree_cache, '_publish', counting)
+    return calls
+
+
+@contextlib.contextmanager
+def autocommit():
+    """模拟不在事务中的信号（测试本身运行在事务中，只对 mark_dirty 生效）"""
+    connection = transaction.get_connection()
+    connection.in_atomic_block, connection.autocommit = False, True
+    try:
+        yield
+    finally:
+        connection.in_atomic_block, connection.autocommit = True, False
+
+
+@pytest.mark.django_db
+def test_flush_patches_renamed_moved_and_deleted_nodes(depts, no_reload, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        depts['a'].name = 'test_tree_a_renamed'
+        depts['a'].save()
+        depts['c'].move_to(depts['b'])
+        depts['b'].sort = 0
+        depts['b'].save()
+    with django_capture_on_commit_callbacks(execute=True):
+        models.SysDept.delete_depts(depts['a'].id)
+
+    tree = dept_tree_cache.get('all')
+    root = find(tree, depts['root'].id)
+    assert [child['id'] for child in root['children']] == [depts['b'].id]
+    assert find(tree, depts['c'].id)['_parent'] == depts['b'].id
+    assert find(tree, depts['a'].id) is None
+    assert depts['a'].id not in {node['id'] for node in dept_tree_cache.get('nodes')}
+
+
+@pytest.mark.django_db
+def test_flush_uses_committed_values(depts, no_reload, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        depts['a'].name = 'test_tree_a_renamed'
+        depts['a'].save()
+        depts['a'].name = 'test_tree_a_final'
+        depts['a'].save()
+
+    assert find(dept_tree_cache.get('all'), depts['a'].id)['name'] == 'test_tree_a_final'
+
+
+@pytest.mark.django_db
+def test_rolled_back_savepoint_still_flushes(depts, no_reload, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        # 批次的第一个回调注册在被回滚的保存点中
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                depts['b'].name = 'test_tree_b_rolled_back'
+                depts['b'].save()
+                raise RuntimeError
+        depts['a'].name = 'test_tree_a_renamed'
+        depts['a'].save()
+
+    tree = dept_tree_cache.get('all')
+    assert find(tree, depts['a'].id)['name'] == 'test_tree_a_renamed'
+    assert find(tree, depts['b'].id)['name'] == 'test_tree_b'
+
+
+@pytest.mark.django_db
+def test_autocommit_changes_coalesce_into_one_refresh(depts, no_reload, publishes):
+    for i, name in enumerate(('a', 'b', 'c')):
+        depts[name].name = f'test_tree_{name}_renamed{i}'
+        depts[name].save()
+        with autocommit():
+            dept_tree_cache.mark_dirty(depts[name].id)
+    assert publishes == []
+
+    tree = dept_tree_cache.get('all')
+    assert len(publishes) == 1
+    assert [find(tree, depts[name].id)['name'] for name in ('a', 'b', 'c')] == [
+        'test_tree_a_renamed0', 'test_tree_b_renamed1', 'test_tree_c_renamed2'
+    ]
+    # 待刷新列表已清空，之后的读取直接命中缓存
+    dept_tree_cache.get('enabled')
+    assert len(publishes) == 1
+
+
+@pytest.mark.django_db
+def test_autocommit_pending_changes_merge_into_commit_flush(depts, no_reload, django_capture_on_commit_callbacks):
+    depts['a'].name = 'test_tree_a_renamed'
+    depts['a'].save()
+    with autocommit():
+        dept_tree_cache.mark_dirty(depts['a'].id)
+    with django_capture_on_commit_callbacks(execute=True):
+        depts['b'].name = 'test_tree_b_renamed'
+        depts['b'].save()
+
+    tree = dept_tree_cache.get('all')
+    assert find(tree, depts['a'].id)['name'] == 'test_tree_a_renamed'
+    assert find(tree, depts['b'].id)['name'] == 'test_tree_b_renamed'
+
+
+@pytest.mark.django_db
+def test_too_many_autocommit_changes_rebuild_once(depts, monkeypatch, publishes):
+    monkeypatch.setattr(tree_cache, 'TREE_CACHE_DIRTY_MAX', 2)
+    created = []
+    for i in range(3):
+        created.append(create_dept(f'test_tree_new{i}', depts['b']))
+        with autocommit():
+            dept_tree_cache.mark_dirty(created[-1].id)
+
+    tree = dept_tree_cache.get('all')
+    assert len(publishes) == 1
+    assert [child['id'] for child in find(tree, depts['b'].id)['children']] == [dept.id for dept in created]
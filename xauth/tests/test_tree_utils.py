@@ -0,0 +1,98 @@
+"""
+树结构构建测试
+
+build_trees 的各视图应与原来逐个视图构建的结果一致：
+先按条件过滤记录，再按 sort 排序递归构建（被过滤节点的子孙不出现）
+"""
+import random
+from typing import Any, Callable, Dict, List, Optional
+import pytest
+from xauth.tree_utils import DEPT_VIEWS, MENU_VIEWS, TreeView, build_trees, choice_format, with_ancestors
+
+Node = Dict[str, Any]
+
+
+def legacy_tree(
+    nodes: List[Node],
+    include: Optional[Callable[[Node], bool]] = None,
+    fmt: Callable[[Node], Node] = dict,
+    parent_id: int = 0
+) -> List[Node]:
+    """原来的构建方式：过滤后建立父子索引，每层按 sort 排序后递归"""
+    children_map: Dict[int, List[Node]] = {}
+    for node in nodes:
+        if include is None or include(node):
+            children_map.setdefault(node['parentId'], []).append(node)
+
+    def build_subtree(pid: int) -> List[Node]:
+        result = []
+        for node in sorted(children_map.get(pid, []), key=lambda node: node['sort']):
+            item = fmt(node)
+            item['children'] = build_subtree(node['id'])
+            result.append(item)
+        return result
+
+    return build_subtree(parent_id)
+
+
+def random_nodes(count: int, seed: int, extra: Callable[[random.Random], Node]) -> List[Node]:
+    """随机生成一片森林（节点按 ID 顺序给出，sort 互不相同）"""
+    rng = random.Random(seed)
+    sorts = rng.sample(range(count * 10), count)
+    nodes = []
+    for node_id in range(1, count + 1):
+        parent_id = rng.choice([0] + list(range(1, node_id))) if node_id > 1 else 0
+        node = {'id': node_id, 'parentId': parent_id, 'sort': sorts[node_id - 1]}
+        node.update(extra(rng))
+        nodes.append(node)
+    rng.shuffle(nodes)
+    return nodes
+
+
+def dept_fields(rng: random.Random) -> Node:
+    return {'name': f'dept{rng.random():.6f}', 'status': rng.choice([1, 1, 2])}
+
+
+def menu_fields(rng: random.Random) -> Node:
+    return {'title': f'menu{rng.random():.6f}', 'type': rng.choice([1, 2, 3])}
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_dept_views_match_legacy(seed):
+    nodes = random_nodes(200, seed, dept_fields)
+    trees = build_trees(nodes, DEPT_VIEWS)
+
+    assert trees['all'] == legacy_tree(nodes)
+    assert trees['enabled'] == legacy_tree(nodes, lambda node: node['status'] == 1)
+    assert trees['choice'] == legacy_tree(
+        nodes, lambda node: node['status'] == 1, choice_format('name')
+    )
+    disabled = sorted((node for node in nodes if node['status'] == 2), key=lambda node: node['sort'])
+    assert trees['disabled'] == disabled
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_menu_views_match_legacy(seed):
+    nodes = random_nodes(200, seed, menu_fields)
+    trees = build_trees(nodes, MENU_VIEWS)
+
+    assert trees['all'] == legacy_tree(nodes)
+    assert trees['choice'] == legacy_tree(nodes, fmt=choice_format('title'))
+    assert trees['route'] == legacy_tree(nodes, lambda node: node['type'] != 3)
+
+
+def test_menu_subset_with_ancestors():
+    nodes = random_nodes(100, 42, menu_fields)
+    ids = [5, 17, 60, 99, 12345]
+    needed = with_ancestors(nodes, ids)
+    view = TreeView(include=lambda node: node['id'] in needed)
+
+    assert build_trees(nodes, {'tree': view})['tree'] == legacy_tree(nodes, view.include)
+    parents = {node['id']: node['parentId'] for node in nodes}
+    assert all(parents[node_id] in needed or parents[node_id] == 0 for node_id in needed)
+    assert 12345 not in needed
+
+
+def test_parent_id():
+    nodes = random_nodes(50, 7, dept_fields)
+    assert build_trees(nodes, {'tree': TreeView()}, parent_id=1)['tree'] == legacy_tree(nodes, parent_id=1)
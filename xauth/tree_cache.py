@@ -0,0 +1,195 @@
+"""
+部门/菜单树缓存
+
+树的各个视图（完整树、按状态过滤、选择器格式）由缓存中的扁平节点表组装，数据变化时增量维护：
+- 保存/删除信号只记录变化的节点 ID，同一事务内的变化在提交后合并为一次刷新
+- 事务外的变化（批量导入脚本等逐条自动提交）只追加到缓存中的待刷新列表，由下一次读取合并为一次刷新，
+  不再每条保存都重新组装全部视图；待刷新节点超过 TREE_CACHE_DIRTY_MAX 个时改为全量构建
+- 刷新时只重新查询变化的节点，修补扁平节点表后由 tree_utils.build_trees 一次遍历重新组装各视图，不再全表查询
+- 每次刷新写入新版本的全部视图后再切换版本指针，读取方不会看到部分更新的树；旧版本短时间后过期
+- 缓存缺失（首次访问、Redis 被清空）时全量构建
+"""
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from django.core.cache import cache
+from django.db import models as db_models, transaction
+from loguru import logger
+from xauth import models
+from xauth.loaders import fill_user_strings
+from xauth.tree_utils import DEPT_VIEWS, MENU_VIEWS, Node, TreeView, build_trees, dept_node, menu_node
+
+TREE_CACHE_LOCK_TIMEOUT = 60
+TREE_CACHE_STALE_TIMEOUT = 60
+TREE_CACHE_DIRTY_MAX = 100
+TREE_CACHE_DIRTY_ALL = 'all'
+
+
+class TreeCache:
+    """
+    一类树（部门或菜单）的版本化缓存
+
+    缓存键：
+        {name}_tree_version              当前版本号
+        {name}_tree_dirty                事务外变化、尚未刷新的节点 ID 列表（或 all）
+        {name}_tree:{version}:nodes      扁平节点表
+        {name}_tree:{version}:{view}     各视图
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: type,
+        node: Callable[[db_models.Model], Node],
+        views: Dict[str, TreeView]
+    ):
+        self.name = name
+        self.model = model
+        self.node = node
+        self.views = views
+        self._pending = threading.local()
+
+    def _key(self, version: str, view: str) -> str:
+        return f'{self.name}_tree:{version}:{view}'
+
+    @property
+    def _version_key(self) -> str:
+        return f'{self.name}_tree_version'
+
+    @property
+    def _dirty_key(self) -> str:
+        return f'{self.name}_tree_dirty'
+
+    @property
+    def _lock_key(self) -> str:
+        return f'{self.name}_tree_lock'
+
+    def get(self, view: str) -> Any:
+        """
+        获取视图
+
+        Args:
+            view: 视图名称（nodes 为扁平节点表）
+
+        Returns:
+            树结构（有待刷新的节点时先合并刷新，缓存缺失时全量构建）
+        """
+        state = cache.get_many([self._version_key, self._dirty_key])
+        version = state.get(self._version_key)
+        if version is not None and self._dirty_key not in state:
+            data = cache.get(self._key(version, view))
+            if data is not None:
+                return data
+        with cache.lock(self._lock_key, timeout=TREE_CACHE_LOCK_TIMEOUT):
+            # 等待锁期间其他进程可能已经刷新完成
+            state = cache.get_many([self._version_key, self._dirty_key])
+            latest = state.get(self._version_key)
+            if latest is not None and latest != version and self._dirty_key not in state:
+                data = cache.get(self._key(latest, view))
+                if data is not None:
+                    return data
+            return self._refresh(set())[view]
+
+    def mark_dirty(self, node_id: int) -> None:
+        """记录变化的节点，所在事务提交后刷新（不在事务中时由下一次读取刷新）"""
+        self.mark_dirty_many([node_id])
+
+    def mark_dirty_many(self, node_ids: Iterable[int]) -> None:
+        """
+        记录变化的多个节点，所在事务提交后刷新（不在事务中时由下一次读取刷新）
+
+        同一个最外层事务内的节点合并到一个批次；每次调用都注册提交回调，
+        回调取走整批节点，因此即使注册回调的保存点被回滚，批次仍会在提交时刷新
+        """
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            self._defer(node_ids)
+            return
+        owner = connection.atomic_blocks[0]
+        batch = getattr(self._pending, 'batch', None)
+        if batch is None or batch['owner'] is not owner:
+            batch = {'owner': owner, 'ids': set()}
+            self._pending.batch = batch
+        batch['ids'].update(node_ids)
+        transaction.on_commit(lambda: self._flush(batch))
+
+    def _defer(self, node_ids: Iterable[int]) -> None:
+        """把事务外变化的节点追加到待刷新列表"""
+        try:
+            with cache.lock(self._lock_key, timeout=TREE_CACHE_LOCK_TIMEOUT):
+                dirty = cache.get(self._dirty_key)
+                if dirty != TREE_CACHE_DIRTY_ALL:
+                    ids = set(dirty or ()) | set(node_ids)
+                    dirty = sorted(ids) if len(ids) <= TREE_CACHE_DIRTY_MAX else TREE_CACHE_DIRTY_ALL
+                cache.set(self._dirty_key, dirty, None)
+        except Exception as e:
+            self._discard(e)
+
+    def _flush(self, batch: Dict[str, Any]) -> None:
+        ids = batch['ids']
+        if not ids:
+            return
+        batch['ids'] = set()
+        try:
+            with cache.lock(self._lock_key, timeout=TREE_CACHE_LOCK_TIMEOUT):
+                self._refresh(ids)
+        except Exception as e:
+            self._discard(e)
+
+    def _discard(self, error: Exception) -> None:
+        # 缓存不可用时删除版本指针，下次读取时全量构建
+        logger.error(f"Failed to refresh {self.name} tree cache: {error}")
+        try:
+            cache.delete(self._version_key)
+        except Exception:
+            pass
+
+    def _refresh(self, ids: Set[int]) -> Dict[str, Any]:
+        """
+        把变化的节点连同待刷新列表中的节点修补进扁平节点表并发布新版本（调用方持有锁）
+
+        Args:
+            ids: 变化的节点 ID
+
+        Returns:
+            新版本的全部视图
+        """
+        version, dirty = cache.get(self._version_key), cache.get(self._dirty_key)
+        cached = cache.get(self._key(version, 'nodes')) if version is not None else None
+        if cached is None or dirty == TREE_CACHE_DIRTY_ALL:
+            nodes = self._load_all()
+        else:
+            ids = set(ids) | set(dirty or ())
+            nodes = {node['id']: node for node in cached}
+            for node_id in ids:
+                nodes.pop(node_id, None)
+            if ids:
+                changed = [self.node(item) for item in self.model.objects.filter(id__in=ids)]
+                for node in fill_user_strings(changed):
+                    nodes[node['id']] = node
+        data = self._publish(nodes, version)
+        if dirty is not None:
+            cache.delete(self._dirty_key)
+        return data
+
+    def _load_all(self) -> Dict[int, Node]:
+        nodes = fill_user_strings([self.node(item) for item in self.model.objects.all()])
+        return {node['id']: node for node in nodes}
+
+    def _publish(self, nodes: Dict[int, Node], old_version: Optional[str]) -> Dict[str, Any]:
+        node_list = list(nodes.values())
+        data = build_trees(node_list, self.views)
+        data['nodes'] = node_list
+        version = uuid.uuid4().hex
+        cache.set_many({self._key(version, view): value for view, value in data.items()}, None)
+        cache.set(self._version_key, version, None)
+        if old_version is not None:
+            # 正在读取旧版本的请求仍能读到完整的旧数据
+            for view in list(self.views) + ['nodes']:
+                cache.touch(self._key(old_version, view), TREE_CACHE_STALE_TIMEOUT)
+        return data
+
+
+dept_tree_cache = TreeCache('dept', models.SysDept, dept_node, DEPT_VIEWS)
+
+menu_tree_cache = TreeCache('menu', models.SysMenu, menu_node, MENU_VIEWS)
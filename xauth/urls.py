@@ -5,6 +5,7 @@ from django.conf import urls as default_urls
 from ninja_extra import NinjaExtraAPI
 from ninja_jwt.exceptions import AuthenticationFailed
 from xauth import auth
+from xutils import renderers
 from xutils.utils import RespFailedTempl
 from loguru import logger
 from . import api_auth
@@ -20,7 +21,8 @@ from . import api_common
 
 api = NinjaExtraAPI(auth=auth.XadminBaseAuth(), 
                     title='xadmin', 
-                    urls_namespace='xadmin')
+                    urls_namespace='xadmin',
+                    renderer=renderers.get_renderer())
 
 api.add_router('user', api_user.router)
 api.add_router('auth', api_auth.router)
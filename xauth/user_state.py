@@ -0,0 +1,127 @@
+"""
+用户状态缓存
+
+JWT 认证只需要用户的状态（是否禁用）和是否为系统用户，不必每个请求都查询 SysUser：
+- 进程内缓存（带 TTL）命中时不访问 Redis 和数据库；未命中时读取 Redis，Redis 未命中时才查询数据库并回填
+- 用户保存或删除后删除 Redis 中的记录，并通过 Redis pub/sub 通知所有进程清除进程内缓存
+- Web 工作进程（由 xadmin.wsgi / xadmin.asgi 启动，设置了 XADMINSTART）在首次使用时启动订阅线程；
+  管理命令和测试不启动，只依赖本进程的失效和 TTL；订阅断开期间进程内缓存最多在 USER_STATE_LOCAL_TTL 秒后过期
+- Redis 不可用时直接查询数据库
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from django.core.cache import cache
+from django.db import transaction
+from loguru import logger
+from xauth import models
+
+USER_STATE_KEY_PREFIX = 'user_state'
+USER_STATE_CHANNEL = 'xauth:user_state'
+USER_STATE_LOCAL_TTL = 60
+USER_STATE_TIMEOUT = 60 * 60 * 24
+USER_STATE_RETRY_MAX = 60
+
+# user_id -> (过期时间, 状态)
+_local: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+_lock = threading.Lock()
+_listener_pid: Optional[int] = None
+
+
+def _cache_key(user_id: int) -> str:
+    return f'{USER_STATE_KEY_PREFIX}:{user_id}'
+
+
+def _load(user_id: int) -> Optional[Dict[str, Any]]:
+    row = models.SysUser.objects.filter(id=user_id).values('id', 'status', 'is_system').first()
+    return dict(row) if row else None
+
+
+def get_user_state(user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    获取用户状态
+
+    Args:
+        user_id: 用户ID
+
+    Returns:
+        {'id': 用户ID, 'status': 状态, 'is_system': 是否为系统用户}；用户不存在时返回 None
+    """
+    _ensure_listener()
+    now = time.monotonic()
+    entry = _local.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    try:
+        state = cache.get(_cache_key(user_id))
+        if state is None:
+            state = _load(user_id)
+            if state is None:
+                return None
+            cache.set(_cache_key(user_id), state, USER_STATE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"User state cache unavailable, falling back to database: {e}")
+        state = _load(user_id)
+        if state is None:
+            return None
+
+    with _lock:
+        _local[user_id] = (now + USER_STATE_LOCAL_TTL, state)
+    return state
+
+
+def invalidate_user_state(user_id: int) -> None:
+    """事务提交后清除用户状态缓存，并通知其他进程"""
+    def _invalidate():
+        with _lock:
+            _local.pop(user_id, None)
+        try:
+            cache.delete(_cache_key(user_id))
+            from django_redis import get_redis_connection
+            get_redis_connection('default').publish(USER_STATE_CHANNEL, str(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to publish user state invalidation for {user_id}: {e}")
+    transaction.on_commit(_invalidate)
+
+
+def _ensure_listener() -> None:
+    """在 Web 工作进程中启动订阅线程（fork 出的子进程会重新启动）"""
+    global _listener_pid
+    if os.environ.get('XADMINSTART') != 'True':
+        return
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+    with _lock:
+        if _listener_pid == pid:
+            return
+        _listener_pid = pid
+        threading.Thread(target=_listen, name='user-state-listener', daemon=True).start()
+
+
+def _listen() -> None:
+    delay = 1
+    while True:
+        try:
+            from django_redis import get_redis_connection
+            pubsub = get_redis_connection('default').pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(USER_STATE_CHANNEL)
+            # 订阅前的通知可能已丢失
+            with _lock:
+                _local.clear()
+            delay = 1
+            for message in pubsub.listen():
+                try:
+                    user_id = int(message['data'])
+                except (TypeError, ValueError):
+                    continue
+                with _lock:
+                    _local.pop(user_id, None)
+        except Exception as e:
+            logger.warning(f"User state listener disconnected, retrying in {delay}s: {e}")
+            with _lock:
+                _local.clear()
+            time.sleep(delay)
+            delay = min(delay * 2, USER_STATE_RETRY_MAX)
@@ -6,6 +6,8 @@ Case Browser API 端点
 - 标签管理
 - 选项管理
 """
+from typing import Literal, Optional
+from django.db.models import Count
 from django.http import HttpRequest
 from ninja_extra import Router
 from loguru import logger
@@ -13,48 +15,118 @@ from loguru import logger
 from xutils import utils
 from . import schemas
 from .models import CaseMetadata, CaseTag, CaseOption
-from .file_manager import file_manager
+from .constants import CASE_LIST_PAGE_SIZE, CASE_LIST_MAX_PAGE_SIZE
+from .metadata_sync import ensure_casespace_synced
 
 
 router = Router(tags=["Case Browser"])
 
 
+# 列表排序字段（前端字段名 -> 模型字段名）
+CASE_SORT_FIELDS = {
+    'caseName': 'case_name',
+    'updateTime': 'update_time',
+}
+
+
 @router.get("/casespaces/{casespace}/cases", url_name="get_cases_metadata")
-def get_cases_metadata(request: HttpRequest, casespace: str):
+def get_cases_metadata(
+    request: HttpRequest,
+    casespace: str,
+    page: Optional[int] = None,
+    size: int = CASE_LIST_PAGE_SIZE,
+    sort: str = 'caseName,asc',
+    name: Optional[str] = None,
+    tags: Optional[str] = None,
+    tagMatch: Literal['any', 'all'] = 'any',
+    options: Optional[str] = None
+):
     """
-    获取指定 Casespace 下所有 Case 的元数据（包含 tags）
+    获取指定 Casespace 下 Case 的元数据（包含 tags 和 options）
+    
+    过滤、排序和分页都在数据库中完成，元数据在 Casespace 目录变化时与磁盘同步。
     
     Path Parameters:
         casespace: Casespace 名称
+    
+    Query Parameters:
+        page: 页码（可选，不传时返回全部结果的列表）
+        size: 每页数量
+        sort: 排序，格式为 "字段,asc|desc"，字段为 caseName 或 updateTime
+        name: Case 名称前缀
+        tags: 标签过滤，多个标签用逗号分隔
+        tagMatch: any（包含任一标签，默认）或 all（包含全部标签）
+        options: 选项过滤，格式为 "key=value"，多个用逗号分隔（需全部匹配）
         
     Returns:
-        Case 元数据列表，包含 casespace, caseName, tags
+        Case 元数据列表，包含 casespace, caseName, tags, options；
+        传入 page 时返回 {list, total}
     """
     try:
-        # Get all cases from file system
-        cases = file_manager.get_cases(casespace)
+        if page is not None and (page < 1 or not 1 <= size <= CASE_LIST_MAX_PAGE_SIZE):
+            raise ValueError(f"page must be >= 1 and size between 1 and {CASE_LIST_MAX_PAGE_SIZE}")
+        
+        sort_field, _, sort_order = sort.partition(',')
+        if sort_field not in CASE_SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {sort_field}")
+        order_by = f"{'-' if sort_order == 'desc' else ''}{CASE_SORT_FIELDS[sort_field]}"
+        
+        # Keep metadata in sync with the case directories
+        ensure_casespace_synced(casespace)
+        
+        queryset = CaseMetadata.objects.filter(casespace=casespace)
+        
+        if name:
+            queryset = queryset.filter(case_name__startswith=name)
+        
+        tag_list = [tag.strip() for tag in (tags or '').split(',') if tag.strip()]
+        if tag_list:
+            tagged = CaseTag.objects.filter(tag__in=tag_list).values('metadata_id')
+            if tagMatch == 'all':
+                tagged = tagged.annotate(
+                    matched=Count('tag', distinct=True)
+                ).filter(matched=len(set(tag_list)))
+            queryset = queryset.filter(id__in=tagged.values('metadata_id'))
+        
+        for pair in (options or '').split(','):
+            if not pair.strip():
+                continue
+            key, sep, value = pair.partition('=')
+            if not sep or not key.strip():
+                raise ValueError(f"Invalid option filter: {pair}")
+            queryset = queryset.filter(id__in=CaseOption.objects.filter(
+                key=key.strip(),
+                value=value.strip()
+            ).values('metadata_id'))
+        
+        queryset = queryset.order_by(order_by, 'id')
+        
+        total = None
+        if page is not None:
+            total = queryset.count()
+            queryset = queryset[(page - 1) * size:page * size]
         
         result = []
-        for case_info in cases:
-            case_name = case_info['name']
-            
-            # Get or create metadata
-            metadata, created = CaseMetadata.objects.get_or_create(
-                casespace=casespace,
-                case_name=case_name
-            )
-            
-            # Get tags
-            tags = list(metadata.tags.values_list('tag', flat=True))
-            
+        for metadata in queryset.prefetch_related('tags', 'options'):
             result.append({
                 'casespace': casespace,
-                'caseName': case_name,
-                'tags': tags
+                'caseName': metadata.case_name,
+                'tags': [tag.tag for tag in metadata.tags.all()],
+                'options': [
+                    {'key': opt.key, 'value': opt.value}
+                    for opt in metadata.options.all()
+                ],
+                'fileCount': metadata.file_count,
+                'totalSize': metadata.total_size
             })
         
         resp = utils.RespSuccessTempl()
-        resp.data = result
+        resp.data = result if page is None else dict(list=result, total=total)
+        return resp.as_dict()
+    except ValueError as e:
+        logger.warning(f"Invalid cases metadata query: {e}")
+        resp = utils.RespFailedTempl()
+        resp.data = str(e)
         return resp.as_dict()
     except Exception as e:
         logger.error(f"Error getting cases metadata: {e}")
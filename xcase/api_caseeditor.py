@@ -9,13 +9,15 @@ Case Editor API 端点
 - Case 的上传下载
 """
 from typing import Optional
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
 from ninja_extra import Router
 from loguru import logger
 
 from xutils import utils
 from . import schemas
 from .file_manager import file_manager
+from .constants import FILE_TREE_PAGE_SIZE, FILE_TREE_MAX_PAGE_SIZE, MAX_ARCHIVE_SIZE
 from .exceptions import (
     CaseNotFoundException,
     CasespaceNotFoundException,
@@ -81,7 +83,10 @@ def get_file_tree(
     request: HttpRequest,
     casespace: Optional[str] = None,
     case: Optional[str] = None,
-    path: str = "/"
+    path: str = "/",
+    depth: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
     """
     获取文件树结构
@@ -90,9 +95,12 @@ def get_file_tree(
         casespace: Casespace 名称（可选）
         case: Case 名称（可选）
         path: 路径（默认为根目录）
+        depth: 返回的层数（可选，默认返回完整的递归树）
+        cursor: 分页游标，取上一页返回的 nextCursor（可选）
+        limit: 每页数量（可选，指定 limit 或 cursor 时按页返回）
         
     Returns:
-        文件树节点列表
+        文件树节点列表；分页时返回 {list, nextCursor}
     """
     try:
         # 必须同时提供 casespace 和 case
@@ -101,10 +109,28 @@ def get_file_tree(
             resp.data = []  # 返回空数组而不是所有 casespace
             return resp.as_dict()
         
-        file_tree = file_manager.get_file_tree(path, casespace, case)
+        if depth is not None and depth < 1:
+            raise ValueError("depth must be greater than 0")
+        if limit is not None and not 1 <= limit <= FILE_TREE_MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {FILE_TREE_MAX_PAGE_SIZE}")
+        
+        if limit is None and cursor is None:
+            file_tree = file_manager.get_file_tree(path, casespace, case, depth)
+        else:
+            file_tree = file_manager.get_file_tree_page(
+                path, casespace, case,
+                cursor=cursor,
+                limit=limit or FILE_TREE_PAGE_SIZE,
+                depth=depth or 1
+            )
         resp = utils.RespSuccessTempl()
         resp.data = file_tree
         return resp.as_dict()
+    except ValueError as e:
+        logger.warning(f"Invalid file tree query: {e}")
+        resp = utils.RespFailedTempl()
+        resp.data = str(e)
+        return resp.as_dict()
     except PathTraversalException as e:
         logger.warning(f"Path traversal attempt: {e}")
         resp = utils.RespFailedTempl()
@@ -401,24 +427,42 @@ def delete_case(request: HttpRequest, casespace: str, case: str):
 
 
 @router.get("/casespaces/{casespace}/cases/{case}/download", url_name="download_case")
-def download_case(request: HttpRequest, casespace: str, case: str):
+def download_case(request: HttpRequest, casespace: str, case: str, compress: bool = True):
     """
     下载指定的 Case 为 zip 文件
     
+    压缩包边生成边输出（分块传输，不带 Content-Length），内存占用与 Case 大小无关。
+    响应带有 ETag（Case 文件树指纹），If-None-Match 匹配时返回 304。
+    
     Path Parameters:
         casespace: Casespace 名称
         case: Case 名称
+    
+    Query Parameters:
+        compress: 是否压缩（默认 true；false 时所有文件以 stored 模式打包）
         
     Returns:
         zip 文件下载响应
     """
     try:
-        # Get zip data from file manager
-        zip_data = file_manager.download_case(casespace, case)
+        # Get zip stream from file manager
+        etag, zip_stream = file_manager.download_case(casespace, case, compress)
+        etag = quote_etag(etag)
+        
+        # Client already has this archive
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            if '*' in etags or etag in etags or f'W/{etag}' in etags:
+                response = HttpResponse(status=304)
+                response['ETag'] = etag
+                return response
         
-        # Create HTTP response with zip file
-        response = HttpResponse(zip_data, content_type='application/zip')
+        # Stream zip chunks to the client
+        response = StreamingHttpResponse(zip_stream, content_type='application/zip')
         response['Content-Disposition'] = f'attachment; filename="{case}.zip"'
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
         return response
     except CaseNotFoundException as e:
         logger.warning(f"Case not found: {casespace}/{case}")
@@ -465,14 +509,16 @@ def upload_case(request: HttpRequest, casespace: str):
         if 'file' not in request.FILES:
             raise ValueError("file is required")
         
+        # 大文件由 Django 落盘为 TemporaryUploadedFile，直接从文件流式解压，不读入内存
         uploaded_file = request.FILES['file']
-        file_data = uploaded_file.read()
         filename = uploaded_file.name
+        if uploaded_file.size > MAX_ARCHIVE_SIZE:
+            raise ValueError(f"Archive exceeds maximum size of {MAX_ARCHIVE_SIZE} bytes")
         
-        logger.info(f"Processing upload: case_name={case_name}, filename={filename}, size={len(file_data)} bytes")
+        logger.info(f"Processing upload: case_name={case_name}, filename={filename}, size={uploaded_file.size} bytes")
         
         # Upload and extract
-        file_manager.upload_case(casespace, case_name, file_data, filename)
+        file_manager.upload_case(casespace, case_name, uploaded_file, filename)
         
         resp = utils.RespSuccessTempl()
         resp.data = {
@@ -0,0 +1,269 @@
+"""
+流式压缩包生成与解压
+
+打包时边压缩边输出 zip 数据块，不落盘、不在内存中缓存整个压缩包：
+- 输出流不可 seek，zipfile 会为每个成员写入 data descriptor
+- 已压缩的文件（图片、压缩包等）以 stored 模式写入，避免重复压缩
+
+解压时逐个成员读取并分块写入目标目录，读到成员时即做路径遍历检查。
+
+解压 zip 时较大的成员交给进程池，工作进程各自打开归档，并发解压并写入文件；
+tar.gz 是单个 gzip 流，无法拆分，仍按顺序解压。
+打包不并行：zipfile 的公开接口只能在当前线程中逐个成员压缩，
+预读后续成员又要在内存中保留整个文件，与流式打包的内存上限冲突。
+"""
+import multiprocessing
+import os
+import shutil
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from django.conf import settings
+
+from .constants import (
+    ARCHIVE_CHUNK_SIZE,
+    ARCHIVE_STORED_EXTENSIONS,
+    ARCHIVE_WORKERS,
+    ARCHIVE_PARALLEL_MIN_MEMBER,
+)
+from .exceptions import PathTraversalException
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def archive_workers() -> int:
+    """
+    获取解压使用的工作进程数
+
+    读取 settings.XCASE_SETTINGS['ARCHIVE_WORKERS']，未配置时为 ARCHIVE_WORKERS；
+    为 1 时不使用进程池。每个 Web 工作进程各有一个池，数量应保持较小。
+    """
+    workers = getattr(settings, 'XCASE_SETTINGS', {}).get('ARCHIVE_WORKERS', ARCHIVE_WORKERS)
+    return max(int(workers or 1), 1)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """获取共享的进程池（工作进程数变化时重建）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # 主进程中有 watchdog 等后台线程，避免直接 fork
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('forkserver'))
+            _pool_workers = workers
+        return _pool
+
+
+def _extract_members(archive_path: str, members: List[Tuple[str, str]], chunk_size: int) -> int:
+    """工作进程：打开归档并解压指定的成员，members 为 (归档内路径, 目标路径) 列表"""
+    with zipfile.ZipFile(archive_path) as zip_file:
+        for name, target in members:
+            with zip_file.open(name) as src, open(target, 'wb') as out:
+                shutil.copyfileobj(src, out, chunk_size)
+    return len(members)
+
+
+class _StreamBuffer:
+    """zipfile 的输出目标：只支持 write/tell，写入的数据由生成器分块取走"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._offset = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._size += len(data)
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    @property
+    def size(self) -> int:
+        """尚未取走的数据大小"""
+        return self._size
+
+    def pop(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        return data
+
+
+def list_archive_files(root: str) -> List[Tuple[str, str]]:
+    """
+    列出目录下需要打包的文件
+
+    Args:
+        root: 目录的绝对路径
+
+    Returns:
+        (绝对路径, 归档内路径) 列表，按归档内路径排序
+    """
+    files = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        rel_dir = os.path.relpath(dir_path, root)
+        for name in sorted(file_names):
+            arcname = name if rel_dir == '.' else f"{rel_dir}/{name}".replace(os.sep, '/')
+            files.append((os.path.join(dir_path, name), arcname))
+    return files
+
+
+def compress_type_for(arcname: str, compress: bool = True) -> int:
+    """根据文件扩展名选择压缩方式，已压缩格式直接存储"""
+    if not compress:
+        return zipfile.ZIP_STORED
+    if os.path.splitext(arcname)[1].lower() in ARCHIVE_STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def stream_zip(
+    files: List[Tuple[str, str]],
+    compress: bool = True,
+    chunk_size: int = ARCHIVE_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    将文件打包为 zip，逐块生成压缩后的数据
+
+    Args:
+        files: (绝对路径, 归档内路径) 列表，见 list_archive_files
+        compress: 是否压缩；为 False 时所有文件都以 stored 模式写入
+        chunk_size: 每次读取源文件和输出数据块的大小
+
+    Yields:
+        zip 数据块
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w') as zipf:
+        for file_path, arcname in files:
+            zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+            zinfo.compress_type = compress_type_for(arcname, compress)
+            with open(file_path, 'rb') as src, zipf.open(zinfo, 'w') as dest:
+                while True:
+                    data = src.read(chunk_size)
+                    if not data:
+                        break
+                    dest.write(data)
+                    if buffer.size >= chunk_size:
+                        yield buffer.pop()
+            if buffer.size >= chunk_size:
+                yield buffer.pop()
+    # 写入中央目录
+    if buffer.size:
+        yield buffer.pop()
+
+
+def member_target(dest: str, name: str) -> str:
+    """
+    计算归档成员解压后的绝对路径
+
+    Args:
+        dest: 解压目标目录的绝对路径
+        name: 归档内路径
+
+    Returns:
+        成员的绝对路径
+
+    Raises:
+        PathTraversalException: 成员路径为绝对路径或位于目标目录之外
+    """
+    if name.startswith('/') or '..' in name:
+        raise PathTraversalException(name)
+    target = os.path.realpath(os.path.join(dest, name))
+    if os.path.commonpath([dest, target]) != dest:
+        raise PathTraversalException(name)
+    return target
+
+
+def extract_zip(
+    fileobj: BinaryIO,
+    dest: str,
+    chunk_size: int = ARCHIVE_CHUNK_SIZE,
+    workers: int = 1,
+    archive_path: Optional[str] = None
+) -> int:
+    """
+    逐个成员解压 zip
+
+    Args:
+        fileobj: 可 seek 的 zip 文件对象
+        dest: 解压目标目录的绝对路径（需已存在）
+        chunk_size: 每次写入的数据块大小
+        workers: 并行解压的工作进程数（1 表示在当前进程中顺序解压）
+        archive_path: 归档在磁盘上的路径；并行解压时工作进程需要自行打开归档
+
+    Returns:
+        解压的文件数量
+
+    Raises:
+        PathTraversalException: 成员路径不安全
+        zipfile.BadZipFile: 压缩包损坏
+    """
+    dest = os.path.realpath(dest)
+    parallel = workers > 1 and archive_path is not None
+    batches = [[] for _ in range(workers)] if parallel else []
+    batch_sizes = [0] * len(batches)
+    count = 0
+    with zipfile.ZipFile(fileobj) as zip_file:
+        for info in zip_file.infolist():
+            target = member_target(dest, info.filename)
+            if info.is_dir():
+                os.makedirs(target, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if parallel and info.file_size >= ARCHIVE_PARALLEL_MIN_MEMBER:
+                # 分配给当前数据量最少的工作进程
+                index = batch_sizes.index(min(batch_sizes))
+                batches[index].append((info.filename, target))
+                batch_sizes[index] += info.file_size
+                continue
+            with zip_file.open(info) as src, open(target, 'wb') as out:
+                shutil.copyfileobj(src, out, chunk_size)
+            count += 1
+
+    batches = [batch for batch in batches if batch]
+    if batches:
+        pool = _get_pool(workers)
+        futures = [pool.submit(_extract_members, archive_path, batch, chunk_size) for batch in batches]
+        count += sum(future.result() for future in futures)
+    return count
+
+
+def extract_tar(fileobj: BinaryIO, dest: str) -> int:
+    """
+    以流模式逐个成员解压 tar.gz，不需要 seek
+
+    Args:
+        fileobj: tar.gz 文件对象
+        dest: 解压目标目录的绝对路径（需已存在）
+
+    Returns:
+        解压的文件数量
+
+    Raises:
+        PathTraversalException: 成员路径不安全
+        tarfile.TarError: 压缩包损坏或包含不安全的链接
+    """
+    dest = os.path.realpath(dest)
+    count = 0
+    with tarfile.open(fileobj=fileobj, mode='r|gz') as tar:
+        for member in tar:
+            member_target(dest, member.name)
+            # data 过滤器拒绝指向目录外的链接、设备文件等
+            tar.extract(member, dest, filter='data')
+            if member.isfile():
+                count += 1
+    return count
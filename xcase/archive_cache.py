@@ -0,0 +1,184 @@
+"""
+Case 下载缓存
+
+按 Case 文件树的指纹（路径、大小、mtime）缓存打包好的 zip：
+- 指纹相同的下载直接读取磁盘上的缓存文件，不再重新压缩
+- 指纹同时作为 ETag，客户端可通过 If-None-Match 得到 304
+- 缓存总大小和数量超限时按最近使用时间淘汰
+- FileManager 修改 Case 内容时删除该 Case 的全部缓存
+"""
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+from loguru import logger
+
+from .constants import ARCHIVE_CACHE_MAX_BYTES, ARCHIVE_CACHE_MAX_ENTRIES, ARCHIVE_CHUNK_SIZE
+
+ARCHIVE_SUFFIX = '.zip'
+
+
+def fingerprint(case_key: str, files: List[Tuple[str, str]], compress: bool = True) -> str:
+    """
+    计算 Case 文件树的指纹
+
+    Args:
+        case_key: Case 标识（casespace/case）
+        files: (绝对路径, 归档内路径) 列表
+        compress: 是否压缩（不同的打包方式对应不同的归档）
+
+    Returns:
+        十六进制的 sha256 摘要
+
+    Raises:
+        OSError: 文件在遍历过程中被删除
+    """
+    digest = hashlib.sha256(f"{case_key}\0{int(compress)}\n".encode('utf-8'))
+    for file_path, arcname in files:
+        st = os.stat(file_path)
+        digest.update(f"{arcname}\0{st.st_size}\0{st.st_mtime_ns}\n".encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+class ArchiveCache:
+    """磁盘上的 Case 归档缓存，目录结构为 <cache_dir>/<casespace>/<case>/<指纹>.zip"""
+
+    def __init__(
+        self,
+        cache_dir: Callable[[], Path],
+        max_bytes: int = ARCHIVE_CACHE_MAX_BYTES,
+        max_entries: int = ARCHIVE_CACHE_MAX_ENTRIES,
+    ):
+        """
+        Args:
+            cache_dir: 返回缓存根目录的函数（跟随存储根目录变化）
+            max_bytes: 缓存总大小上限
+            max_entries: 缓存归档数量上限
+        """
+        self._cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def open(
+        self,
+        casespace: str,
+        case: str,
+        etag: str,
+        build: Callable[[], Iterator[bytes]],
+    ) -> Iterator[bytes]:
+        """
+        获取归档数据流：命中时读取缓存文件，否则边生成边写入缓存
+
+        Args:
+            casespace: Casespace 名称
+            case: Case 名称
+            etag: 归档指纹
+            build: 生成归档数据块的函数
+
+        Returns:
+            zip 数据块迭代器（文件在开始迭代时才打开，不迭代直接丢弃不会占用文件描述符）
+        """
+        path = self._cache_dir() / casespace / case / f"{etag}{ARCHIVE_SUFFIX}"
+        # 更新 mtime 作为最近使用时间
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return self._build(path, build())
+        except OSError:
+            pass
+        logger.debug(f"Archive cache hit: {casespace}/{case} {etag}")
+        return self._read(path, build)
+
+    def invalidate(self, casespace: str, case: Optional[str] = None) -> None:
+        """删除 Case（未指定 case 时为整个 Casespace）的全部缓存"""
+        target = self._cache_dir() / casespace
+        if case is not None:
+            target = target / case
+        shutil.rmtree(target, ignore_errors=True)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        shutil.rmtree(self._cache_dir(), ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _read(self, path: Path, build: Callable[[], Iterator[bytes]]) -> Iterator[bytes]:
+        try:
+            src = open(path, 'rb')
+        except FileNotFoundError:
+            # 开始读取前缓存已被淘汰或失效
+            yield from self._build(path, build())
+            return
+        with src:
+            while True:
+                data = src.read(ARCHIVE_CHUNK_SIZE)
+                if not data:
+                    break
+                yield data
+
+    def _build(self, path: Path, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """输出数据块的同时写入临时文件，完整生成后再原子地放入缓存"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.stem}.{uuid.uuid4().hex}.tmp")
+            dest = open(tmp_path, 'wb')
+        except OSError as e:
+            logger.warning(f"Archive cache unavailable: {e}")
+            yield from chunks
+            return
+
+        completed = False
+        try:
+            with dest:
+                for data in chunks:
+                    dest.write(data)
+                    yield data
+            completed = True
+        finally:
+            if completed:
+                try:
+                    os.replace(tmp_path, path)
+                except OSError:
+                    # 生成期间 Case 被修改，缓存目录已被删除
+                    completed = False
+            if not completed:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+        self._evict()
+
+    def _evict(self) -> None:
+        """按最近使用时间淘汰，直到总大小和数量都不超过上限"""
+        with self._lock:
+            entries = []
+            for root, _, names in os.walk(self._cache_dir()):
+                for name in names:
+                    if not name.endswith(ARCHIVE_SUFFIX) or name.startswith('.'):
+                        continue
+                    file_path = os.path.join(root, name)
+                    try:
+                        st = os.stat(file_path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime_ns, st.st_size, file_path))
+
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            count = len(entries)
+            for _, size, file_path in entries:
+                if total <= self.max_bytes and count <= self.max_entries:
+                    break
+                try:
+                    os.unlink(file_path)
+                    logger.debug(f"Archive cache evicted: {file_path}")
+                except OSError:
+                    pass
+                total -= size
+                count -= 1
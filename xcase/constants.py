@@ -14,6 +14,36 @@ FALLBACK_ENCODING = 'latin-1'
 # 支持的压缩包格式
 SUPPORTED_ARCHIVE_FORMATS = ['.tar.gz', '.tgz', '.zip']
 
+# 流式下载时每次读取和输出的数据块大小
+ARCHIVE_CHUNK_SIZE = 64 * 1024
+
+# Case 列表分页：默认每页数量和最大每页数量
+CASE_LIST_PAGE_SIZE = 20
+CASE_LIST_MAX_PAGE_SIZE = 500
+
+# 元数据同步时每个事务处理的记录数
+RECONCILE_BATCH_SIZE = 500
+
+# 解压的工作进程数（可通过 XCASE_SETTINGS['ARCHIVE_WORKERS'] 覆盖）；
+# 每个 Web 工作进程各有一个池，使用较小的固定值
+ARCHIVE_WORKERS = 2
+
+# 交给进程池解压的最小成员大小：过小的文件进程间调度开销大于收益
+ARCHIVE_PARALLEL_MIN_MEMBER = 256 * 1024  # 256KB
+
+# 下载缓存：目录名（位于 MEDIA_ROOT 下，与存储根目录同级）、总大小上限和数量上限
+ARCHIVE_CACHE_DIR_NAME = 'caseeditor_archive_cache'
+ARCHIVE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2GB
+ARCHIVE_CACHE_MAX_ENTRIES = 256
+
+# 已压缩的文件格式，打包时直接存储（stored）而不再压缩
+ARCHIVE_STORED_EXTENSIONS = {
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.zst',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp',
+    '.mp3', '.mp4', '.mkv', '.avi', '.mov',
+    '.pdf', '.docx', '.xlsx', '.pptx', '.whl', '.jar',
+}
+
 # 文件扩展名到编程语言的映射
 LANGUAGE_EXTENSION_MAP = {
     '.json': 'json',
@@ -79,6 +109,16 @@ FORBIDDEN_FILE_PATTERNS = [
     '~',   # 备份文件
 ]
 
+# 文件树索引：最多缓存的 Case 数量（LRU 淘汰）
+TREE_INDEX_MAX_CASES = 64
+
+# 文件树索引：未启用文件系统事件监听时的轮询校验间隔（秒）
+TREE_INDEX_POLL_INTERVAL = 1.0
+
+# 文件树分页：默认每页数量和最大每页数量
+FILE_TREE_PAGE_SIZE = 200
+FILE_TREE_MAX_PAGE_SIZE = 1000
+
 # 日志格式
 LOG_FORMAT = '{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}'
 
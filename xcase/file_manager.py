@@ -3,13 +3,15 @@
 
 提供用例文件的增删改查、上传下载、压缩解压等功能。
 """
+import io
 import os
+import json
+import uuid
+import base64
+import binascii
 import shutil
-import tarfile
-import zipfile
-import tempfile
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import BinaryIO, Iterator, List, Optional, Dict, Any, Tuple, Union
 from django.conf import settings
 from loguru import logger
 
@@ -20,6 +22,8 @@ from .constants import (
     LANGUAGE_EXTENSION_MAP,
     SUPPORTED_ARCHIVE_FORMATS,
     FORBIDDEN_FILE_PATTERNS,
+    FILE_TREE_PAGE_SIZE,
+    ARCHIVE_CACHE_DIR_NAME,
 )
 from .exceptions import (
     PathTraversalException,
@@ -30,6 +34,10 @@ from .exceptions import (
     ArchiveExtractionException,
     DuplicateCaseException,
 )
+from .tree_index import FileTreeIndex
+from .walker import list_dirs, walk_tree
+from .archive import archive_workers, extract_tar, extract_zip, list_archive_files, stream_zip
+from .archive_cache import ArchiveCache, fingerprint
 
 
 class FileManager:
@@ -38,6 +46,8 @@ class FileManager:
     def __init__(self):
         """初始化文件管理器，设置存储根目录"""
         self.storage_root = Path(settings.MEDIA_ROOT) / STORAGE_ROOT_NAME
+        self.tree_index = FileTreeIndex(self._get_children)
+        self.archive_cache = ArchiveCache(lambda: self.storage_root.parent / ARCHIVE_CACHE_DIR_NAME)
         self._ensure_storage_exists()
     
     def _ensure_storage_exists(self) -> None:
@@ -97,6 +107,17 @@ class FileManager:
             logger.warning(f"Path {abs_path} is outside storage root")
             return "/"
     
+    def _invalidate_archive(self, abs_path: Path) -> None:
+        """使路径所在 Case 的下载缓存失效"""
+        try:
+            parts = abs_path.relative_to(self.storage_root).parts
+        except ValueError:
+            return
+        if len(parts) >= 2:
+            self.archive_cache.invalidate(parts[0], parts[1])
+        elif len(parts) == 1:
+            self.archive_cache.invalidate(parts[0])
+    
     def get_casespaces(self) -> List[Dict[str, str]]:
         """
         获取所有 Casespace 列表
@@ -110,12 +131,11 @@ class FileManager:
                 logger.warning(f"Storage root does not exist: {self.storage_root}")
                 return casespaces
                 
-            for item in sorted(self.storage_root.iterdir(), key=lambda x: x.name.lower()):
-                if item.is_dir() and not item.name.startswith('.'):
-                    casespaces.append({
-                        'name': item.name,
-                        'path': item.name
-                    })
+            for name in list_dirs(self.storage_root):
+                casespaces.append({
+                    'name': name,
+                    'path': name
+                })
             
             logger.debug(f"Found {len(casespaces)} casespaces")
         except Exception as e:
@@ -147,12 +167,11 @@ class FileManager:
             return cases
         
         try:
-            for item in sorted(casespace_path.iterdir(), key=lambda x: x.name.lower()):
-                if item.is_dir() and not item.name.startswith('.'):
-                    cases.append({
-                        'name': item.name,
-                        'path': f"{casespace}/{item.name}"
-                    })
+            for name in list_dirs(casespace_path):
+                cases.append({
+                    'name': name,
+                    'path': f"{casespace}/{name}"
+                })
             
             logger.debug(f"Found {len(cases)} cases in casespace '{casespace}'")
         except Exception as e:
@@ -164,7 +183,8 @@ class FileManager:
         self,
         root_path: str = "/",
         casespace: Optional[str] = None,
-        case: Optional[str] = None
+        case: Optional[str] = None,
+        depth: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         获取文件树结构
@@ -173,16 +193,73 @@ class FileManager:
             root_path: 起始路径
             casespace: Casespace 名称（可选）
             case: Case 名称（可选）
+            depth: 返回的层数（可选，默认返回完整的递归树）。
+                指定后目录节点带有 hasChildren 字段，超出层数的目录不包含 children
             
         Returns:
             文件节点字典列表
         """
+        return self._list_tree(root_path, casespace, case, depth=depth)
+    
+    def get_file_tree_page(
+        self,
+        root_path: str = "/",
+        casespace: Optional[str] = None,
+        case: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = FILE_TREE_PAGE_SIZE,
+        depth: int = 1
+    ) -> Dict[str, Any]:
+        """
+        分页获取单个目录的子节点
+        
+        Args:
+            root_path: 目录路径
+            casespace: Casespace 名称（可选）
+            case: Case 名称（可选）
+            cursor: 上一页返回的 nextCursor（可选，为空时从第一项开始）
+            limit: 每页数量
+            depth: 每个子节点返回的层数
+            
+        Returns:
+            包含 list 和 nextCursor 的字典，nextCursor 为 None 表示没有更多数据
+            
+        Raises:
+            ValueError: 游标无效
+        """
+        after = self._decode_cursor(cursor) if cursor else None
+        nodes = self._list_tree(root_path, casespace, case, depth, after, limit + 1)
+        has_more = len(nodes) > limit
+        nodes = nodes[:limit]
+        return {
+            'list': nodes,
+            'nextCursor': self._encode_cursor(nodes[-1]) if has_more else None
+        }
+    
+    def _list_tree(
+        self,
+        root_path: str,
+        casespace: Optional[str],
+        case: Optional[str],
+        depth: Optional[int] = None,
+        after: Optional[Tuple[bool, str, str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """获取目录子节点，支持层数限制和游标分页"""
         # 如果提供了 casespace 和 case，调整根路径
         if casespace and case:
             root_path = f"/{casespace}/{case}{root_path}" if root_path != "/" else f"/{casespace}/{case}"
         
         abs_path = self.get_abs_path(root_path)
         
+        # 完整文件树从索引中读取；限制层数或分页的请求直接遍历所需的层数，
+        # 不为此构建整个 Case 的索引（超大的生成目录不会被完整遍历）
+        if casespace and case and depth is None and after is None and limit is None:
+            case_abs = self.storage_root / casespace / case
+            children = self.tree_index.get_children(case_abs, abs_path, depth, after, limit)
+            if children is not None:
+                return children
+        
         if not abs_path.exists():
             logger.warning(f"Path does not exist: {abs_path}")
             return []
@@ -195,50 +272,44 @@ class FileManager:
             }]
         
         # 这是一个目录
-        return self._get_children(abs_path)
+        return self._get_children(abs_path, depth, after, limit)
+    
+    def _encode_cursor(self, node: Dict[str, Any]) -> str:
+        """将节点的排序键编码为不透明的分页游标"""
+        raw = json.dumps([node['type'] != 'folder', node['name']], ensure_ascii=False)
+        return base64.urlsafe_b64encode(raw.encode(DEFAULT_ENCODING)).decode('ascii')
+    
+    def _decode_cursor(self, cursor: str) -> Tuple[bool, str, str]:
+        """解析分页游标"""
+        try:
+            is_file, name = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError, binascii.Error):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        if not isinstance(name, str):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return (bool(is_file), name.lower(), name)
     
-    def _get_children(self, dir_path: Path) -> List[Dict[str, Any]]:
+    def _get_children(
+        self,
+        dir_path: Path,
+        depth: Optional[int] = None,
+        after: Optional[Tuple[bool, str, str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         递归获取目录的子节点
         
         Args:
             dir_path: 目录路径
+            depth: 递归层数（None 表示不限制）
+            after: 分页游标，只返回排序键大于该值的子节点
+            limit: 最多返回的子节点数量
             
         Returns:
             子节点字典列表
         """
-        children = []
-        try:
-            # 目录优先排序，然后按名称排序
-            items = sorted(dir_path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
-            
-            for item in items:
-                if item.name.startswith('.'):
-                    continue  # 跳过隐藏文件
-                
-                rel_path = self.get_relative_path(item)
-                
-                if item.is_dir():
-                    node = {
-                        'path': rel_path,
-                        'name': item.name,
-                        'type': 'folder',
-                        'children': self._get_children(item)
-                    }
-                else:
-                    node = {
-                        'path': rel_path,
-                        'name': item.name,
-                        'type': 'file'
-                    }
-                
-                children.append(node)
-        except PermissionError as e:
-            logger.warning(f"Permission denied accessing directory: {dir_path}")
-        except Exception as e:
-            logger.error(f"Error reading directory {dir_path}: {e}")
-        
-        return children
+        rel_path = self.get_relative_path(dir_path) if dir_path != self.storage_root else ''
+        return walk_tree(str(dir_path), rel_path, depth, after, limit)
     
     def get_file_content(self, file_path: str) -> Dict[str, Any]:
         """
@@ -305,6 +376,7 @@ class FileManager:
         
         try:
             abs_path.write_text(content, encoding=DEFAULT_ENCODING)
+            self._invalidate_archive(abs_path)
             logger.info(f"File saved successfully: {file_path}")
             return True
         except Exception as e:
@@ -346,11 +418,14 @@ class FileManager:
             logger.error(f"Error creating file {name}: {e}")
             raise FileOperationException("create_file", name, str(e))
         
-        return {
+        node = {
             'path': self.get_relative_path(file_abs),
             'name': name,
             'type': 'file'
         }
+        self.tree_index.add(file_abs, node)
+        self._invalidate_archive(file_abs)
+        return node
     
     def create_folder(self, parent_path: str, name: str) -> Dict[str, Any]:
         """
@@ -387,12 +462,15 @@ class FileManager:
             logger.error(f"Error creating folder {name}: {e}")
             raise FileOperationException("create_folder", name, str(e))
         
-        return {
+        node = {
             'path': self.get_relative_path(folder_abs),
             'name': name,
             'type': 'folder',
             'children': []
         }
+        self.tree_index.add(folder_abs, node)
+        self._invalidate_archive(folder_abs)
+        return node
     
     def delete_item(self, item_path: str) -> bool:
         """
@@ -418,6 +496,8 @@ class FileManager:
             else:
                 abs_path.unlink()
             
+            self.tree_index.remove(abs_path)
+            self._invalidate_archive(abs_path)
             logger.info(f"Item deleted: {item_path}")
             return True
         except Exception as e:
@@ -456,6 +536,14 @@ class FileManager:
             logger.error(f"Error renaming item {old_path}: {e}")
             raise FileOperationException("rename", old_path, str(e))
         
+        self.tree_index.rename(
+            old_abs,
+            new_abs,
+            self.get_relative_path(old_abs),
+            self.get_relative_path(new_abs)
+        )
+        self._invalidate_archive(old_abs)
+        
         return {
             'path': self.get_relative_path(new_abs),
             'name': new_name,
@@ -489,10 +577,17 @@ class FileManager:
             try:
                 file_abs = parent_abs / file_item['name']
                 file_abs.write_text(file_item['content'], encoding=DEFAULT_ENCODING)
+                self.tree_index.add(file_abs, {
+                    'path': self.get_relative_path(file_abs),
+                    'name': file_item['name'],
+                    'type': 'file'
+                })
                 uploaded_count += 1
             except Exception as e:
                 logger.error(f"Error uploading file {file_item['name']}: {e}")
         
+        if uploaded_count:
+            self._invalidate_archive(parent_abs)
         logger.info(f"Uploaded {uploaded_count}/{len(files)} files to {parent_path}")
         return uploaded_count
     
@@ -522,26 +617,37 @@ class FileManager:
         
         try:
             shutil.rmtree(case_abs)
+            self.tree_index.drop(case_abs)
+            self.archive_cache.invalidate(casespace, case)
             logger.info(f"Case deleted: {casespace}/{case}")
             return True
         except Exception as e:
             logger.error(f"Error deleting case {casespace}/{case}: {e}")
             raise FileOperationException("delete_case", case_path, str(e))
     
-    def download_case(self, casespace: str, case: str) -> bytes:
+    def download_case(
+        self,
+        casespace: str,
+        case: str,
+        compress: bool = True
+    ) -> Tuple[str, Iterator[bytes]]:
         """
-        将 Case 打包为 zip 归档
+        将 Case 打包为 zip 归档，以数据块的形式流式返回
+        
+        归档按 Case 文件树的指纹缓存，指纹未变化时直接读取缓存文件。
         
         Args:
             casespace: Casespace 名称
             case: Case 名称
+            compress: 是否压缩（False 时所有文件以 stored 模式写入）
             
         Returns:
-            zip 文件的字节数据
+            (指纹, zip 数据块迭代器)，指纹可作为 ETag 使用
             
         Raises:
             CaseNotFoundException: Case 不存在
             ValueError: 路径无效
+            FileOperationException: 遍历 Case 失败
         """
         case_path = f"/{casespace}/{case}"
         case_abs = self.get_abs_path(case_path)
@@ -552,47 +658,52 @@ class FileManager:
         if not case_abs.is_dir():
             raise ValueError(f"{case_path} is not a directory")
         
-        # 创建临时 zip 文件
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp_file:
-            tmp_path = tmp_file.name
+        try:
+            files = list_archive_files(str(case_abs))
+            etag = fingerprint(f"{casespace}/{case}", files, compress)
+        except OSError as e:
+            logger.error(f"Error scanning case {casespace}/{case}: {e}")
+            raise FileOperationException("download_case", case_path, str(e))
         
+        # 参数校验在调用时完成，打包在迭代时才开始
+        stream = self.archive_cache.open(
+            casespace, case, etag,
+            lambda: self._stream_case(casespace, case, files, compress)
+        )
+        return etag, stream
+    
+    def _stream_case(
+        self,
+        casespace: str,
+        case: str,
+        files: List[Tuple[str, str]],
+        compress: bool
+    ) -> Iterator[bytes]:
+        """逐块生成 Case 的 zip 数据"""
         try:
-            # 创建 zip 归档
-            with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, dirs, files in os.walk(case_abs):
-                    for file in files:
-                        file_path = Path(root) / file
-                        arcname = file_path.relative_to(case_abs)
-                        zipf.write(file_path, arcname)
-            
-            # 读取 zip 文件
-            with open(tmp_path, 'rb') as f:
-                zip_data = f.read()
-            
+            yield from stream_zip(files, compress)
             logger.info(f"Case downloaded: {casespace}/{case}")
-            return zip_data
         except Exception as e:
             logger.error(f"Error downloading case {casespace}/{case}: {e}")
-            raise FileOperationException("download_case", case_path, str(e))
-        finally:
-            # 清理临时文件
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+            raise FileOperationException("download_case", f"/{casespace}/{case}", str(e))
     
     def upload_case(
         self,
         casespace: str,
         case_name: str,
-        file_data: bytes,
+        file_data: Union[bytes, BinaryIO],
         filename: str
     ) -> bool:
         """
         上传并解压 Case 归档
         
+        归档逐个成员解压到 Casespace 下的临时目录，全部成功后再原子地重命名为 Case 目录，
+        失败时不会留下不完整的 Case。
+        
         Args:
             casespace: Casespace 名称
             case_name: 新 Case 名称
-            file_data: 归档文件字节数据
+            file_data: 归档文件（字节数据或文件对象，如 Django 的 TemporaryUploadedFile）
             filename: 原始文件名（用于确定格式）
             
         Returns:
@@ -602,6 +713,7 @@ class FileManager:
             InvalidCaseNameException: Case 名称无效
             DuplicateCaseException: Case 已存在
             ValueError: 不支持的文件格式
+            PathTraversalException: 归档成员路径不安全
             ArchiveExtractionException: 解压失败
         """
         # 验证 case 名称
@@ -614,10 +726,6 @@ class FileManager:
         if case_abs.exists():
             raise DuplicateCaseException(casespace, case_name)
         
-        # 确保 casespace 存在
-        casespace_path = self.storage_root / casespace
-        casespace_path.mkdir(parents=True, exist_ok=True)
-        
         # 确定文件格式
         is_tar_gz = filename.endswith('.tar.gz') or filename.endswith('.tgz')
         is_zip = filename.endswith('.zip')
@@ -625,49 +733,50 @@ class FileManager:
         if not (is_tar_gz or is_zip):
             raise ValueError(f"Unsupported file format. Supported formats: {', '.join(SUPPORTED_ARCHIVE_FORMATS)}")
         
-        # 创建临时文件用于解压
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.tmp') as tmp_file:
-            tmp_file.write(file_data)
-            tmp_path = tmp_file.name
+        if isinstance(file_data, (bytes, bytearray)):
+            file_data = io.BytesIO(file_data)
+        
+        # 确保 casespace 存在
+        casespace_path = self.storage_root / casespace
+        casespace_path.mkdir(parents=True, exist_ok=True)
+        
+        # 解压到隐藏的临时目录（不会出现在 Case 列表中）
+        staging_abs = casespace_path / f".upload-{uuid.uuid4().hex}"
+        staging_abs.mkdir()
         
         try:
-            # 创建 case 目录
-            case_abs.mkdir(parents=True, exist_ok=True)
-            
-            # 解压归档
             if is_tar_gz:
-                with tarfile.open(tmp_path, 'r:gz') as tar:
-                    # 安全检查：确保没有路径遍历
-                    for member in tar.getmembers():
-                        if member.name.startswith('/') or '..' in member.name:
-                            raise PathTraversalException(member.name)
-                    tar.extractall(path=case_abs)
+                count = extract_tar(file_data, str(staging_abs))
             else:  # is_zip
-                with zipfile.ZipFile(tmp_path, 'r') as zip_file:
-                    # 安全检查：确保没有路径遍历
-                    for name in zip_file.namelist():
-                        if name.startswith('/') or '..' in name:
-                            raise PathTraversalException(name)
-                    zip_file.extractall(path=case_abs)
-            
-            logger.info(f"Case uploaded: {casespace}/{case_name}")
-            return True
+                # 上传文件已落盘时，工作进程可直接打开归档并行解压
+                archive_path = None
+                if hasattr(file_data, 'temporary_file_path'):
+                    archive_path = file_data.temporary_file_path()
+                count = extract_zip(
+                    file_data,
+                    str(staging_abs),
+                    workers=archive_workers(),
+                    archive_path=archive_path
+                )
             
-        except (PathTraversalException, ValueError) as e:
-            # 清理 case 目录
             if case_abs.exists():
-                shutil.rmtree(case_abs)
+                raise DuplicateCaseException(casespace, case_name)
+            os.rename(staging_abs, case_abs)
+            
+            self.tree_index.drop(case_abs)
+            self.archive_cache.invalidate(casespace, case_name)
+            logger.info(f"Case uploaded: {casespace}/{case_name} ({count} files)")
+            return True
+            
+        except (PathTraversalException, DuplicateCaseException, ValueError):
             raise
         except Exception as e:
-            # 清理 case 目录
-            if case_abs.exists():
-                shutil.rmtree(case_abs)
             logger.error(f"Error extracting archive: {e}")
             raise ArchiveExtractionException(filename, str(e))
         finally:
-            # 清理临时文件
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+            # 清理临时目录（成功时已被重命名）
+            if staging_abs.exists():
+                shutil.rmtree(staging_abs, ignore_errors=True)
     
     def _get_language_from_filename(self, filename: str) -> Optional[str]:
         """
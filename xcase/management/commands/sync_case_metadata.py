@@ -0,0 +1,67 @@
+"""
+Django management command to reconcile CaseMetadata with the case directories
+Usage: python manage.py sync_case_metadata [--casespace NAME] [--no-stats] [--interval SECONDS]
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from xcase.constants import RECONCILE_BATCH_SIZE
+from xcase.metadata_sync import reconcile_all, reconcile_casespace
+
+
+class Command(BaseCommand):
+    help = '以磁盘上的 Case 目录为准同步 Case 元数据（增删记录、统计文件数量和大小）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--casespace',
+            type=str,
+            help='只同步指定的 Casespace（默认同步全部）'
+        )
+        parser.add_argument(
+            '--no-stats',
+            action='store_true',
+            help='不重新统计已有 Case 的文件数量和大小'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RECONCILE_BATCH_SIZE,
+            help=f'每个事务处理的记录数 (默认: {RECONCILE_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='定期同步的间隔秒数（默认 0，只执行一次）'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            self._reconcile(options)
+            if interval <= 0:
+                break
+            time.sleep(interval)
+            # 长时间运行时数据库连接可能已失效
+            close_old_connections()
+
+    def _reconcile(self, options):
+        casespace = options['casespace']
+        refresh_stats = not options['no_stats']
+        batch_size = options['batch_size']
+
+        try:
+            if casespace:
+                summary = reconcile_casespace(casespace, refresh_stats, batch_size)
+            else:
+                summary = reconcile_all(refresh_stats, batch_size)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'同步失败: {e}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"同步完成: 新建 {summary['created']}，删除 {summary['deleted']}，"
+            f"统计更新 {summary['updated']}"
+        ))
@@ -0,0 +1,196 @@
+"""
+Case 元数据同步
+
+以磁盘上的 Case 目录为准，批量同步 CaseMetadata，Case 列表直接从数据库查询：
+- 缺失的记录批量创建，目录已不存在的记录批量删除
+- 每批记录在一个事务中提交，单批失败不影响已提交的批次
+- 列表请求只在 Casespace 目录的 mtime 变化（增删、重命名 Case）时同步该 Casespace，
+  且只同步记录（不遍历 Case 目录），新记录的文件统计为空（stats_time 为 None）
+- 文件数量和大小的统计（递归遍历 Case 目录）只由 sync_case_metadata 管理命令执行，可定期运行；
+  每次执行都会补全尚未统计的记录
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence
+from django.db import transaction
+from django.utils import timezone
+from loguru import logger
+
+from .constants import RECONCILE_BATCH_SIZE
+from .exceptions import CasespaceNotFoundException
+from .file_manager import file_manager
+from .models import CaseMetadata
+from .walker import dir_stats, list_dirs
+
+_synced_mtimes: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def _batches(items: Sequence, batch_size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def _delete_batched(ids: List[int], batch_size: int) -> None:
+    """分批删除元数据（tags/options 级联删除）"""
+    for batch in _batches(ids, batch_size):
+        with transaction.atomic():
+            CaseMetadata.objects.filter(id__in=batch).delete()
+
+
+def reconcile_casespace(
+    casespace: str,
+    refresh_stats: bool = False,
+    batch_size: int = RECONCILE_BATCH_SIZE
+) -> Dict[str, int]:
+    """
+    将一个 Casespace 的元数据与磁盘同步
+
+    Args:
+        casespace: Casespace 名称
+        refresh_stats: 是否重新统计已有 Case 的文件数量和大小
+        batch_size: 每个事务处理的记录数
+
+    Returns:
+        {'created': 新建数量, 'deleted': 删除数量, 'updated': 统计变化的数量}
+
+    Raises:
+        PathTraversalException: Casespace 名称不安全
+    """
+    casespace_abs = file_manager.get_abs_path(f"/{casespace}")
+    case_names = list_dirs(casespace_abs) if casespace_abs.is_dir() else []
+    return _reconcile(casespace, casespace_abs, case_names, refresh_stats, batch_size)
+
+
+def reconcile_all(
+    refresh_stats: bool = True,
+    batch_size: int = RECONCILE_BATCH_SIZE
+) -> Dict[str, int]:
+    """
+    同步所有 Casespace 的元数据，并删除已不存在的 Casespace 的记录
+
+    Args:
+        refresh_stats: 是否重新统计已有 Case 的文件数量和大小
+        batch_size: 每个事务处理的记录数
+
+    Returns:
+        各 Casespace 同步结果的汇总
+    """
+    summary = {'created': 0, 'deleted': 0, 'updated': 0}
+    casespaces = list_dirs(file_manager.storage_root)
+    for casespace in casespaces:
+        result = reconcile_casespace(casespace, refresh_stats, batch_size)
+        for key, value in result.items():
+            summary[key] += value
+
+    orphans = list(
+        CaseMetadata.objects.exclude(casespace__in=casespaces).values_list('id', flat=True)
+    )
+    _delete_batched(orphans, batch_size)
+    summary['deleted'] += len(orphans)
+
+    logger.info(
+        f"Case metadata reconciled: {summary['created']} created, "
+        f"{summary['deleted']} deleted, {summary['updated']} updated"
+    )
+    return summary
+
+
+def ensure_casespace_synced(casespace: str) -> None:
+    """
+    确保 Casespace 的元数据与磁盘同步（Casespace 目录 mtime 未变化时直接返回）
+
+    Args:
+        casespace: Casespace 名称
+
+    Raises:
+        CasespaceNotFoundException: Casespace 不存在
+        PathTraversalException: Casespace 名称不安全
+    """
+    casespace_abs = file_manager.get_abs_path(f"/{casespace}")
+    try:
+        mtime = os.stat(casespace_abs).st_mtime_ns
+    except FileNotFoundError:
+        raise CasespaceNotFoundException(casespace)
+
+    key = str(casespace_abs)
+    if _synced_mtimes.get(key) == mtime:
+        return
+
+    with _lock:
+        if _synced_mtimes.get(key) == mtime:
+            return
+        # 请求中只同步记录，文件统计留给 sync_case_metadata
+        result = _reconcile(
+            casespace, casespace_abs, list_dirs(casespace_abs), False, RECONCILE_BATCH_SIZE,
+            collect_stats=False
+        )
+        _synced_mtimes[key] = mtime
+
+    if result['created'] or result['deleted']:
+        logger.info(
+            f"Case metadata synced for {casespace}: "
+            f"{result['created']} created, {result['deleted']} deleted"
+        )
+
+
+def _reconcile(
+    casespace: str,
+    casespace_abs: Path,
+    case_names: List[str],
+    refresh_stats: bool,
+    batch_size: int,
+    collect_stats: bool = True
+) -> Dict[str, int]:
+    """
+    同步一个 Casespace 的记录
+
+    Args:
+        refresh_stats: 是否重新统计已有 Case 的文件数量和大小
+        collect_stats: 是否统计新建和尚未统计的 Case（False 时不遍历任何 Case 目录）
+    """
+    existing = {
+        case_name: (pk, file_count, total_size, stats_time)
+        for pk, case_name, file_count, total_size, stats_time in CaseMetadata.objects.filter(
+            casespace=casespace
+        ).values_list('id', 'case_name', 'file_count', 'total_size', 'stats_time')
+    }
+    names = set(case_names)
+    missing = [name for name in case_names if name not in existing]
+    stale = [pk for name, (pk, _, _, _) in existing.items() if name not in names]
+
+    for batch in _batches(missing, batch_size):
+        now = timezone.now()
+        rows = []
+        for name in batch:
+            row = CaseMetadata(casespace=casespace, case_name=name)
+            if collect_stats:
+                row.file_count, row.total_size = dir_stats(os.path.join(casespace_abs, name))
+                row.stats_time = now
+            rows.append(row)
+        with transaction.atomic():
+            # 并发同步可能同时创建，冲突的记录直接忽略
+            CaseMetadata.objects.bulk_create(rows, ignore_conflicts=True)
+
+    _delete_batched(stale, batch_size)
+
+    changed = []
+    if collect_stats:
+        now = timezone.now()
+        for name, (pk, file_count, total_size, stats_time) in existing.items():
+            if name not in names or (not refresh_stats and stats_time is not None):
+                continue
+            stats = dir_stats(os.path.join(casespace_abs, name))
+            if stats != (file_count, total_size) or stats_time is None:
+                changed.append(CaseMetadata(
+                    id=pk,
+                    file_count=stats[0],
+                    total_size=stats[1],
+                    stats_time=now
+                ))
+        for batch in _batches(changed, batch_size):
+            with transaction.atomic():
+                CaseMetadata.objects.bulk_update(batch, ['file_count', 'total_size', 'stats_time'])
+
+    return {'created': len(missing), 'deleted': len(stale), 'updated': len(changed)}
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xcase', '0003_rename_case_metada_casesp_8b8e92_idx_case_metada_casespa_2e3c24_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='casemetadata',
+            index=models.Index(fields=['casespace', 'update_time'], name='case_metada_casespa_932d8e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='casemetadata',
+            index=models.Index(fields=['casespace', 'case_name'], name='case_metadata_name_prefix_idx', opclasses=['varchar_pattern_ops', 'varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='caseoption',
+            index=models.Index(fields=['key', 'value'], name='case_option_key_353962_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xcase', '0004_case_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casemetadata',
+            name='file_count',
+            field=models.PositiveIntegerField(db_comment='文件数量', default=0),
+        ),
+        migrations.AddField(
+            model_name='casemetadata',
+            name='stats_time',
+            field=models.DateTimeField(blank=True, db_comment='文件统计时间', null=True),
+        ),
+        migrations.AddField(
+            model_name='casemetadata',
+            name='total_size',
+            field=models.BigIntegerField(db_comment='文件总大小（字节）', default=0),
+        ),
+    ]
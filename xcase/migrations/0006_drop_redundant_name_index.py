@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xcase', '0005_case_metadata_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='casemetadata',
+            name='case_metada_casespa_2e3c24_idx',
+        ),
+    ]
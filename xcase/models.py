@@ -25,6 +25,9 @@ class CaseMetadata(ModelSaveMixin, models.Model):
     id = models.BigAutoField(primary_key=True, db_comment='ID')
     casespace = models.CharField(max_length=255, db_comment='Casespace名称', db_index=True)
     case_name = models.CharField(max_length=255, db_comment='Case名称', db_index=True)
+    file_count = models.PositiveIntegerField(default=0, db_comment='文件数量')
+    total_size = models.BigIntegerField(default=0, db_comment='文件总大小（字节）')
+    stats_time = models.DateTimeField(null=True, blank=True, db_comment='文件统计时间')
     create_time = models.DateTimeField(auto_now_add=True, db_comment='创建时间')
     update_time = models.DateTimeField(auto_now=True, db_comment='更新时间')
     
@@ -33,9 +36,15 @@ class CaseMetadata(ModelSaveMixin, models.Model):
         unique_together = (('casespace', 'case_name'),)
         db_table_comment = 'Case元数据表'
         indexes = [
-            models.Index(fields=['casespace', 'case_name']),
             models.Index(fields=['create_time']),
             models.Index(fields=['update_time']),
+            models.Index(fields=['casespace', 'update_time']),
+            # 支持 LIKE 'prefix%' 的名称前缀查询
+            models.Index(
+                fields=['casespace', 'case_name'],
+                name='case_metadata_name_prefix_idx',
+                opclasses=['varchar_pattern_ops', 'varchar_pattern_ops']
+            ),
         ]
         ordering = ['-update_time']
     
@@ -106,6 +115,7 @@ class CaseOption(models.Model):
         indexes = [
             models.Index(fields=['key']),
             models.Index(fields=['metadata', 'key']),
+            models.Index(fields=['key', 'value']),
         ]
         ordering = ['key']
     
@@ -30,6 +30,13 @@ class FileNodeSchema(Schema):
     name: str
     type: str  # 'file' or 'folder'
     children: Optional[List['FileNodeSchema']] = None
+    has_children: Optional[bool] = Field(None, alias='hasChildren')
+
+
+class FileTreePageSchema(Schema):
+    """文件树分页结果"""
+    list: List[FileNodeSchema]
+    next_cursor: Optional[str] = Field(None, alias='nextCursor')
 
 
 class FileContentSchema(Schema):
@@ -86,10 +93,13 @@ class CaseOptionSchema(Schema):
 
 
 class CaseMetadataSchema(Schema):
-    """Case 元数据（包含标签）"""
+    """Case 元数据（包含标签和选项）"""
     casespace: str
     case_name: str = Field(..., alias='caseName')
     tags: List[str]
+    options: List[CaseOptionSchema] = []
+    file_count: int = Field(0, alias='fileCount')
+    total_size: int = Field(0, alias='totalSize')
 
 
 class CaseDetailSchema(Schema):
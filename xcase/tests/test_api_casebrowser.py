@@ -68,6 +68,125 @@ class TestGetCasesMetadata:
         data = response.json()
         assert data['code'] == 200
         assert data['data'] == []
+    
+    def test_get_cases_metadata_constant_queries(
+        self, api_client, temp_casespace, sample_case_with_tags, django_assert_max_num_queries
+    ):
+        """测试元数据批量加载，查询次数与 case 数量无关"""
+        from xcase.file_manager import file_manager
+        
+        casespace = temp_casespace['casespace']
+        for i in range(20):
+            (file_manager.storage_root / casespace / f'bulk_case_{i:02d}').mkdir()
+        
+        with django_assert_max_num_queries(10):
+            response = api_client.get(f'/casebrowser/casespaces/{casespace}/cases')
+        
+        data = response.json()
+        assert data['code'] == 200
+        assert len(data['data']) == 21
+        assert CaseMetadata.objects.filter(casespace=casespace).count() == 21
+        
+        by_name = {item['caseName']: item for item in data['data']}
+        assert set(by_name[temp_casespace['case']]['tags']) == set(sample_case_with_tags['tags'])
+        assert by_name['bulk_case_00']['tags'] == []
+        
+        # 元数据已全部存在时不再写入
+        with django_assert_max_num_queries(6):
+            api_client.get(f'/casebrowser/casespaces/{casespace}/cases')
+
+
+
+@pytest.mark.casebrowser
+class TestCasesMetadataQuery:
+    """测试 case 列表的分页、过滤和排序"""
+    
+    @pytest.fixture
+    def tagged_cases(self, temp_casespace):
+        """创建带标签和选项的一组 case"""
+        from xcase.file_manager import file_manager
+        
+        casespace = temp_casespace['casespace']
+        specs = {
+            'alpha_login': (['smoke', 'api'], {'env': 'prod'}),
+            'alpha_pay': (['smoke'], {'env': 'test'}),
+            'beta_order': (['api'], {'env': 'prod'}),
+            'beta_user': ([], {}),
+        }
+        for case_name, (tags, options) in specs.items():
+            (file_manager.storage_root / casespace / case_name).mkdir()
+            metadata = CaseMetadata.objects.create(casespace=casespace, case_name=case_name)
+            for tag in tags:
+                CaseTag.objects.create(metadata=metadata, tag=tag)
+            for key, value in options.items():
+                CaseOption.objects.create(metadata=metadata, key=key, value=value)
+        return casespace
+    
+    def _names(self, api_client, casespace, **params):
+        response = api_client.get(f'/casebrowser/casespaces/{casespace}/cases', params=params)
+        data = response.json()
+        assert data['code'] == 200
+        items = data['data']['list'] if 'page' in params else data['data']
+        return [item['caseName'] for item in items]
+    
+    def test_pagination(self, api_client, tagged_cases):
+        """测试分页返回 list 和 total"""
+        response = api_client.get(
+            f'/casebrowser/casespaces/{tagged_cases}/cases',
+            params={'page': 2, 'size': 2}
+        )
+        data = response.json()['data']
+        assert data['total'] == 5
+        assert [item['caseName'] for item in data['list']] == ['beta_order', 'beta_user']
+    
+    def test_filter_by_tags(self, api_client, tagged_cases):
+        """测试按标签过滤（任一 / 全部）"""
+        assert self._names(api_client, tagged_cases, tags='smoke,api') == [
+            'alpha_login', 'alpha_pay', 'beta_order'
+        ]
+        assert self._names(api_client, tagged_cases, tags='smoke,api', tagMatch='all') == [
+            'alpha_login'
+        ]
+    
+    def test_filter_by_options_and_name(self, api_client, tagged_cases):
+        """测试按选项和名称前缀过滤"""
+        assert self._names(api_client, tagged_cases, options='env=prod') == [
+            'alpha_login', 'beta_order'
+        ]
+        assert self._names(api_client, tagged_cases, options='env=prod', name='beta') == [
+            'beta_order'
+        ]
+    
+    def test_sort(self, api_client, tagged_cases):
+        """测试排序"""
+        names = self._names(api_client, tagged_cases, sort='caseName,desc')
+        assert names == ['test_case', 'beta_user', 'beta_order', 'alpha_pay', 'alpha_login']
+        
+        metadata = CaseMetadata.objects.get(casespace=tagged_cases, case_name='beta_user')
+        metadata.save()
+        assert self._names(api_client, tagged_cases, sort='updateTime,desc')[0] == 'beta_user'
+    
+    def test_invalid_query(self, api_client, tagged_cases):
+        """测试无效的查询参数"""
+        for params in ({'sort': 'unknown,asc'}, {'options': 'novalue'}):
+            response = api_client.get(f'/casebrowser/casespaces/{tagged_cases}/cases', params=params)
+            assert response.json()['code'] == 400
+        
+        # tagMatch 由参数声明校验
+        response = api_client.get(
+            f'/casebrowser/casespaces/{tagged_cases}/cases', params={'tagMatch': 'some'}
+        )
+        assert response.status_code == 422
+    
+    def test_sync_removes_deleted_cases(self, api_client, tagged_cases):
+        """测试 case 目录删除后元数据同步删除"""
+        from xcase.file_manager import file_manager
+        
+        assert 'beta_user' in self._names(api_client, tagged_cases)
+        file_manager.delete_case(tagged_cases, 'beta_user')
+        
+        assert 'beta_user' not in self._names(api_client, tagged_cases)
+        assert not CaseMetadata.objects.filter(casespace=tagged_cases, case_name='beta_user').exists()
 
 
 @pytest.mark.casebrowser
@@ -200,6 +200,116 @@ class TestFileTreeManagement:
         assert data['code'] == 200
         assert len(data['data']) == 2
     
+    def test_get_file_tree_with_depth(self, api_client, temp_casespace):
+        """测试限制文件树层数"""
+        from xcase.file_manager import file_manager
+        
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+        
+        case_path = file_manager.storage_root / casespace / case
+        (case_path / 'a' / 'b').mkdir(parents=True)
+        (case_path / 'a' / 'b' / 'deep.txt').write_text('deep', encoding='utf-8')
+        (case_path / 'empty').mkdir()
+        
+        response = api_client.get(
+            '/caseeditor/files',
+            params={'casespace': casespace, 'case': case, 'depth': 1}
+        )
+        
+        data = response.json()
+        assert data['code'] == 200
+        folders = {item['name']: item for item in data['data'] if item['type'] == 'folder'}
+        assert folders['a']['hasChildren'] is True
+        assert 'children' not in folders['a']
+        assert folders['empty']['hasChildren'] is False
+        
+        response = api_client.get(
+            '/caseeditor/files',
+            params={'casespace': casespace, 'case': case, 'depth': 2}
+        )
+        
+        a = response.json()['data'][0]
+        assert [item['name'] for item in a['children']] == ['b']
+        assert a['children'][0]['hasChildren'] is True
+        assert 'children' not in a['children'][0]
+    
+    def test_get_file_tree_paginated(self, api_client, temp_casespace):
+        """测试按游标分页获取目录子节点"""
+        from xcase.file_manager import file_manager
+        
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+        
+        case_path = file_manager.storage_root / casespace / case
+        for i in range(5):
+            (case_path / f'file{i}.txt').write_text(str(i), encoding='utf-8')
+        (case_path / 'dir').mkdir()
+        
+        names = []
+        cursor = None
+        while True:
+            params = {'casespace': casespace, 'case': case, 'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = api_client.get('/caseeditor/files', params=params).json()
+            assert data['code'] == 200
+            assert len(data['data']['list']) <= 3
+            names.extend(item['name'] for item in data['data']['list'])
+            cursor = data['data']['nextCursor']
+            if not cursor:
+                break
+        
+        assert names == ['dir', 'file0.txt', 'file1.txt', 'file2.txt', 'file3.txt', 'file4.txt', 'test.py']
+    
+    def test_get_file_tree_depth_does_not_walk_deep_subtree(self, api_client, temp_casespace, monkeypatch):
+        """测试限制层数和分页的请求不遍历更深的子树，也不构建整个 Case 的索引"""
+        from xcase import walker
+        from xcase.file_manager import file_manager
+        
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+        case_path = file_manager.storage_root / casespace / case
+        deep = case_path / 'generated'
+        for i in range(10):
+            deep = deep / f'level{i}'
+        deep.mkdir(parents=True)
+        (deep / 'data.txt').write_text('data', encoding='utf-8')
+        for name in ('other1', 'other2'):
+            (case_path / name / 'sub').mkdir(parents=True)
+        
+        scanned = []
+        original = walker.scan_dir
+        monkeypatch.setattr(walker, 'scan_dir', lambda path: scanned.append(path) or original(path))
+        
+        data = api_client.get(
+            '/caseeditor/files', params={'casespace': casespace, 'case': case, 'depth': 1}
+        ).json()
+        assert data['code'] == 200
+        assert [item['name'] for item in data['data'] if item['type'] == 'folder'] == ['generated', 'other1', 'other2']
+        assert scanned == [str(case_path)]
+        
+        scanned.clear()
+        data = api_client.get(
+            '/caseeditor/files', params={'casespace': casespace, 'case': case, 'depth': 2, 'limit': 1}
+        ).json()
+        assert [item['name'] for item in data['data']['list']] == ['generated']
+        # 只遍历当前页（多取一项用于判断是否还有下一页）的子目录，且只到第二层
+        assert scanned == [str(case_path), str(case_path / 'generated'), str(case_path / 'other1')]
+        assert str(case_path) not in file_manager.tree_index._cases
+    
+    def test_get_file_tree_invalid_paging_params(self, api_client, temp_casespace):
+        """测试无效的分页参数"""
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+        
+        for params in ({'cursor': 'not-a-cursor'}, {'limit': 0}, {'depth': 0}):
+            response = api_client.get(
+                '/caseeditor/files',
+                params={'casespace': casespace, 'case': case, **params}
+            )
+            assert response.json()['code'] == 400
+    
     def test_get_file_tree_path_traversal_attempt(self, api_client, temp_casespace):
         """测试路径遍历攻击防护"""
         casespace = temp_casespace['casespace']
@@ -553,9 +663,57 @@ class TestCaseArchiveOperations:
         
         # 验证返回的是有效的 zip 数据
         import zipfile
-        zip_data = BytesIO(response.content)
+        zip_data = BytesIO(b''.join(response.streaming_content))
         assert zipfile.is_zipfile(zip_data)
     
+    def test_download_case_streams_chunks(self, api_client, temp_casespace):
+        """测试下载以分块流式返回，已压缩文件以 stored 模式写入"""
+        import os
+        import zipfile
+        from xcase.file_manager import file_manager
+        
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+        
+        case_path = file_manager.storage_root / casespace / case
+        (case_path / 'data').mkdir()
+        payload = os.urandom(256 * 1024)
+        (case_path / 'data' / 'blob.bin').write_bytes(payload)
+        (case_path / 'data' / 'image.png').write_bytes(b'png' * 100)
+        
+        response = api_client.get(
+            f'/caseeditor/casespaces/{casespace}/cases/{case}/download'
+        )
+        
+        assert response.status_code == 200
+        assert response.streaming
+        assert 'Content-Length' not in response.headers
+        chunks = list(response.streaming_content)
+        assert len(chunks) > 1
+        
+        with zipfile.ZipFile(BytesIO(b''.join(chunks))) as zf:
+            assert zf.read('data/blob.bin') == payload
+            assert zf.getinfo('data/blob.bin').compress_type == zipfile.ZIP_DEFLATED
+            assert zf.getinfo('data/image.png').compress_type == zipfile.ZIP_STORED
+            assert zf.getinfo('test.py').compress_type == zipfile.ZIP_DEFLATED
+    
+    def test_download_case_without_compression(self, api_client, temp_casespace):
+        """测试关闭压缩时所有文件以 stored 模式打包"""
+        import zipfile
+        
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+        
+        response = api_client.get(
+            f'/caseeditor/casespaces/{casespace}/cases/{case}/download',
+            params={'compress': 'false'}
+        )
+        
+        assert response.status_code == 200
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as zf:
+            assert zf.testzip() is None
+            assert all(info.compress_type == zipfile.ZIP_STORED for info in zf.infolist())
+    
     def test_download_nonexistent_case(self, api_client, temp_casespace):
         """测试下载不存在的 case"""
         casespace = temp_casespace['casespace']
@@ -649,6 +807,52 @@ class TestCaseArchiveOperations:
         assert case_path.exists()
         assert (case_path / 'file1.txt').exists()
         assert (case_path / 'file2.py').exists()
+    
+    def test_upload_case_via_api(self, api_client, temp_casespace, settings):
+        """测试通过接口上传落盘的压缩包"""
+        import zipfile
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from xcase.file_manager import file_manager
+        
+        # 强制 Django 将上传文件写入临时文件
+        settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 0
+        casespace = temp_casespace['casespace']
+        
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zf:
+            zf.writestr('docs/readme.md', '# readme')
+        
+        response = api_client._client.post(
+            f'/case/caseeditor/casespaces/{casespace}/upload-case',
+            {
+                'case_name': 'api_uploaded_case',
+                'file': SimpleUploadedFile('case.zip', buffer.getvalue())
+            }
+        )
+        
+        assert response.json()['code'] == 200
+        case_path = file_manager.storage_root / casespace / 'api_uploaded_case'
+        assert (case_path / 'docs' / 'readme.md').read_text() == '# readme'
+    
+    def test_upload_case_rejects_traversal_without_partial_case(self, temp_casespace):
+        """测试归档包含路径遍历时不留下不完整的 case"""
+        import zipfile
+        from xcase.file_manager import file_manager
+        from xcase.exceptions import PathTraversalException
+        
+        casespace = temp_casespace['casespace']
+        
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zf:
+            zf.writestr('ok.txt', 'ok')
+            zf.writestr('../escape.txt', 'escape')
+        
+        with pytest.raises(PathTraversalException):
+            file_manager.upload_case(casespace, 'bad_case', buffer.getvalue(), 'bad.zip')
+        
+        casespace_path = file_manager.storage_root / casespace
+        assert sorted(p.name for p in casespace_path.iterdir()) == ['test_case']
+        assert not (casespace_path.parent / 'escape.txt').exists()
 
 
 @pytest.mark.caseeditor
@@ -799,7 +1003,7 @@ class TestCaseEditorIntegration:
         assert response.status_code == 200
         
         # 验证下载的 zip 文件
-        zip_data = BytesIO(response.content)
+        zip_data = BytesIO(b''.join(response.streaming_content))
         with zipfile.ZipFile(zip_data, 'r') as zf:
             assert 'README.md' in zf.namelist()
             content = zf.read('README.md').decode('utf-8')
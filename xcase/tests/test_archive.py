@@ -0,0 +1,68 @@
+"""
+打包/解压引擎测试集
+
+测试 xcase.archive：
+- 流式打包分块输出，归档可正常读取
+- 进程池并行解压 zip
+"""
+import os
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from xcase import archive
+
+
+@pytest.fixture(scope='function')
+def sample_files(tmp_path, monkeypatch):
+    """生成一组文件，并让所有成员都走进程池解压"""
+    monkeypatch.setattr(archive, 'ARCHIVE_PARALLEL_MIN_MEMBER', 0)
+    root = tmp_path / 'case'
+    (root / 'src').mkdir(parents=True)
+    contents = {
+        'README.md': b'# readme\n' * 1000,
+        'src/main.py': b'print("hello")\n' * 5000,
+        'src/data.bin': os.urandom(200 * 1024),
+        'image.png': b'png' * 100,
+        'empty.txt': b'',
+    }
+    for name, data in contents.items():
+        (root / name).write_bytes(data)
+    return root, contents
+
+
+@pytest.mark.caseeditor
+class TestParallelArchive:
+    """测试流式打包与并行解压"""
+
+    def test_stream_zip_chunks(self, sample_files):
+        """测试打包结果分块输出，每块不超过块大小加一个成员的头部"""
+        root, contents = sample_files
+        files = archive.list_archive_files(str(root))
+
+        chunks = list(archive.stream_zip(files, chunk_size=16 * 1024))
+        assert len(chunks) > 1
+        assert max(len(chunk) for chunk in chunks) < 64 * 1024
+
+        with zipfile.ZipFile(BytesIO(b''.join(chunks))) as zf:
+            assert zf.testzip() is None
+            assert {name: zf.read(name) for name in zf.namelist()} == contents
+            assert zf.getinfo('src/main.py').compress_type == zipfile.ZIP_DEFLATED
+            assert zf.getinfo('image.png').compress_type == zipfile.ZIP_STORED
+
+    def test_parallel_extract_zip(self, sample_files, tmp_path):
+        """测试进程池并行解压 zip"""
+        root, contents = sample_files
+        files = archive.list_archive_files(str(root))
+        archive_path = tmp_path / 'case.zip'
+        archive_path.write_bytes(b''.join(archive.stream_zip(files)))
+        dest = tmp_path / 'extracted'
+        dest.mkdir()
+
+        with open(archive_path, 'rb') as fileobj:
+            count = archive.extract_zip(fileobj, str(dest), workers=2, archive_path=str(archive_path))
+
+        assert count == len(contents)
+        for name, data in contents.items():
+            assert (dest / name).read_bytes() == data
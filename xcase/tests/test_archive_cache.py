@@ -0,0 +1,133 @@
+"""
+Case 下载缓存测试集
+
+测试 ArchiveCache 和下载接口的缓存行为：
+- 指纹未变化时直接读取缓存，不再重新压缩
+- ETag / If-None-Match 304
+- FileManager 修改 Case 后缓存失效
+- 超出数量上限时按最近使用时间淘汰
+"""
+import os
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from xcase import file_manager as file_manager_module
+
+
+def _download(api_client, casespace, case, **kwargs):
+    return api_client.get(
+        f'/caseeditor/casespaces/{casespace}/cases/{case}/download',
+        **kwargs
+    )
+
+
+@pytest.fixture(scope='function')
+def build_counter(monkeypatch):
+    """统计实际打包的次数"""
+    calls = []
+    original = file_manager_module.stream_zip
+
+    def counting_stream_zip(files, compress=True, **kwargs):
+        calls.append(files)
+        return original(files, compress, **kwargs)
+
+    monkeypatch.setattr(file_manager_module, 'stream_zip', counting_stream_zip)
+    return calls
+
+
+@pytest.mark.caseeditor
+class TestArchiveCache:
+    """测试 Case 下载缓存"""
+
+    def test_repeat_download_served_from_cache(self, api_client, temp_casespace, build_counter):
+        """测试重复下载直接读取缓存"""
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+
+        first = _download(api_client, casespace, case)
+        first_data = b''.join(first.streaming_content)
+        second = _download(api_client, casespace, case)
+        second_data = b''.join(second.streaming_content)
+
+        assert len(build_counter) == 1
+        assert first['ETag'] == second['ETag']
+        assert first_data == second_data
+        with zipfile.ZipFile(BytesIO(second_data)) as zf:
+            assert zf.namelist() == ['test.py']
+
+    def test_if_none_match_returns_304(self, api_client, temp_casespace, build_counter):
+        """测试 ETag 匹配时返回 304"""
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+
+        etag = _download(api_client, casespace, case)['ETag']
+        response = _download(api_client, casespace, case, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert len(build_counter) == 0
+
+    def test_304_on_cache_hit_does_not_open_archive(self, api_client, temp_casespace, build_counter, monkeypatch):
+        """测试缓存命中后返回 304 时不打开缓存文件"""
+        from xcase import archive_cache
+
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+
+        response = _download(api_client, casespace, case)
+        b''.join(response.streaming_content)
+        etag = response['ETag']
+
+        opened = []
+
+        def counting_open(file, *args, **kwargs):
+            opened.append(file)
+            return open(file, *args, **kwargs)
+
+        monkeypatch.setattr(archive_cache, 'open', counting_open, raising=False)
+        response = _download(api_client, casespace, case, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert opened == []
+
+        response = _download(api_client, casespace, case)
+        b''.join(response.streaming_content)
+        assert len(opened) == 1
+        assert len(build_counter) == 1
+
+    def test_file_manager_mutation_invalidates_cache(self, api_client, temp_casespace, build_counter):
+        """测试通过 FileManager 修改 Case 后缓存失效"""
+        from xcase.file_manager import file_manager
+
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+
+        response = _download(api_client, casespace, case)
+        b''.join(response.streaming_content)
+        cache_dir = file_manager.archive_cache._cache_dir() / casespace / case
+        assert len(os.listdir(cache_dir)) == 1
+
+        file_manager.create_file(f'/{casespace}/{case}', 'new.py')
+        assert not cache_dir.exists()
+
+        response = _download(api_client, casespace, case)
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as zf:
+            assert sorted(zf.namelist()) == ['new.py', 'test.py']
+        assert len(build_counter) == 2
+
+    def test_evicts_least_recently_used(self, api_client, temp_casespace, monkeypatch):
+        """测试超出数量上限时淘汰最久未使用的归档"""
+        from xcase.file_manager import file_manager
+
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+        monkeypatch.setattr(file_manager.archive_cache, 'max_entries', 1)
+
+        for compress in ('true', 'false'):
+            response = _download(api_client, casespace, case, params={'compress': compress})
+            b''.join(response.streaming_content)
+
+        cache_dir = file_manager.archive_cache._cache_dir() / casespace / case
+        etag = response['ETag'].strip('"')
+        assert os.listdir(cache_dir) == [f'{etag}.zip']
@@ -0,0 +1,104 @@
+"""
+Case 元数据同步测试集
+
+测试 xcase.metadata_sync 与 sync_case_metadata 管理命令：
+- 磁盘上新增的 Case 批量创建记录并统计文件数量和大小
+- 目录已不存在的 Case 记录被删除
+- 刷新统计时更新发生变化的 Case
+- 列表请求触发的同步不遍历 Case 目录，统计由管理命令补全
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from xcase import metadata_sync
+from xcase.metadata_sync import ensure_casespace_synced, reconcile_all, reconcile_casespace
+from xcase.models import CaseMetadata
+
+
+@pytest.mark.casebrowser
+class TestReconcile:
+    """测试文件系统到数据库的同步"""
+
+    def test_creates_missing_rows_with_stats(self, temp_casespace):
+        """测试缺失的 Case 被创建，并记录文件数量和大小"""
+        casespace_path = temp_casespace['storage_root'] / temp_casespace['casespace']
+        (casespace_path / 'case_b' / 'sub').mkdir(parents=True)
+        (casespace_path / 'case_b' / 'a.txt').write_bytes(b'x' * 10)
+        (casespace_path / 'case_b' / 'sub' / 'b.txt').write_bytes(b'y' * 5)
+
+        result = reconcile_casespace(temp_casespace['casespace'], batch_size=1)
+
+        assert result == {'created': 2, 'deleted': 0, 'updated': 0}
+        metadata = CaseMetadata.objects.get(casespace=temp_casespace['casespace'], case_name='case_b')
+        assert metadata.file_count == 2
+        assert metadata.total_size == 15
+        assert metadata.stats_time is not None
+
+    def test_deletes_stale_rows(self, sample_case_with_tags, temp_casespace):
+        """测试目录已不存在的 Case 记录被删除（标签级联删除）"""
+        CaseMetadata.objects.create(casespace=temp_casespace['casespace'], case_name='gone')
+
+        result = reconcile_casespace(temp_casespace['casespace'])
+
+        assert result['deleted'] == 1
+        assert not CaseMetadata.objects.filter(case_name='gone').exists()
+        assert CaseMetadata.objects.filter(case_name=temp_casespace['case']).exists()
+
+    def test_refresh_stats(self, sample_case_metadata, temp_casespace):
+        """测试刷新统计只更新发生变化的 Case"""
+        casespace = temp_casespace['casespace']
+        reconcile_casespace(casespace, refresh_stats=True)
+        sample_case_metadata.refresh_from_db()
+        assert sample_case_metadata.file_count == 1
+
+        assert reconcile_casespace(casespace, refresh_stats=True)['updated'] == 0
+
+        case_path = temp_casespace['storage_root'] / casespace / temp_casespace['case']
+        (case_path / 'new.txt').write_bytes(b'12345')
+        assert reconcile_casespace(casespace, refresh_stats=True)['updated'] == 1
+        sample_case_metadata.refresh_from_db()
+        assert sample_case_metadata.file_count == 2
+
+    def test_request_sync_does_not_walk_cases(self, temp_casespace, monkeypatch):
+        """测试列表请求触发的同步只创建记录，不统计文件"""
+        casespace = temp_casespace['casespace']
+
+        def fail(path):
+            raise AssertionError(f'dir_stats called in request path: {path}')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(metadata_sync, 'dir_stats', fail)
+            patch.setattr(metadata_sync, '_synced_mtimes', {})
+            ensure_casespace_synced(casespace)
+
+        metadata = CaseMetadata.objects.get(casespace=casespace, case_name=temp_casespace['case'])
+        assert metadata.stats_time is None
+
+        # 不刷新统计时也会补全尚未统计的记录
+        assert reconcile_casespace(casespace, refresh_stats=False)['updated'] == 1
+        metadata.refresh_from_db()
+        assert metadata.file_count == 1
+        assert metadata.stats_time is not None
+        assert reconcile_casespace(casespace, refresh_stats=False)['updated'] == 0
+
+    def test_reconcile_all_removes_missing_casespaces(self, temp_casespace):
+        """测试全量同步删除已不存在的 Casespace 的记录"""
+        CaseMetadata.objects.create(casespace='missing_casespace', case_name='case')
+
+        summary = reconcile_all()
+
+        assert summary['created'] == 1
+        assert not CaseMetadata.objects.filter(casespace='missing_casespace').exists()
+
+    def test_management_command(self, temp_casespace):
+        """测试 sync_case_metadata 管理命令"""
+        out = StringIO()
+        call_command('sync_case_metadata', casespace=temp_casespace['casespace'], stdout=out)
+
+        assert '新建 1' in out.getvalue()
+        assert CaseMetadata.objects.filter(
+            casespace=temp_casespace['casespace'],
+            case_name=temp_casespace['case']
+        ).exists()
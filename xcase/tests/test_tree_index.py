@@ -0,0 +1,93 @@
+"""
+文件树索引测试集
+
+测试 FileTreeIndex 的构建、修补与失效：
+- 首次请求构建索引，重复请求不再扫描磁盘
+- FileManager 的增删改操作直接修补索引
+- 轮询模式下感知外部文件变更
+"""
+import pytest
+
+from xcase import tree_index
+from xcase.tree_index import FileTreeIndex
+
+
+@pytest.fixture(scope='function')
+def polling_index(monkeypatch, temp_casespace):
+    """不使用文件系统事件、每次请求都轮询校验的索引"""
+    from xcase.file_manager import file_manager
+
+    monkeypatch.setattr(tree_index, 'Observer', None)
+    calls = []
+
+    def builder(dir_path):
+        calls.append(dir_path)
+        return file_manager._get_children(dir_path)
+
+    index = FileTreeIndex(builder, poll_interval=0)
+    case_abs = temp_casespace['storage_root'] / temp_casespace['casespace'] / temp_casespace['case']
+    yield index, case_abs, calls
+    index.clear()
+
+
+@pytest.mark.caseeditor
+class TestFileTreeIndex:
+    """测试文件树索引"""
+
+    def test_repeat_loads_served_from_index(self, polling_index):
+        """测试重复请求不重新扫描目录"""
+        index, case_abs, calls = polling_index
+
+        first = index.get_children(case_abs, case_abs)
+        second = index.get_children(case_abs, case_abs)
+
+        assert [n['name'] for n in first] == ['test.py']
+        assert second == first
+        assert len(calls) == 1
+
+    def test_returned_nodes_are_copies(self, polling_index):
+        """测试调用方修改返回结果不影响索引"""
+        index, case_abs, _ = polling_index
+
+        index.get_children(case_abs, case_abs).clear()
+
+        assert len(index.get_children(case_abs, case_abs)) == 1
+
+    def test_polling_detects_external_changes(self, polling_index):
+        """测试轮询模式感知外部新增的文件和目录"""
+        index, case_abs, calls = polling_index
+        index.get_children(case_abs, case_abs)
+
+        (case_abs / 'docs').mkdir()
+        (case_abs / 'docs' / 'a.md').write_text('a', encoding='utf-8')
+
+        children = index.get_children(case_abs, case_abs)
+        assert [n['name'] for n in children] == ['docs', 'test.py']
+        assert [n['name'] for n in children[0]['children']] == ['a.md']
+        assert len(calls) == 2
+
+    def test_file_manager_patches_index(self, temp_casespace):
+        """测试创建、重命名、删除直接修补索引"""
+        from xcase.file_manager import file_manager
+
+        casespace = temp_casespace['casespace']
+        case = temp_casespace['case']
+        parent = f'/{casespace}/{case}'
+
+        file_manager.get_file_tree('/', casespace, case)
+        file_manager.create_folder(parent, 'src')
+        file_manager.create_file(f'{parent}/src', 'main.py')
+        file_manager.rename_item(f'{parent}/src', 'lib')
+
+        tree = file_manager.get_file_tree('/', casespace, case)
+        assert [n['name'] for n in tree] == ['lib', 'test.py']
+        assert tree[0]['children'] == [{
+            'path': f'{parent}/lib/main.py',
+            'name': 'main.py',
+            'type': 'file'
+        }]
+        assert file_manager.get_file_tree('/lib', casespace, case)[0]['name'] == 'main.py'
+
+        file_manager.delete_item(f'{parent}/lib')
+        tree = file_manager.get_file_tree('/', casespace, case)
+        assert [n['name'] for n in tree] == ['test.py']
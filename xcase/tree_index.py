@@ -0,0 +1,408 @@
+"""
+文件树索引
+
+为每个 Case 在内存中维护一份文件树索引：
+- 首次请求时构建，后续请求直接从内存返回
+- 通过文件系统事件（watchdog/inotify，可选依赖）增量失效
+- 未安装 watchdog 时退化为按目录 mtime 轮询校验
+- FileManager 的增删改操作直接修补索引，无需重新扫描磁盘
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any, Set, Tuple
+from loguru import logger
+
+from .constants import TREE_INDEX_MAX_CASES, TREE_INDEX_POLL_INTERVAL
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    # watchdog 的调试日志（每个 inotify 事件一条）过于冗长
+    logging.getLogger('watchdog').setLevel(logging.INFO)
+except ImportError:  # pragma: no cover - watchdog 为可选依赖
+    Observer = None
+    FileSystemEventHandler = object
+
+
+def sort_key(node: Dict[str, Any]) -> Tuple[bool, str, str]:
+    """目录优先，然后按名称排序（与目录扫描的顺序保持一致）"""
+    return (node['type'] != 'folder', node['name'].lower(), node['name'])
+
+
+def copy_nodes(nodes: List[Dict[str, Any]], depth: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    复制节点列表，避免调用方拿到索引内部的可变对象
+
+    Args:
+        nodes: 节点列表
+        depth: 保留的层数；指定时目录节点会带上 hasChildren，
+            超出层数的目录不再包含 children
+    """
+    result = []
+    for node in nodes:
+        node = dict(node)
+        if 'children' in node:
+            children = node['children']
+            if depth is None:
+                node['children'] = copy_nodes(children)
+            else:
+                node['hasChildren'] = bool(children)
+                if depth > 1:
+                    node['children'] = copy_nodes(children, depth - 1)
+                else:
+                    del node['children']
+        result.append(node)
+    return result
+
+
+def _is_within(path: str, root: str) -> bool:
+    return path == root or path.startswith(root + os.sep)
+
+
+class _CaseTree:
+    """单个 Case 的索引数据"""
+
+    def __init__(self, root: str):
+        self.root = root
+        # 目录绝对路径 -> 该目录的子节点列表（与树中 folder 节点的 children 为同一对象）
+        self.dirs: Dict[str, List[Dict[str, Any]]] = {}
+        # 目录绝对路径 -> 构建时的 mtime，用于轮询校验
+        self.mtimes: Dict[str, int] = {}
+        # 需要重新扫描的目录
+        self.dirty: Set[str] = set()
+        self.checked_at = time.monotonic()
+        self.watch = None
+
+    def register(self, dir_path: str, children: List[Dict[str, Any]]) -> None:
+        """登记目录及其所有子目录"""
+        self.dirs[dir_path] = children
+        try:
+            self.mtimes[dir_path] = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            self.mtimes[dir_path] = 0
+        for node in children:
+            if node['type'] == 'folder':
+                self.register(os.path.join(dir_path, node['name']), node['children'])
+
+    def unregister(self, path: str) -> None:
+        """移除 path 及其下所有目录的登记"""
+        for key in [k for k in self.dirs if _is_within(k, path)]:
+            self.dirs.pop(key, None)
+            self.mtimes.pop(key, None)
+            self.dirty.discard(key)
+
+
+class _EventHandler(FileSystemEventHandler):
+    """将文件系统事件转换为目录失效标记"""
+
+    def __init__(self, index: 'FileTreeIndex'):
+        super().__init__()
+        self.index = index
+
+    def on_any_event(self, event):
+        if event.event_type not in ('created', 'deleted', 'moved'):
+            return
+        self.index.invalidate(os.fsdecode(event.src_path))
+        dest_path = getattr(event, 'dest_path', '')
+        if dest_path:
+            self.index.invalidate(os.fsdecode(dest_path))
+
+
+class FileTreeIndex:
+    """
+    按 Case 缓存的文件树索引
+
+    Args:
+        builder: 扫描目录并返回子节点列表的函数（递归）
+        max_cases: 最多缓存的 Case 数量，超出后按 LRU 淘汰
+        poll_interval: 未启用文件系统事件时的轮询校验间隔（秒）
+    """
+
+    def __init__(
+        self,
+        builder: Callable[[Path], List[Dict[str, Any]]],
+        max_cases: int = TREE_INDEX_MAX_CASES,
+        poll_interval: float = TREE_INDEX_POLL_INTERVAL,
+    ):
+        self.builder = builder
+        self.max_cases = max_cases
+        self.poll_interval = poll_interval
+        self._cases: 'OrderedDict[str, _CaseTree]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._observer = None
+        self._handler = None
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def get_children(
+        self,
+        case_path: Path,
+        dir_path: Path,
+        depth: Optional[int] = None,
+        after: Optional[Tuple[bool, str, str]] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        获取 Case 内某个目录的子节点
+
+        Args:
+            case_path: Case 根目录
+            dir_path: 要列出的目录（位于 Case 内）
+            depth: 返回的层数（None 表示完整子树）
+            after: 分页游标，只返回排序键大于该值的子节点
+            limit: 最多返回的子节点数量
+
+        Returns:
+            子节点列表的副本；目录不在索引中时返回 None
+        """
+        root = str(case_path)
+        key = str(dir_path)
+        with self._lock:
+            tree = self._cases.get(root)
+            if tree is None:
+                if not os.path.isdir(root):
+                    return None
+                tree = self._build(root)
+            else:
+                self._cases.move_to_end(root)
+                self._validate(tree)
+                if root not in self._cases:
+                    return None
+            children = tree.dirs.get(key)
+            if children is None:
+                return None
+            start = bisect.bisect_right(children, after, key=sort_key) if after else 0
+            end = start + limit if limit is not None else len(children)
+            return copy_nodes(children[start:end], depth)
+
+    # ------------------------------------------------------------------
+    # 失效与修补
+    # ------------------------------------------------------------------
+
+    def invalidate(self, path: str) -> None:
+        """标记 path 所在目录需要重新扫描（由文件系统事件触发）"""
+        path = str(path)
+        with self._lock:
+            tree = self._find(path)
+            if tree is None:
+                return
+            if path == tree.root:
+                self.drop(path)
+                return
+            parent = os.path.dirname(path)
+            while parent not in tree.dirs and parent != tree.root:
+                parent = os.path.dirname(parent)
+            tree.dirty.add(parent)
+
+    def add(self, path: Path, node: Dict[str, Any]) -> None:
+        """将新建的文件或目录加入索引"""
+        path = str(path)
+        with self._lock:
+            tree = self._find(path)
+            if tree is None:
+                return
+            parent = os.path.dirname(path)
+            siblings = tree.dirs.get(parent)
+            if siblings is None:
+                return
+            self._detach(tree, siblings, path)
+            if node['name'].startswith('.'):
+                # 隐藏文件不出现在文件树中
+                self._refresh_mtime(tree, parent)
+                return
+            node = copy_nodes([node])[0]
+            if node['type'] == 'folder':
+                node.setdefault('children', [])
+                tree.register(path, node['children'])
+            siblings.append(node)
+            siblings.sort(key=sort_key)
+            self._refresh_mtime(tree, parent)
+
+    def remove(self, path: Path) -> None:
+        """从索引中移除文件或目录"""
+        path = str(path)
+        with self._lock:
+            tree = self._find(path)
+            if tree is None:
+                return
+            if path == tree.root:
+                self.drop(path)
+                return
+            parent = os.path.dirname(path)
+            siblings = tree.dirs.get(parent)
+            if siblings is None:
+                return
+            self._detach(tree, siblings, path)
+            self._refresh_mtime(tree, parent)
+
+    def rename(self, old_path: Path, new_path: Path, old_rel: str, new_rel: str) -> None:
+        """
+        在索引中重命名文件或目录
+
+        Args:
+            old_path: 原绝对路径
+            new_path: 新绝对路径
+            old_rel: 原相对路径（节点 path 字段）
+            new_rel: 新相对路径
+        """
+        old_path, new_path = str(old_path), str(new_path)
+        with self._lock:
+            tree = self._find(old_path)
+            if tree is None or old_path == tree.root:
+                return
+            parent = os.path.dirname(old_path)
+            siblings = tree.dirs.get(parent)
+            if siblings is None:
+                return
+            node = next((n for n in siblings if n['name'] == os.path.basename(old_path)), None)
+            if node is None:
+                tree.dirty.add(parent)
+                return
+            siblings.remove(node)
+            if os.path.basename(new_path).startswith('.'):
+                # 重命名为隐藏文件后不再出现在文件树中
+                tree.unregister(old_path)
+                self._refresh_mtime(tree, parent)
+                return
+
+            if node['type'] == 'folder':
+                # 重写子树中所有节点的 path，并迁移目录登记
+                self._rewrite_paths(node['children'], old_rel, new_rel)
+                for key in [k for k in tree.dirs if _is_within(k, old_path)]:
+                    new_key = new_path + key[len(old_path):]
+                    tree.dirs[new_key] = tree.dirs.pop(key)
+                    tree.mtimes[new_key] = tree.mtimes.pop(key, 0)
+                    if key in tree.dirty:
+                        tree.dirty.discard(key)
+                        tree.dirty.add(new_key)
+
+            node['name'] = os.path.basename(new_path)
+            node['path'] = new_rel
+            new_siblings = tree.dirs.get(os.path.dirname(new_path))
+            if new_siblings is not None:
+                new_siblings.append(node)
+                new_siblings.sort(key=sort_key)
+                self._refresh_mtime(tree, os.path.dirname(new_path))
+            self._refresh_mtime(tree, parent)
+
+    def drop(self, case_path) -> None:
+        """丢弃整个 Case 的索引"""
+        root = str(case_path)
+        with self._lock:
+            tree = self._cases.pop(root, None)
+            if tree is not None:
+                self._unwatch(tree)
+
+    def clear(self) -> None:
+        """清空所有索引"""
+        with self._lock:
+            for root in list(self._cases):
+                self.drop(root)
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _build(self, root: str) -> _CaseTree:
+        children = self.builder(Path(root))
+        tree = _CaseTree(root)
+        tree.register(root, children)
+        self._cases[root] = tree
+        self._watch(tree)
+        while len(self._cases) > self.max_cases:
+            _, evicted = self._cases.popitem(last=False)
+            self._unwatch(evicted)
+        logger.debug(f"Tree index built: {root} ({len(tree.dirs)} directories)")
+        return tree
+
+    def _validate(self, tree: _CaseTree) -> None:
+        """刷新被标记的目录；未启用事件监听时按间隔轮询目录 mtime"""
+        if tree.watch is None and time.monotonic() - tree.checked_at >= self.poll_interval:
+            if not os.path.isdir(tree.root):
+                self.drop(tree.root)
+                return
+            for dir_path, mtime in list(tree.mtimes.items()):
+                try:
+                    if os.stat(dir_path).st_mtime_ns != mtime:
+                        tree.dirty.add(dir_path)
+                except OSError:
+                    tree.dirty.add(os.path.dirname(dir_path))
+            tree.checked_at = time.monotonic()
+
+        if not tree.dirty:
+            return
+        # 只需刷新最上层的脏目录，其子目录会随之重建
+        for dir_path in sorted(tree.dirty, key=len):
+            if dir_path not in tree.dirs:
+                continue
+            if dir_path == tree.root and not os.path.isdir(dir_path):
+                self.drop(tree.root)
+                return
+            self._rescan(tree, dir_path)
+        tree.dirty.clear()
+
+    def _rescan(self, tree: _CaseTree, dir_path: str) -> None:
+        children = tree.dirs[dir_path]
+        tree.unregister(dir_path)
+        children[:] = self.builder(Path(dir_path)) if os.path.isdir(dir_path) else []
+        tree.register(dir_path, children)
+
+    def _detach(self, tree: _CaseTree, siblings: List[Dict[str, Any]], path: str) -> None:
+        name = os.path.basename(path)
+        siblings[:] = [n for n in siblings if n['name'] != name]
+        tree.unregister(path)
+
+    def _refresh_mtime(self, tree: _CaseTree, dir_path: str) -> None:
+        if dir_path in tree.mtimes:
+            try:
+                tree.mtimes[dir_path] = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                tree.dirty.add(dir_path)
+
+    def _rewrite_paths(self, nodes: List[Dict[str, Any]], old_rel: str, new_rel: str) -> None:
+        for node in nodes:
+            node['path'] = new_rel + node['path'][len(old_rel):]
+            if 'children' in node:
+                self._rewrite_paths(node['children'], old_rel, new_rel)
+
+    def _find(self, path: str) -> Optional[_CaseTree]:
+        """查找包含 path 的 Case 索引"""
+        current = path
+        while True:
+            tree = self._cases.get(current)
+            if tree is not None:
+                return tree
+            parent = os.path.dirname(current)
+            if parent == current:
+                return None
+            current = parent
+
+    def _watch(self, tree: _CaseTree) -> None:
+        if Observer is None:
+            return
+        try:
+            if self._observer is None:
+                self._handler = _EventHandler(self)
+                self._observer = Observer()
+                self._observer.daemon = True
+                self._observer.start()
+            tree.watch = self._observer.schedule(self._handler, tree.root, recursive=True)
+        except Exception as e:
+            logger.warning(f"File system watcher unavailable, falling back to polling: {e}")
+            tree.watch = None
+
+    def _unwatch(self, tree: _CaseTree) -> None:
+        if tree.watch is None or self._observer is None:
+            return
+        try:
+            self._observer.unschedule(tree.watch)
+        except Exception as e:
+            logger.debug(f"Failed to unschedule watcher for {tree.root}: {e}")
+        tree.watch = None
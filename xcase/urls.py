@@ -12,6 +12,7 @@ from ninja_jwt.exceptions import AuthenticationFailed
 from loguru import logger
 
 from xauth import auth
+from xutils import renderers
 from xutils.utils import RespFailedTempl
 from . import api_caseeditor
 from . import api_casebrowser
@@ -23,7 +24,8 @@ api = NinjaExtraAPI(
     title='XCase API',
     version='1.0.0',
     description='用例管理模块 API',
-    urls_namespace='xcase'
+    urls_namespace='xcase',
+    renderer=renderers.get_renderer()
 )
 
 # 注册路由
@@ -0,0 +1,144 @@
+"""
+目录遍历
+
+基于 os.scandir 的目录遍历核心，文件树、Casespace 列表、Case 列表和元数据统计共用：
+- DirEntry 缓存了 readdir 返回的文件类型，排序和判断目录不再逐项 stat
+- 子节点路径由父目录的相对路径拼接字符串得到，不再逐项计算 relative_to
+"""
+import bisect
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+
+def _entry_sort_key(entry: os.DirEntry):
+    """目录优先，然后按名称排序"""
+    return (not entry.is_dir(), entry.name.lower(), entry.name)
+
+
+def scan_dir(dir_path: str) -> List[os.DirEntry]:
+    """
+    列出目录下的可见条目（跳过隐藏文件），目录优先，然后按名称排序
+
+    Args:
+        dir_path: 目录的绝对路径
+
+    Returns:
+        排好序的 DirEntry 列表
+
+    Raises:
+        OSError: 目录无法读取
+    """
+    with os.scandir(dir_path) as it:
+        entries = [entry for entry in it if not entry.name.startswith('.')]
+    entries.sort(key=_entry_sort_key)
+    return entries
+
+
+def list_dirs(dir_path: str) -> List[str]:
+    """
+    列出目录下的可见子目录名称，按名称排序
+
+    Args:
+        dir_path: 目录的绝对路径
+
+    Returns:
+        子目录名称列表
+
+    Raises:
+        OSError: 目录无法读取
+    """
+    with os.scandir(dir_path) as it:
+        names = [entry.name for entry in it if entry.is_dir() and not entry.name.startswith('.')]
+    names.sort(key=lambda name: (name.lower(), name))
+    return names
+
+
+def has_children(dir_path: str) -> bool:
+    """判断目录下是否有可见的子项"""
+    try:
+        with os.scandir(dir_path) as it:
+            return any(not entry.name.startswith('.') for entry in it)
+    except OSError:
+        return False
+
+
+def dir_stats(dir_path: str) -> Tuple[int, int]:
+    """
+    统计目录下（递归）的文件数量和总大小，不跟随符号链接
+
+    Args:
+        dir_path: 目录的绝对路径
+
+    Returns:
+        (文件数量, 总字节数)；遍历过程中消失或无法读取的条目会被忽略
+    """
+    count = 0
+    size = 0
+    stack = [dir_path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            size += entry.stat(follow_symlinks=False).st_size
+                            count += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return count, size
+
+
+def walk_tree(
+    dir_path: str,
+    rel_path: str,
+    depth: Optional[int] = None,
+    after: Optional[Tuple[bool, str, str]] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    递归构建目录的子节点
+
+    Args:
+        dir_path: 目录的绝对路径
+        rel_path: 目录相对存储根目录的路径（带前导斜杠，根目录为空字符串）
+        depth: 递归层数（None 表示不限制）；指定时目录节点带有 hasChildren
+        after: 分页游标，只返回排序键大于该值的子节点
+        limit: 最多返回的子节点数量；分页在递归之前进行，页外的子目录不会被遍历
+
+    Returns:
+        子节点字典列表
+    """
+    children = []
+    try:
+        entries = scan_dir(dir_path)
+    except PermissionError:
+        logger.warning(f"Permission denied accessing directory: {dir_path}")
+        return children
+    except Exception as e:
+        logger.error(f"Error reading directory {dir_path}: {e}")
+        return children
+
+    start = bisect.bisect_right(entries, after, key=_entry_sort_key) if after else 0
+    end = start + limit if limit is not None else len(entries)
+    for entry in entries[start:end]:
+        node = {
+            'path': f"{rel_path}/{entry.name}",
+            'name': entry.name,
+            'type': 'folder' if entry.is_dir() else 'file'
+        }
+        if node['type'] == 'folder':
+            if depth is None:
+                node['children'] = walk_tree(entry.path, node['path'])
+            elif depth > 1:
+                node['children'] = walk_tree(entry.path, node['path'], depth - 1)
+                node['hasChildren'] = bool(node['children'])
+            else:
+                node['hasChildren'] = has_children(entry.path)
+        children.append(node)
+
+    return children
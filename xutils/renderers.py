@@ -0,0 +1,49 @@
+"""
+JSON 渲染器
+
+NinjaExtraAPI 的响应渲染器（NinjaExtraAPI(renderer=...)），通过 settings.XADMIN_JSON_RENDERER 配置：
+- 使用 orjson（项目依赖）直接输出 UTF-8 字节；未安装时回退到标准库 json（紧凑格式，不转义非 ASCII 字符）
+- datetime/date/time 不使用 orjson 的原生格式，与其他 orjson 无法处理的类型（pydantic 模型、Decimal、
+  惰性字符串等）一样交给 ninja 的 NinjaJSONEncoder，两条路径的输出完全一致（datetime 精确到毫秒）
+"""
+import json
+from typing import Any
+from django.conf import settings
+from django.http import HttpRequest
+from django.utils.module_loading import import_string
+from ninja.renderers import BaseRenderer
+from ninja.responses import NinjaJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未按 pyproject.toml 安装依赖时
+    orjson = None
+
+DEFAULT_RENDERER = 'xutils.renderers.FastJSONRenderer'
+
+_encoder = NinjaJSONEncoder()
+
+
+def dumps(data: Any) -> bytes:
+    """序列化为 JSON 字节"""
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            default=_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+    return json.dumps(
+        data, cls=NinjaJSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+class FastJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+
+    def render(self, request: HttpRequest, data: Any, *, response_status: int) -> bytes:
+        return dumps(data)
+
+
+def get_renderer() -> BaseRenderer:
+    """按 settings.XADMIN_JSON_RENDERER 创建渲染器"""
+    return import_string(getattr(settings, 'XADMIN_JSON_RENDERER', DEFAULT_RENDERER))()
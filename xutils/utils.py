@@ -1,4 +1,5 @@
 import re
+import time
 from dataclasses import dataclass
 from typing import Any
 from django.conf import settings
@@ -19,7 +20,7 @@ class RespSuccessTempl:
             code = self.code,
             msg = self.msg,
             data = self.data,
-            timestamp = int(timezone.localtime().timestamp()*1000)
+            timestamp = int(time.time()*1000)
         )
     
 @dataclass
@@ -35,7 +36,7 @@ class RespFailedTempl:
             code = self.code,
             msg = self.msg,
             data = self.data,
-            timestamp = int(timezone.localtime().timestamp()*1000)
+            timestamp = int(time.time()*1000)
         )
     
 def camel_to_snake(name):